@@ -6,44 +6,265 @@ and adding/deleting detections from the interactive canvas.
 """
 
 import os
-import json
+import logging
 import uuid
+import queue
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, replace
+from typing import Any, Callable
 from datetime import datetime, timezone
-from flask import Blueprint, request, jsonify
-import sys
-
-# Add backend to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+from flask import Blueprint
 from utils.coordinate_mapping import (
     PDFCoordinates,
     ImageCoordinates,
     PageMetadata,
     CoordinateTransformer,
 )
+from utils.symbol_detection.detection_algorithm import SymbolDetectionAlgorithm
 from utils.symbol_detection.detection_storage import DetectionStorage
 from utils.symbol_detection.detection_coordinator import DetectionCoordinator
+from utils.file_cache import file_version, load_json
+from api.responses import json_body, json_response, ok, err, get_processed_folder
+
+log = logging.getLogger(__name__)
 
 # Create blueprint for detection update API
 detection_updates_bp = Blueprint("detection_updates", __name__)
 
 
-@detection_updates_bp.route(
-    "/api/update_detection_coordinates", methods=["POST", "OPTIONS"]
-)
+def _stat_or_none(path):
+    """Return os.stat(path), or None if the path does not exist."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+# Coordinate transformers are pure functions of a page's metadata, so they are
+# shared across requests and rebuilt only when page_metadata.json changes.
+# They map to image space at the detection DPI rather than the page image DPI,
+# so edited and user-added detections store imageCoords at the same scale as
+# the algorithm's detections in the run.
+_TRANSFORMER_CACHE_SIZE = 256
+_DETECTION_DPI = SymbolDetectionAlgorithm.DETECTION_DPI
+
+
+def _detection_page_metadata(page_metadata):
+    """Page metadata with its image properties at the detection DPI."""
+    scale = _DETECTION_DPI / 72.0
+    return replace(
+        page_metadata,
+        image_width_pixels=int(page_metadata.pdf_width_points * scale),
+        image_height_pixels=int(page_metadata.pdf_height_points * scale),
+        image_dpi=_DETECTION_DPI,
+    )
+
+
+_transformer_cache: "OrderedDict[tuple, CoordinateTransformer]" = OrderedDict()
+_transformer_cache_lock = threading.Lock()
+
+
+def _get_transformer(doc_dir, page_num, metadata_stat=None):
+    """
+    Return a cached detection-DPI CoordinateTransformer for a page.
+
+    Pass metadata_stat when the caller has already stat'ed page_metadata.json
+    so the cache key can reuse it.
+    """
+    page_metadata_file = os.path.join(doc_dir, "page_metadata.json")
+    if metadata_stat is None:
+        metadata_stat = os.stat(page_metadata_file)
+    version = file_version(metadata_stat)
+    key = (doc_dir, int(page_num), version)
+
+    with _transformer_cache_lock:
+        transformer = _transformer_cache.get(key)
+        if transformer is not None:
+            _transformer_cache.move_to_end(key)
+            return transformer
+
+    page_metadata_dict = load_json(page_metadata_file, version)
+    page_metadata = PageMetadata.from_dict(page_metadata_dict["pages"][str(page_num)])
+    transformer = CoordinateTransformer(_detection_page_metadata(page_metadata))
+
+    with _transformer_cache_lock:
+        _transformer_cache[key] = transformer
+        _transformer_cache.move_to_end(key)
+        while len(_transformer_cache) > _TRANSFORMER_CACHE_SIZE:
+            _transformer_cache.popitem(last=False)
+
+    return transformer
+
+
+# Status changes arrive one detection at a time while a user reviews the
+# canvas. They are buffered per (doc_dir, run_id) and written in one storage
+# call once the run has been quiet for _STATUS_FLUSH_DELAY seconds. Readers of
+# a run's results call flush_status_updates first, so they never see a stale
+# status.
+_STATUS_FLUSH_DELAY = 0.05
+_pending_status_updates = defaultdict(dict)
+_status_flush_timers = {}
+_status_buffer_lock = threading.Lock()
+# One lock per run, held from taking its buffer until the buffer is written,
+# so an explicit flush waits for a timer flush that is already writing
+_status_flush_locks = {}
+
+
+def _queue_status_update(doc_dir, run_id, update):
+    """Buffer a status update and (re)arm the flush timer for its run."""
+    key = (doc_dir, run_id)
+    with _status_buffer_lock:
+        _status_flush_locks.setdefault(key, threading.Lock())
+        # Later updates for the same detection replace earlier ones
+        _pending_status_updates[key][update["detectionId"]] = update
+        timer = _status_flush_timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        timer = threading.Timer(_STATUS_FLUSH_DELAY, _flush_status_updates, (key,))
+        timer.daemon = True
+        _status_flush_timers[key] = timer
+        timer.start()
+
+
+def _flush_status_updates(key, raise_errors=False):
+    """
+    Write all buffered status updates for one run.
+
+    If the write fails the updates go back into the buffer, behind any that
+    arrived meanwhile, and are retried by the next flush of the run. Timer
+    flushes log the error; explicit flushes (raise_errors) raise it. Updates
+    for a run that has since been deleted are dropped. Returns the number
+    written.
+    """
+    with _status_buffer_lock:
+        flush_lock = _status_flush_locks.setdefault(key, threading.Lock())
+
+    with flush_lock:
+        with _status_buffer_lock:
+            timer = _status_flush_timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            buffered = _pending_status_updates.pop(key, None)
+
+        if not buffered:
+            return 0
+
+        doc_dir, run_id = key
+        try:
+            DetectionStorage(doc_dir).update_detection_status(
+                run_id, list(buffered.values())
+            )
+        except ValueError:
+            log.warning(
+                "Dropped %d status updates for deleted run %s", len(buffered), run_id
+            )
+            return 0
+        except Exception:
+            with _status_buffer_lock:
+                buffered.update(_pending_status_updates.pop(key, {}))
+                _pending_status_updates[key] = buffered
+            if raise_errors:
+                raise
+            log.exception("Failed to flush detection statuses for run %s", run_id)
+            return 0
+
+    return len(buffered)
+
+
+def _flush_pending_writes(doc_id, run_id=None):
+    """
+    Wait for queued canvas writes, then write buffered status updates.
+
+    Statuses are only written for doc_id (and run_id, if given); without a
+    document only the write queue is drained. Raises the first failed write
+    for the document. Returns the number of status updates written.
+    """
+    _write_queue.join()
+    if not doc_id:
+        return 0
+
+    doc_dir = os.path.join(get_processed_folder(), doc_id)
+    with _write_errors_lock:
+        write_error = _write_errors.pop(doc_dir, None)
+    if write_error is not None:
+        raise write_error
+    return flush_status_updates(doc_dir, run_id)
+
+
+def flush_status_updates(doc_dir, run_id=None):
+    """
+    Write the buffered status updates of a document, or of one of its runs.
+
+    Waits for a background flush of the same runs that is already writing.
+    Returns the number of updates written. Raises the first write error; the
+    updates that failed stay buffered.
+    """
+    with _status_buffer_lock:
+        keys = [
+            key
+            for key in _status_flush_locks
+            if key[0] == doc_dir and (run_id is None or key[1] == run_id)
+        ]
+    return sum(_flush_status_updates(key, raise_errors=True) for key in keys)
+
+
+# Canvas edits (coordinate changes, user-added and deleted detections) are
+# validated on the request thread and then written by a single background
+# worker, so the client does not wait on JSON rewrites. The single worker keeps
+# writes in arrival order; /api/detection_flush waits for it to drain and
+# reports the first write that failed for the document since the last flush.
+@dataclass
+class _StorageWrite:
+    doc_dir: str
+    description: str
+    apply: Callable[[DetectionStorage], Any]
+
+
+_write_queue: "queue.Queue[_StorageWrite]" = queue.Queue()
+_write_errors = {}
+_write_errors_lock = threading.Lock()
+
+
+def _storage_write_worker():
+    while True:
+        op = _write_queue.get()
+        try:
+            op.apply(DetectionStorage(op.doc_dir))
+        except Exception as e:
+            log.exception("Queued detection write failed: %s", op.description)
+            with _write_errors_lock:
+                _write_errors.setdefault(op.doc_dir, e)
+        finally:
+            _write_queue.task_done()
+
+
+@detection_updates_bp.record_once
+def _start_storage_write_worker(state):
+    threading.Thread(
+        target=_storage_write_worker, name="detection-writes", daemon=True
+    ).start()
+
+
+def _queued(detection_id, **fields):
+    """202 response for a write that has been handed to the worker."""
+    return json_response(
+        {"success": True, "queued": True, "detectionId": detection_id, **fields},
+        202,
+    )
+
+
+@detection_updates_bp.route("/api/update_detection_coordinates", methods=["POST"])
 def update_detection_coordinates():
     """
     Update detection coordinates from canvas interactions.
     Handles coordinate transformation from canvas to PDF space.
     """
-    print("\n--- Received request on /api/update_detection_coordinates ---")
-
-    if request.method == "OPTIONS":
-        return "", 200
-
     try:
-        data = request.get_json()
+        data = json_body()
         if not data:
-            return jsonify({"error": "No data received"}), 400
+            return err("No data received", 400)
 
         # Extract parameters
         doc_id = data.get("docId")
@@ -51,102 +272,213 @@ def update_detection_coordinates():
         detection_id = data.get("detectionId")
         pdf_coords = data.get("pdfCoords")  # Already in PDF coordinate space
 
-        print(f"🔄 Updating detection coordinates:")
-        print(f"   Document: {doc_id}")
-        print(f"   Run: {run_id}")
-        print(f"   Detection: {detection_id}")
-        print(f"   New PDF coords: {pdf_coords}")
+        log.debug(
+            "Updating detection coordinates: doc=%s run=%s detection=%s pdf=%s",
+            doc_id,
+            run_id,
+            detection_id,
+            pdf_coords,
+        )
 
         if not all([doc_id, run_id, detection_id, pdf_coords]):
-            return jsonify({"error": "Missing required parameters"}), 400
+            return err("Missing required parameters", 400)
 
         # Get processed folder
-        from flask import current_app
-
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
-        if not os.path.exists(doc_dir):
-            return jsonify({"error": "Document not found"}), 404
-
-        # Create PDF coordinates object
-        pdf_coords_obj = PDFCoordinates(
-            left=pdf_coords["left_points"],
-            top=pdf_coords["top_points"],
-            width=pdf_coords["width_points"],
-            height=pdf_coords["height_points"],
-        )
+        doc_stat = _stat_or_none(doc_dir)
+        if doc_stat is None:
+            return err("Document not found", 404)
+
+        # Parse and validate the PDF coordinates once
+        try:
+            pdf_box = PDFCoordinates.array_from_dict(pdf_coords)
+        except ValueError as e:
+            return err(str(e), 400)
+        pdf_coords_obj = PDFCoordinates.from_array(pdf_box)
 
         # Load page metadata for coordinate transformation
         page_metadata_file = os.path.join(doc_dir, "page_metadata.json")
-        if not os.path.exists(page_metadata_file):
-            return jsonify({"error": "Page metadata not found"}), 404
-
-        with open(page_metadata_file, "r") as f:
-            page_metadata_dict = json.load(f)
+        metadata_stat = _stat_or_none(page_metadata_file)
+        if metadata_stat is None:
+            return err("Page metadata not found", 404)
 
         # Update detection in storage
-        detection_storage = DetectionStorage(doc_dir)
+        detection_storage = DetectionStorage(doc_dir, doc_dir_stat=doc_stat)
 
         # Load current detection to get page info
         detection_data = detection_storage.load_detection_by_id(run_id, detection_id)
         if not detection_data:
-            return jsonify({"error": "Detection not found"}), 404
+            return err("Detection not found", 404)
 
         # Calculate image coordinates from PDF coordinates
         page_num = detection_data.get("pageNumber", 1)
-        page_metadata = PageMetadata.from_dict(
-            page_metadata_dict["pages"][str(page_num)]
-        )
-
-        transformer = CoordinateTransformer(page_metadata)
+        transformer = _get_transformer(doc_dir, page_num, metadata_stat)
         image_coords = transformer.pdf_to_image(pdf_coords_obj)
 
         # Update detection coordinates
-        detection_storage.update_detection_coordinates(
-            run_id, detection_id, pdf_coords_obj, image_coords
+        _write_queue.put(
+            _StorageWrite(
+                doc_dir,
+                f"update coordinates of {detection_id}",
+                lambda storage: storage.update_detection_coordinates(
+                    run_id, detection_id, pdf_coords_obj, image_coords
+                ),
+            )
+        )
+
+        return _queued(
+            detection_id,
+            pdfCoords=pdf_coords_obj.to_dict(),
+            imageCoords=image_coords.to_dict(),
         )
 
-        print(f"✅ Detection coordinates updated successfully")
+    except Exception as e:
+        log.exception("Failed to update detection coordinates")
+        return err(str(e), 500)
+
+
+@detection_updates_bp.route("/api/update_detection_coordinates_batch", methods=["POST"])
+def update_detection_coordinates_batch():
+    """
+    Update coordinates for several detections in one request.
+
+    Request Body:
+    {
+        "docId": "uuid",
+        "runId": "detection_run_uuid",
+        "edits": [
+            {"detectionId": "det_uuid", "pdfCoords": {...}},
+            ...
+        ]
+    }
+
+    Edits are grouped by page so each page's transform runs once over all of
+    its boxes, and every affected detections file is rewritten only once. The
+    write goes through the same queue as single edits, so it lands in order
+    with them.
+    """
+    try:
+        data = json_body()
+        if not data:
+            return err("No data received", 400)
+
+        doc_id = data.get("docId")
+        run_id = data.get("runId")
+        edits = data.get("edits")
+
+        if not all([doc_id, run_id, edits]):
+            return err("Missing required parameters", 400)
+
+        if not isinstance(edits, list):
+            return err("edits must be a list", 400)
+
+        for i, edit in enumerate(edits):
+            if not isinstance(edit, dict):
+                return err(f"Edit {i} must be an object", 400)
+            if not edit.get("detectionId") or not edit.get("pdfCoords"):
+                return err(f"Edit {i} is missing detectionId or pdfCoords", 400)
+            if not isinstance(edit["detectionId"], str):
+                return err(f"Edit {i} has a non-string detectionId", 400)
+
+        # Parse every edit's PDF box into one (N, 4) array up front
+        try:
+            pdf_boxes = np.stack(
+                [PDFCoordinates.array_from_dict(edit["pdfCoords"]) for edit in edits]
+            )
+        except ValueError as e:
+            return err(str(e), 400)
+
+        log.debug(
+            "Updating coordinates for %d detections in run %s", len(edits), run_id
+        )
 
-        return jsonify(
+        doc_dir = os.path.join(get_processed_folder(), doc_id)
+        doc_stat = _stat_or_none(doc_dir)
+        if doc_stat is None:
+            return err("Document not found", 404)
+
+        page_metadata_file = os.path.join(doc_dir, "page_metadata.json")
+        metadata_stat = _stat_or_none(page_metadata_file)
+        if metadata_stat is None:
+            return err("Page metadata not found", 404)
+
+        detection_storage = DetectionStorage(doc_dir, doc_dir_stat=doc_stat)
+        detections = detection_storage.load_detections_by_ids(
+            run_id, [edit["detectionId"] for edit in edits]
+        )
+        missing = [
+            e["detectionId"] for e in edits if e["detectionId"] not in detections
+        ]
+        if missing:
+            return err("Detection not found", 404, missing=missing)
+
+        # Group edits (as row indices into pdf_boxes) by page so each page's
+        # transformer is applied once
+        rows_by_page = defaultdict(list)
+        for row, edit in enumerate(edits):
+            page_num = detections[edit["detectionId"]].get("pageNumber", 1)
+            rows_by_page[page_num].append(row)
+
+        coordinate_updates = {}
+        for page_num, rows in rows_by_page.items():
+            page_boxes = pdf_boxes[rows]
+            transformer = _get_transformer(doc_dir, page_num, metadata_stat)
+            image_boxes = transformer.pdf_to_image_batch(page_boxes).tolist()
+            image_dpi = transformer.page_metadata.image_dpi
+
+            for row, pdf_box, image_box in zip(rows, page_boxes, image_boxes):
+                image_left, image_top, image_width, image_height = image_box
+                coordinate_updates[edits[row]["detectionId"]] = {
+                    "pdfCoords": PDFCoordinates.from_array(pdf_box).to_dict(),
+                    "imageCoords": ImageCoordinates(
+                        left=image_left,
+                        top=image_top,
+                        width=image_width,
+                        height=image_height,
+                        dpi=image_dpi,
+                    ).to_dict(),
+                }
+
+        _write_queue.put(
+            _StorageWrite(
+                doc_dir,
+                f"update coordinates of {len(coordinate_updates)} detections",
+                lambda storage: storage.update_detection_coordinates_bulk(
+                    run_id, coordinate_updates
+                ),
+            )
+        )
+
+        return json_response(
             {
                 "success": True,
-                "detectionId": detection_id,
-                "pdfCoords": pdf_coords_obj.to_dict(),
-                "imageCoords": image_coords.to_dict(),
-            }
+                "queued": True,
+                "updatedCount": len(coordinate_updates),
+                "detections": [
+                    {"detectionId": detection_id, **coordinates}
+                    for detection_id, coordinates in coordinate_updates.items()
+                ],
+            },
+            202,
         )
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to update detection coordinates: {e}")
-        import traceback
+        log.exception("Failed to update detection coordinates")
+        return err(str(e), 500)
 
-        traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
 
-
-@detection_updates_bp.route("/api/update_detection_status", methods=["POST", "OPTIONS"])
-@detection_updates_bp.route(
-    "/api/update_detection_status_simple", methods=["POST", "OPTIONS"]
-)
+@detection_updates_bp.route("/api/update_detection_status", methods=["POST"])
+@detection_updates_bp.route("/api/update_detection_status_simple", methods=["POST"])
 def update_detection_status():
     """
     Update the status of a detection (accept/reject/pending).
     """
-    print("\n--- Received request on /api/update_detection_status ---")
-
-    if request.method == "OPTIONS":
-        return "", 200
-
     try:
-        data = request.get_json()
+        data = json_body()
         if not data:
-            return jsonify({"error": "No data received"}), 400
+            return err("No data received", 400)
 
         # Extract parameters
         doc_id = data.get("docId")
@@ -154,35 +486,34 @@ def update_detection_status():
         detection_id = data.get("detectionId")
         new_status = data.get("status")  # "accepted", "rejected", "pending"
 
-        print(f"🔄 Updating detection status:")
-        print(f"   Document: {doc_id}")
-        print(f"   Run: {run_id}")
-        print(f"   Detection: {detection_id}")
-        print(f"   New status: {new_status}")
+        log.debug(
+            "Updating detection status: doc=%s run=%s detection=%s status=%s",
+            doc_id,
+            run_id,
+            detection_id,
+            new_status,
+        )
 
         if not all([doc_id, run_id, detection_id, new_status]):
-            return jsonify({"error": "Missing required parameters"}), 400
+            return err("Missing required parameters", 400)
 
         if new_status not in ["accepted", "rejected", "pending"]:
-            return jsonify({"error": "Invalid status"}), 400
+            return err("Invalid status", 400)
 
         # Get processed folder
-        from flask import current_app
-
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
-        if not os.path.exists(doc_dir):
-            return jsonify({"error": "Document not found"}), 404
+        if not os.path.isdir(doc_dir):
+            return err("Document not found", 404)
 
-        # Update detection status
-        detection_storage = DetectionStorage(doc_dir)
+        run_dir = os.path.join(doc_dir, "symbols", "detections", f"run_{run_id}")
+        if not os.path.isdir(run_dir):
+            return err("Detection run not found", 404)
 
-        updates = [
+        _queue_status_update(
+            doc_dir,
+            run_id,
             {
                 "detectionId": detection_id,
                 "action": (
@@ -191,39 +522,84 @@ def update_detection_status():
                     else "reject" if new_status == "rejected" else "pending"
                 ),
                 "reviewedBy": "user",  # Could be enhanced with user auth
-            }
-        ]
+            },
+        )
 
-        detection_storage.update_detection_status(run_id, updates)
+        return json_response(
+            {
+                "success": True,
+                "queued": True,
+                "detectionId": detection_id,
+                "status": new_status,
+            },
+            202,
+        )
 
-        print(f"✅ Detection status updated successfully")
+    except Exception as e:
+        log.exception("Failed to update detection status")
+        return err(str(e), 500)
 
-        return jsonify(
-            {"success": True, "detectionId": detection_id, "status": new_status}
-        )
+
+@detection_updates_bp.route("/api/flush_detection_status", methods=["POST"])
+def flush_detection_status():
+    """
+    Write any buffered status updates (and queued canvas edits) for a
+    document immediately.
+
+    Call this before navigating away from a run so that the stored results
+    reflect every accept/reject the user has made.
+    """
+    try:
+        data = json_body()
+        if not data:
+            return err("No data received", 400)
+
+        doc_id = data.get("docId")
+        run_id = data.get("runId")  # Optional: flush a single run
+
+        if not doc_id:
+            return err("Missing required parameters", 400)
+
+        flushed = _flush_pending_writes(doc_id, run_id)
+
+        log.debug("Flushed %d buffered detection status updates", flushed)
+
+        return ok(flushedCount=flushed)
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to update detection status: {e}")
-        import traceback
+        log.exception("Failed to flush detection status")
+        return err(str(e), 500)
+
+
+@detection_updates_bp.route("/api/detection_flush", methods=["POST"])
+def detection_flush():
+    """
+    Block until all queued detection writes have been applied.
+
+    Call this before reading detection results that must reflect the user's
+    latest canvas edits. Buffered status updates for the document (if docId
+    is given) are written as well.
+    """
+    try:
+        data = json_body() or {}
+        flushed = _flush_pending_writes(data.get("docId"))
 
-        traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return ok(flushedCount=flushed)
 
+    except Exception as e:
+        log.exception("Failed to flush detection writes")
+        return err(str(e), 500)
 
-@detection_updates_bp.route("/api/add_user_detection", methods=["POST", "OPTIONS"])
+
+@detection_updates_bp.route("/api/add_user_detection", methods=["POST"])
 def add_user_detection():
     """
     Add a new user-created detection to the canvas.
     """
-    print("\n--- Received request on /api/add_user_detection ---")
-
-    if request.method == "OPTIONS":
-        return "", 200
-
     try:
-        data = request.get_json()
+        data = json_body()
         if not data:
-            return jsonify({"error": "No data received"}), 400
+            return err("No data received", 400)
 
         # Extract parameters
         doc_id = data.get("docId")
@@ -232,133 +608,134 @@ def add_user_detection():
         pdf_coords = data.get("pdfCoords")
         page_number = data.get("pageNumber", 1)
 
-        print(f"➕ Adding user detection:")
-        print(f"   Document: {doc_id}")
-        print(f"   Run: {run_id}")
-        print(f"   Symbol: {symbol_id}")
-        print(f"   PDF coords: {pdf_coords}")
-        print(f"   Page: {page_number}")
+        log.debug(
+            "Adding user detection: doc=%s run=%s symbol=%s page=%s pdf=%s",
+            doc_id,
+            run_id,
+            symbol_id,
+            page_number,
+            pdf_coords,
+        )
 
         if not all([doc_id, run_id, symbol_id, pdf_coords]):
-            return jsonify({"error": "Missing required parameters"}), 400
+            return err("Missing required parameters", 400)
 
         # Get processed folder
-        from flask import current_app
-
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
-        if not os.path.exists(doc_dir):
-            return jsonify({"error": "Document not found"}), 404
-
-        # Create PDF coordinates object
-        pdf_coords_obj = PDFCoordinates(
-            left=pdf_coords["left_points"],
-            top=pdf_coords["top_points"],
-            width=pdf_coords["width_points"],
-            height=pdf_coords["height_points"],
-        )
+        if not os.path.isdir(doc_dir):
+            return err("Document not found", 404)
+
+        # Parse and validate the PDF coordinates once
+        try:
+            pdf_box = PDFCoordinates.array_from_dict(pdf_coords)
+        except ValueError as e:
+            return err(str(e), 400)
+        pdf_coords_obj = PDFCoordinates.from_array(pdf_box)
 
         # Load page metadata for coordinate transformation
         page_metadata_file = os.path.join(doc_dir, "page_metadata.json")
-        if not os.path.exists(page_metadata_file):
-            return jsonify({"error": "Page metadata not found"}), 404
-
-        with open(page_metadata_file, "r") as f:
-            page_metadata_dict = json.load(f)
-
-        page_metadata = PageMetadata.from_dict(
-            page_metadata_dict["pages"][str(page_number)]
+        metadata_stat = _stat_or_none(page_metadata_file)
+        if metadata_stat is None:
+            return err("Page metadata not found", 404)
+
+        symbol_file = os.path.join(
+            doc_dir,
+            "symbols",
+            "detections",
+            f"run_{run_id}",
+            f"symbol_{symbol_id}",
+            "detections.json",
         )
-        transformer = CoordinateTransformer(page_metadata)
+        if not os.path.exists(symbol_file):
+            return err(f"Symbol {symbol_id} not found in run {run_id}", 404)
+
+        transformer = _get_transformer(doc_dir, page_number, metadata_stat)
         image_coords = transformer.pdf_to_image(pdf_coords_obj)
 
-        # Add user detection
-        detection_storage = DetectionStorage(doc_dir)
-        detection_id = detection_storage.add_user_detection(
-            run_id, symbol_id, pdf_coords_obj, image_coords, page_number
+        # Add user detection; the ID is assigned here so it can be returned
+        # before the write happens
+        detection_id = f"user_{uuid.uuid4()}"
+        _write_queue.put(
+            _StorageWrite(
+                doc_dir,
+                f"add user detection {detection_id}",
+                lambda storage: storage.add_user_detection(
+                    run_id,
+                    symbol_id,
+                    pdf_coords_obj,
+                    image_coords,
+                    page_number,
+                    detection_id=detection_id,
+                ),
+            )
         )
 
-        print(f"✅ User detection added successfully: {detection_id}")
+        log.debug("User detection queued: %s", detection_id)
 
-        return jsonify(
-            {
-                "success": True,
-                "detectionId": detection_id,
-                "pdfCoords": pdf_coords_obj.to_dict(),
-                "imageCoords": image_coords.to_dict(),
-            }
+        return _queued(
+            detection_id,
+            pdfCoords=pdf_coords_obj.to_dict(),
+            imageCoords=image_coords.to_dict(),
         )
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to add user detection: {e}")
-        import traceback
+        log.exception("Failed to add user detection")
+        return err(str(e), 500)
 
-        traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
 
-
-@detection_updates_bp.route("/api/delete_detection", methods=["POST", "OPTIONS"])
+@detection_updates_bp.route("/api/delete_detection", methods=["POST"])
 def delete_detection():
     """
     Delete a detection from the canvas.
     """
-    print("\n--- Received request on /api/delete_detection ---")
-
-    if request.method == "OPTIONS":
-        return "", 200
-
     try:
-        data = request.get_json()
+        data = json_body()
         if not data:
-            return jsonify({"error": "No data received"}), 400
+            return err("No data received", 400)
 
         # Extract parameters
         doc_id = data.get("docId")
         run_id = data.get("runId")
         detection_id = data.get("detectionId")
 
-        print(f"🗑️ Deleting detection:")
-        print(f"   Document: {doc_id}")
-        print(f"   Run: {run_id}")
-        print(f"   Detection: {detection_id}")
+        log.debug(
+            "Deleting detection: doc=%s run=%s detection=%s",
+            doc_id,
+            run_id,
+            detection_id,
+        )
 
         if not all([doc_id, run_id, detection_id]):
-            return jsonify({"error": "Missing required parameters"}), 400
+            return err("Missing required parameters", 400)
 
         # Get processed folder
-        from flask import current_app
-
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
-        if not os.path.exists(doc_dir):
-            return jsonify({"error": "Document not found"}), 404
+        doc_stat = _stat_or_none(doc_dir)
+        if doc_stat is None:
+            return err("Document not found", 404)
+
+        detection_storage = DetectionStorage(doc_dir, doc_dir_stat=doc_stat)
+        if not detection_storage.load_detection_by_id(run_id, detection_id):
+            return err("Detection not found", 404)
 
         # Delete detection
-        detection_storage = DetectionStorage(doc_dir)
-        success = detection_storage.delete_detection(run_id, detection_id)
+        _write_queue.put(
+            _StorageWrite(
+                doc_dir,
+                f"delete detection {detection_id}",
+                lambda storage: storage.delete_detection(run_id, detection_id),
+            )
+        )
 
-        if success:
-            print(f"✅ Detection deleted successfully")
-            return jsonify({"success": True, "detectionId": detection_id})
-        else:
-            return jsonify({"error": "Detection not found"}), 404
+        return _queued(detection_id)
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to delete detection: {e}")
-        import traceback
-
-        traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        log.exception("Failed to delete detection")
+        return err(str(e), 500)
 
 
 @detection_updates_bp.route(
@@ -370,33 +747,39 @@ def get_page_image(doc_id, page_number):
     """
     try:
         # Get processed folder
-        from flask import current_app
-
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
-        if not os.path.exists(doc_dir):
-            return jsonify({"error": "Document not found"}), 404
 
-        # Look for page image
+        # Documents ingested with a page image index answer from the cached
+        # page_metadata.json without any per-request path work
+        page_metadata_file = os.path.join(doc_dir, "page_metadata.json")
+        metadata_stat = _stat_or_none(page_metadata_file)
+        if metadata_stat is not None:
+            page_images = load_json(
+                page_metadata_file, file_version(metadata_stat)
+            ).get("page_images")
+            if page_images and str(page_number) in page_images:
+                return json_response({"imagePath": page_images[str(page_number)]})
+
+        # Older documents: look for the page image; the document directory is
+        # only checked when the image is missing, to choose the right error
         page_image_path = os.path.join(
             doc_dir, f"page_{page_number}", f"page_{page_number}_pixmap.png"
         )
 
         if not os.path.exists(page_image_path):
-            return jsonify({"error": "Page image not found"}), 404
+            if not os.path.isdir(doc_dir):
+                return err("Document not found", 404)
+            return err("Page image not found", 404)
 
         # Return image path (relative to processed folder for frontend)
         relative_path = os.path.relpath(page_image_path, processed_folder)
 
-        return jsonify(
+        return json_response(
             {"imagePath": f"/data/processed/{relative_path.replace(os.sep, '/')}"}
         )
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to get page image: {e}")
-        return jsonify({"error": str(e)}), 500
+        log.exception("Failed to get page image")
+        return err(str(e), 500)
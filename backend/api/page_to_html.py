@@ -1,73 +1,170 @@
 import os
 import asyncio
-import json
+import hashlib
+import logging
 import time
 import random
-from flask import Blueprint, request, jsonify, Response
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, Response, send_file
 from utils.page_to_html_pipeline import PageToHTMLPipeline, PageToHTMLConfig
+from utils.file_cache import load_json_cached, read_text_cached
+from utils.json_io import sse_event, write_json_gz
+from api.responses import json_body, json_response, err, get_processed_folder
+
+try:
+    # Under gevent workers this yields to other greenlets instead of pinning
+    # the worker for the whole simulated processing window.
+    from gevent import sleep as _sleep
+except ImportError:
+    from time import sleep as _sleep
+
+log = logging.getLogger(__name__)
+
+# Page HTML files are read off the request thread so disk I/O overlaps the
+# simulated processing delays instead of adding to them. Contents are cached by
+# mtime, so replaying a simulation does not touch the disk again.
+_html_read_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="page-html")
+
+
+def _read_page_html(doc_dir, page_num):
+    """Return the HTML for a page, or None if it has not been generated."""
+    html_file = os.path.join(doc_dir, f"page_{page_num}", f"page_{page_num}.html")
+    try:
+        return read_text_cached(html_file)
+    except FileNotFoundError:
+        return None
 
 
 # Create blueprint for page-to-HTML endpoints
 page_to_html_bp = Blueprint("page_to_html", __name__)
 
+# Pipeline coroutines run on one long-lived event loop owned by a background
+# thread, so the LLM clients they use can be reused across requests instead of
+# being rebuilt around a fresh loop each time. Blocking steps (PDF rendering,
+# synchronous SDK calls) are moved off the loop by the pipeline itself.
+_pipeline_loop = None
+
+# LLM interfaces (and the SDK clients they hold) by provider, model and a
+# digest of the API key; pipelines themselves are cheap and built per request
+_LLM_INTERFACE_CACHE_SIZE = 8
+_llm_interfaces = OrderedDict()
+_llm_interfaces_lock = threading.Lock()
+
+
+@page_to_html_bp.record_once
+def _start_pipeline_loop(state):
+    global _pipeline_loop
+    _pipeline_loop = asyncio.new_event_loop()
+    threading.Thread(
+        target=_pipeline_loop.run_forever, name="page-to-html-loop", daemon=True
+    ).start()
+
 
-@page_to_html_bp.route("/api/simulate_pdf_to_html/<doc_id>", methods=["GET", "OPTIONS"])
+def _get_pipeline(config):
+    """Build a pipeline for a request, reusing a cached LLM interface."""
+    api_key = {
+        "gemini": config.gemini_api_key,
+        "openai": config.openai_api_key,
+        "claude": config.anthropic_api_key,
+    }.get(config.llm_provider)
+    key_digest = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    key = (config.llm_provider, config.llm_model, key_digest)
+
+    with _llm_interfaces_lock:
+        llm_interface = _llm_interfaces.get(key)
+        if llm_interface is not None:
+            _llm_interfaces.move_to_end(key)
+            return PageToHTMLPipeline(config, llm_interface)
+
+    pipeline = PageToHTMLPipeline(config)
+
+    with _llm_interfaces_lock:
+        _llm_interfaces[key] = pipeline.llm_interface
+        _llm_interfaces.move_to_end(key)
+        while len(_llm_interfaces) > _LLM_INTERFACE_CACHE_SIZE:
+            _llm_interfaces.popitem(last=False)
+
+    return pipeline
+
+
+@page_to_html_bp.route("/api/simulate_pdf_to_html/<doc_id>", methods=["GET"])
 def simulate_pdf_to_html(doc_id):
     """
     Simulate the PDF-to-HTML pipeline using pre-existing results.
     This endpoint streams results in real-time to simulate async processing.
     """
-    print(f"\n--- Simulating PDF-to-HTML pipeline for doc: {doc_id} ---")
-
-    # Handle preflight OPTIONS request
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request for simulation")
-        return "", 200
+    # Resolve paths while the request context is still active; the generator
+    # body runs after the view function has returned.
+    doc_dir = os.path.join(get_processed_folder(), doc_id)
 
     def generate_simulation():
         try:
             # Check if document exists
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
-            doc_dir = os.path.join(processed_folder, doc_id)
-
             if not os.path.exists(doc_dir):
-                yield f"data: {json.dumps({'error': f'Document {doc_id} not found'})}\n\n"
+                yield sse_event({"error": f"Document {doc_id} not found"})
                 return
 
             # Load existing results to determine page count
             results_file = os.path.join(doc_dir, "page_to_html_results.json")
             if not os.path.exists(results_file):
-                yield f"data: {json.dumps({'error': f'No results found for document {doc_id}'})}\n\n"
+                yield sse_event({"error": f"No results found for document {doc_id}"})
                 return
 
-            with open(results_file, "r") as f:
-                existing_results = json.load(f)
+            existing_results = load_json_cached(results_file)
 
             total_pages = existing_results.get("pdf_processing", {}).get(
                 "totalPages", 0
             )
 
             # Send initial status
-            yield f"data: {json.dumps({'type': 'status', 'message': f'Starting simulation for {total_pages} pages'})}\n\n"
-            time.sleep(0.5)
+            yield sse_event(
+                {
+                    "type": "status",
+                    "message": f"Starting simulation for {total_pages} pages",
+                }
+            )
+            _sleep(0.5)
 
             # Simulate async processing - start all pages with random completion times
             page_completion_times = {}
             start_time = time.time()
 
             # Generate random completion times for each page (3s to 8s)
-            for page_num in range(1, total_pages + 1):
-                completion_time = random.uniform(3, 8)
+            estimated_times = {
+                page_num: random.uniform(3, 8) for page_num in range(1, total_pages + 1)
+            }
+            for page_num, completion_time in estimated_times.items():
                 page_completion_times[page_num] = start_time + completion_time
 
-                yield f"data: {json.dumps({'type': 'page_start', 'page': page_num, 'estimated_time': completion_time})}\n\n"
+            # All page_start events go out together as a single chunk
+            yield b"".join(
+                sse_event(
+                    {
+                        "type": "page_start",
+                        "page": page_num,
+                        "estimated_time": completion_time,
+                    }
+                )
+                for page_num, completion_time in estimated_times.items()
+            )
 
             # Sort pages by completion time to process them in the order they "finish"
             sorted_pages = sorted(page_completion_times.items(), key=lambda x: x[1])
 
-            print(f"   📋 Page completion order: {[page for page, _ in sorted_pages]}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    "Simulated page completion order for %s: %s",
+                    doc_id,
+                    [page for page, _ in sorted_pages],
+                )
+
+            # Start every page read now; each one is collected when its page "finishes"
+            html_reads = {
+                page_num: _html_read_pool.submit(_read_page_html, doc_dir, page_num)
+                for page_num, _ in sorted_pages
+            }
 
             # Process pages as they "complete" in async order
             for page_num, completion_time in sorted_pages:
@@ -75,36 +172,34 @@ def simulate_pdf_to_html(doc_id):
                 current_time = time.time()
                 wait_time = completion_time - current_time
                 if wait_time > 0:
-                    time.sleep(wait_time)
-
-                # Check if HTML file exists
-                html_file = os.path.join(
-                    doc_dir, f"page_{page_num}", f"page_{page_num}.html"
-                )
-                if os.path.exists(html_file):
-                    with open(html_file, "r", encoding="utf-8") as f:
-                        html_content = f.read()
+                    _sleep(wait_time)
 
+                html_content = html_reads.pop(page_num).result()
+                if html_content is not None:
                     actual_processing_time = time.time() - start_time
-                    yield f"data: {json.dumps({
-                        'type': 'page_complete', 
-                        'page': page_num, 
-                        'html_content': html_content,
-                        'processing_time': actual_processing_time
-                    })}\n\n"
+                    yield sse_event(
+                        {
+                            "type": "page_complete",
+                            "page": page_num,
+                            "html_content": html_content,
+                            "processing_time": actual_processing_time,
+                        }
+                    )
                 else:
-                    yield f"data: {json.dumps({
-                        'type': 'page_error', 
-                        'page': page_num, 
-                        'error': f'HTML file not found for page {page_num}'
-                    })}\n\n"
+                    yield sse_event(
+                        {
+                            "type": "page_error",
+                            "page": page_num,
+                            "error": f"HTML file not found for page {page_num}",
+                        }
+                    )
 
             # Send completion status
-            yield f"data: {json.dumps({'type': 'complete', 'total_pages': total_pages})}\n\n"
+            yield sse_event({"type": "complete", "total_pages": total_pages})
 
         except Exception as e:
-            print(f"Error in simulation: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            log.exception("Error in PDF-to-HTML simulation for %s", doc_id)
+            yield sse_event({"type": "error", "message": str(e)})
 
     return Response(
         generate_simulation(),
@@ -119,29 +214,22 @@ def simulate_pdf_to_html(doc_id):
     )
 
 
-@page_to_html_bp.route("/api/process_pdf_to_html", methods=["POST", "OPTIONS"])
+@page_to_html_bp.route("/api/process_pdf_to_html", methods=["POST"])
 def process_pdf_to_html():
     """
     Process a PDF document through the page-to-HTML pipeline.
     Supports both testing mode and production mode with configurable LLM providers.
     """
-    print("\n--- Received request on /api/process_pdf_to_html ---")
-
-    # Handle preflight OPTIONS request
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request for page-to-HTML")
-        return "", 200
-
     try:
-        data = request.get_json()
+        data = json_body()
 
         if not data:
-            return jsonify({"error": "No data received"}), 400
+            return err("No data received", 400)
 
         # Get required parameters
         doc_id = data.get("docId")
         if not doc_id:
-            return jsonify({"error": "Document ID is required"}), 400
+            return err("Document ID is required", 400)
 
         # Get configuration parameters
         config_data = data.get("config", {})
@@ -157,72 +245,74 @@ def process_pdf_to_html():
             "ANTHROPIC_API_KEY"
         )
 
+        try:
+            dpi = int(config_data.get("dpi", 300))
+            high_res_dpi = int(config_data.get("high_res_dpi", 300))
+            max_concurrent_requests = int(config_data.get("max_concurrent_requests", 7))
+        except (TypeError, ValueError):
+            return err(
+                "dpi, high_res_dpi and max_concurrent_requests must be integers", 400
+            )
+
+        llm_provider = config_data.get("llm_provider", "mock")
+        llm_model = config_data.get("llm_model")
+        if not isinstance(llm_provider, str) or not isinstance(
+            llm_model, (str, type(None))
+        ):
+            return err("llm_provider and llm_model must be strings", 400)
+
         config = PageToHTMLConfig(
-            llm_provider=config_data.get("llm_provider", "mock"),
-            llm_model=config_data.get("llm_model"),
-            dpi=config_data.get("dpi", 300),
-            high_res_dpi=config_data.get("high_res_dpi", 300),
-            max_concurrent_requests=config_data.get("max_concurrent_requests", 7),
+            llm_provider=llm_provider,
+            llm_model=llm_model,
+            dpi=dpi,
+            high_res_dpi=high_res_dpi,
+            max_concurrent_requests=max_concurrent_requests,
             gemini_api_key=gemini_api_key,
             openai_api_key=openai_api_key,
             anthropic_api_key=anthropic_api_key,
         )
 
-        print(f"🚀 Processing PDF to HTML for document: {doc_id}")
-        print(f"   Config: {config.llm_provider} provider")
+        log.info(
+            "Processing PDF to HTML for document %s with %s provider",
+            doc_id,
+            config.llm_provider,
+        )
 
         # Determine paths
-        processed_folder = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-        )
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
 
         # Check if document exists
         if not os.path.exists(doc_dir):
-            return jsonify({"error": f"Document {doc_id} not found"}), 404
+            return err(f"Document {doc_id} not found", 404)
 
         # Check for original PDF
         original_pdf_path = os.path.join(doc_dir, "original.pdf")
         if not os.path.exists(original_pdf_path):
-            return (
-                jsonify({"error": f"Original PDF not found for document {doc_id}"}),
-                404,
-            )
-
-        # Run the pipeline
-        pipeline = PageToHTMLPipeline(config)
+            return err(f"Original PDF not found for document {doc_id}", 404)
 
-        # Since Flask doesn't natively support async, we need to run the async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            results = loop.run_until_complete(
-                pipeline.process_pdf_to_html(original_pdf_path, doc_dir, doc_id)
-            )
-        finally:
-            loop.close()
+        # Run the pipeline on the shared background loop
+        pipeline = _get_pipeline(config)
+        future = asyncio.run_coroutine_threadsafe(
+            pipeline.process_pdf_to_html(original_pdf_path, doc_dir, doc_id),
+            _pipeline_loop,
+        )
+        results = future.result()
 
-        print(f"✅ Pipeline processing complete for {doc_id}")
+        log.info("Pipeline processing complete for %s", doc_id)
 
-        return (
-            jsonify(
-                {
-                    "message": "PDF processed to HTML successfully",
-                    "docId": doc_id,
-                    "results": results,
-                }
-            ),
-            200,
+        return json_response(
+            {
+                "message": "PDF processed to HTML successfully",
+                "docId": doc_id,
+                "results": results,
+            }
         )
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to process PDF to HTML: {e}")
-        import traceback
-
-        traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        log.exception("Failed to process PDF to HTML")
+        return err(str(e), 500)
 
 
 @page_to_html_bp.route("/api/load_html_results/<doc_id>", methods=["GET"])
@@ -230,86 +320,126 @@ def load_html_results(doc_id):
     """
     Load the results from a previous page-to-HTML processing run.
     """
-    print(f"\n--- Loading HTML results for document: {doc_id} ---")
-
     try:
-        processed_folder = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-        )
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
         results_file = os.path.join(doc_dir, "page_to_html_results.json")
 
-        if not os.path.exists(results_file):
-            print(f"   ⚠️  No HTML results found for document {doc_id}")
-            return (
-                jsonify(
-                    {
-                        "docId": doc_id,
-                        "results": None,
-                        "message": "No HTML processing results found",
-                    }
-                ),
-                200,
+        try:
+            results_mtime_ns = os.stat(results_file).st_mtime_ns
+        except FileNotFoundError:
+            log.debug("No HTML results found for document %s", doc_id)
+            return json_response(
+                {
+                    "docId": doc_id,
+                    "results": None,
+                    "message": "No HTML processing results found",
+                }
             )
 
-        import json
+        if request.accept_encodings["gzip"]:
+            # The compressed response body is written next to the results file
+            # by the pipeline. It is rebuilt here only when missing or older
+            # than the results (documents processed before it was written).
+            gz_file = results_file + ".gz"
+            try:
+                gz_stale = os.stat(gz_file).st_mtime_ns < results_mtime_ns
+            except FileNotFoundError:
+                gz_stale = True
+            if gz_stale:
+                results = load_json_cached(results_file)
+                write_json_gz(gz_file, {"docId": doc_id, "results": dict(results)})
 
-        with open(results_file, "r") as f:
-            results = json.load(f)
+            response = send_file(gz_file, mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
 
-        print(f"   ✅ Loaded HTML results for {doc_id}")
+        results = load_json_cached(results_file)
 
-        return jsonify({"docId": doc_id, "results": results}), 200
+        return json_response({"docId": doc_id, "results": dict(results)})
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to load HTML results: {e}")
-        return jsonify({"error": str(e)}), 500
+        log.exception("Failed to load HTML results")
+        return err(str(e), 500)
+
+
+def _page_html_path(doc_id, page_number):
+    return os.path.join(
+        get_processed_folder(),
+        doc_id,
+        f"page_{page_number}",
+        f"page_{page_number}.html",
+    )
 
 
 @page_to_html_bp.route("/api/get_page_html/<doc_id>/<int:page_number>", methods=["GET"])
 def get_page_html(doc_id, page_number):
     """
     Get the HTML content for a specific page.
-    """
-    print(f"\n--- Getting HTML for document {doc_id}, page {page_number} ---")
 
+    The file is sent as-is (text/html) with an ETag derived from its mtime and
+    size, so unchanged pages are answered with 304 Not Modified. Document and
+    page identifiers are returned in the X-Doc-Id / X-Page-Number headers.
+    """
     try:
-        processed_folder = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
+        html_file = _page_html_path(doc_id, page_number)
+
+        try:
+            st = os.stat(html_file)
+        except FileNotFoundError:
+            return err(
+                f"HTML file not found for document {doc_id}, page {page_number}", 404
+            )
+
+        response = send_file(
+            html_file,
+            mimetype="text/html",
+            etag=f"{st.st_mtime_ns:x}-{st.st_size:x}",
+            max_age=0,
+            conditional=True,
         )
+        response.cache_control.public = True
+        response.cache_control.must_revalidate = True
+        response.headers["X-Doc-Id"] = doc_id
+        response.headers["X-Page-Number"] = str(page_number)
+        return response
 
-        doc_dir = os.path.join(processed_folder, doc_id)
-        page_dir = os.path.join(doc_dir, f"page_{page_number}")
-        html_file = os.path.join(page_dir, f"page_{page_number}.html")
+    except Exception as e:
+        log.exception("Failed to get page HTML")
+        return err(str(e), 500)
+
+
+@page_to_html_bp.route(
+    "/api/get_page_html_json/<doc_id>/<int:page_number>", methods=["GET"]
+)
+def get_page_html_json(doc_id, page_number):
+    """
+    Get the HTML content for a specific page wrapped in JSON.
+
+    Legacy response shape of /api/get_page_html, kept for existing callers.
+    """
+    try:
+        html_file = _page_html_path(doc_id, page_number)
 
         if not os.path.exists(html_file):
-            return (
-                jsonify(
-                    {
-                        "error": f"HTML file not found for document {doc_id}, page {page_number}"
-                    }
-                ),
-                404,
+            return err(
+                f"HTML file not found for document {doc_id}, page {page_number}", 404
             )
 
         with open(html_file, "r", encoding="utf-8") as f:
             html_content = f.read()
 
-        print(f"   ✅ Loaded HTML content for page {page_number}")
-
-        return (
-            jsonify(
-                {
-                    "docId": doc_id,
-                    "pageNumber": page_number,
-                    "htmlContent": html_content,
-                    "htmlFilePath": html_file,
-                }
-            ),
-            200,
+        return json_response(
+            {
+                "docId": doc_id,
+                "pageNumber": page_number,
+                "htmlContent": html_content,
+                "htmlFilePath": html_file,
+            }
         )
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to get page HTML: {e}")
-        return jsonify({"error": str(e)}), 500
+        log.exception("Failed to get page HTML")
+        return err(str(e), 500)
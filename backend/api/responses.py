@@ -0,0 +1,67 @@
+"""
+Request/response helpers shared by the API blueprints.
+
+Bodies are encoded through utils.json_io (orjson when it is installed), which
+is much cheaper than jsonify for the small, fixed-shape payloads returned by
+the interactive canvas endpoints.
+"""
+
+import os
+from functools import lru_cache
+
+from flask import Response, current_app, request
+from werkzeug.exceptions import BadRequest
+
+from utils.json_io import dumps, loads
+
+JSON_MIMETYPE = "application/json"
+
+_DEFAULT_PROCESSED = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
+)
+
+
+def get_processed_folder():
+    """Processed-data root, preferring the app's configured PROCESSED_FOLDER."""
+    return current_app.config.get("PROCESSED_FOLDER") or _DEFAULT_PROCESSED
+
+
+def json_response(payload, status=200):
+    """Encode a payload as a JSON response."""
+    return Response(dumps(payload), status=status, mimetype=JSON_MIMETYPE)
+
+
+def ok(**fields):
+    """Success response: {"success": true, **fields}."""
+    return json_response({"success": True, **fields})
+
+
+@lru_cache(maxsize=64)
+def _error_body(message):
+    # Most handlers return a handful of fixed messages; encode each once.
+    return dumps({"error": message})
+
+
+def err(message, status, **fields):
+    """Error response: {"error": message, **fields} with the given status."""
+    if fields:
+        body = dumps({"error": message, **fields})
+    else:
+        body = _error_body(message)
+    return Response(body, status=status, mimetype=JSON_MIMETYPE)
+
+
+def json_body():
+    """
+    Parse the request body as JSON, or return None if the body is empty.
+
+    Unlike request.get_json() this does not check the Content-Type and parses
+    with orjson when it is available. Malformed JSON raises BadRequest.
+    """
+    data = request.get_data(cache=False)
+    if not data:
+        return None
+    try:
+        return loads(data)
+    except ValueError as e:
+        raise BadRequest(f"Failed to decode JSON object: {e}")
@@ -1,15 +1,17 @@
 import os
-import json
+import re
+import logging
+import queue
 import uuid
-from dataclasses import dataclass
-from flask import Blueprint, request, jsonify
-import fitz  # PyMuPDF
-from PIL import Image
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import astuple, dataclass
+from datetime import datetime, timezone
+from flask import Blueprint, Response, current_app, send_file
+import numpy as np
+from PIL import Image, features
 import io
-import sys
-import os
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.coordinate_mapping import (
     PDFCoordinates,
     CanvasCoordinates,
@@ -18,13 +20,142 @@ from utils.coordinate_mapping import (
     PageMetadata,
     HIGH_RES_DPI,
 )
-from utils.symbol_dimensions import SymbolDimensionCalculator
+from utils.symbol_dimensions import (
+    SymbolDimensionCalculator,
+    calculate_dimensions_from_pdf_file,
+    render_pdf_region,
+)
+from utils.atomic_write import write_file_atomic
+from utils.file_cache import FileVersion, file_version, load_json
+from utils.json_io import dumps, dumps_with_encoded
+from utils.process_pool import get_process_pool
+from api.responses import json_body, json_response, err, get_processed_folder
 
 # Create blueprint for symbol annotation API
 symbol_annotation_bp = Blueprint("symbol_annotation", __name__)
 
+log = logging.getLogger(__name__)
+
+# Symbols are cropped, encoded and templated in parallel; PNG encoding and the
+# OpenCV template work release the GIL, so threads overlap well here.
+_symbol_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="symbol-clip"
+)
+
+# Stateless; shared by every request and symbol worker
+_dimension_calculator = SymbolDimensionCalculator()
+
+
+# Symbol image encodings, selected with the SYMBOL_IMAGE_FORMAT config key.
+# Both are lossless and tuned for speed: the images are small, so encoder
+# effort costs far more time than it saves bytes.
+_SYMBOL_IMAGE_FORMATS = {
+    "WEBP": (".webp", {"format": "WEBP", "lossless": True, "method": 0, "quality": 0}),
+    "PNG": (".png", {"format": "PNG", "compress_level": 1, "optimize": False}),
+}
+DEFAULT_SYMBOL_IMAGE_FORMAT = "WEBP"
+
+
+# Symbol images, templates and symbols_metadata.json are written by one
+# background thread while the request is still cropping and encoding later
+# symbols. Writes land in submission order, so a request's metadata file is
+# only replaced once every image it lists is on disk. Items are
+# (path, data, durable, batch): durable files are replaced atomically and
+# fsynced afterwards, and the request waits on its batch before responding.
+_file_write_queue: "queue.Queue[tuple]" = queue.Queue()
+
+
+class _WriteBatch:
+    """Files queued by one request, so it can wait for them to be written."""
+
+    def __init__(self):
+        self._pending = 0
+        self._error = None
+        self._done = threading.Condition()
 
-@dataclass
+    def put(self, path: str, data: bytes, durable: bool = False) -> None:
+        with self._done:
+            self._pending += 1
+        _file_write_queue.put((path, data, durable, self))
+
+    def failed(self) -> bool:
+        return self._error is not None
+
+    def finish(self, error: Exception = None) -> None:
+        with self._done:
+            self._pending -= 1
+            if error is not None and self._error is None:
+                self._error = error
+            self._done.notify_all()
+
+    def wait(self) -> None:
+        """Block until every file is written; raise the first write error."""
+        with self._done:
+            self._done.wait_for(lambda: self._pending == 0)
+        if self._error is not None:
+            raise self._error
+
+
+def _fsync_path(path: str) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def _file_write_worker():
+    while True:
+        path, data, durable, batch = _file_write_queue.get()
+        try:
+            # A failed write leaves the rest of its request unwritten, so the
+            # old metadata file is never replaced by one listing missing images
+            if batch.failed():
+                batch.finish()
+                continue
+            try:
+                if durable:
+                    write_file_atomic(path, data)
+                else:
+                    with open(path, "wb") as f:
+                        f.write(data)
+            except Exception as e:
+                log.exception("Queued write failed: %s", path)
+                batch.finish(e)
+                continue
+            batch.finish()
+            if durable:
+                # After the waiting request has been released
+                _fsync_path(path)
+        except Exception:
+            log.exception("Failed to fsync %s", path)
+        finally:
+            _file_write_queue.task_done()
+
+
+@symbol_annotation_bp.record_once
+def _start_file_write_worker(state):
+    threading.Thread(
+        target=_file_write_worker, name="symbol-writes", daemon=True
+    ).start()
+
+
+def _encode_image(array: np.ndarray, **save_options) -> bytes:
+    """Encode an image array in memory for the file write queue."""
+    buffer = io.BytesIO()
+    Image.fromarray(array).save(buffer, **save_options)
+    return buffer.getvalue()
+
+
+def _symbol_image_format(config) -> str:
+    """Configured symbol image format, falling back to PNG without libwebp."""
+    image_format = config.get("SYMBOL_IMAGE_FORMAT", DEFAULT_SYMBOL_IMAGE_FORMAT)
+    image_format = image_format.upper()
+    if image_format not in _SYMBOL_IMAGE_FORMATS:
+        raise ValueError(f"Unsupported SYMBOL_IMAGE_FORMAT: {image_format}")
+    if image_format == "WEBP" and not features.check("webp"):
+        return "PNG"
+    return image_format
+
+
+@dataclass(slots=True)
 class SymbolAnnotation:
     """Complete symbol annotation with all coordinate systems"""
 
@@ -41,6 +172,8 @@ class SymbolAnnotation:
     clipping_coords: ClippingCoordinates  # Position within legend clipping
     canvas_coords: CanvasCoordinates  # UI annotation coordinates
 
+    image_format: str = "PNG"  # Encoding of the saved symbol image
+
     def to_dict(self) -> dict:
         return {
             "id": self.id,
@@ -58,96 +191,237 @@ class SymbolAnnotation:
             "image_info": {
                 "width": self.clipping_coords.width_pixels,
                 "height": self.clipping_coords.height_pixels,
-                "format": "PNG",
+                "format": self.image_format,
             },
         }
 
 
-@symbol_annotation_bp.route("/api/save_symbol_clippings", methods=["POST", "OPTIONS"])
+# Characters dropped from symbol names to build file names: anything but
+# letters, digits, "_", "-" and spaces (\w matches exactly what str.isalnum
+# accepts, plus "_")
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w \-]+")
+
+
+def _safe_filename(symbol_name: str) -> str:
+    """File name stem for a symbol: "Outlet (GFI)" -> "Outlet_GFI"."""
+    return _UNSAFE_NAME_CHARS.sub("", symbol_name).rstrip().replace(" ", "_")
+
+
+# Image modes that round-trip through a NumPy array unchanged
+_ARRAY_MODES = ("L", "LA", "RGB", "RGBA")
+
+
+def _load_legend_array(path: str) -> np.ndarray:
+    """
+    Decode a legend clipping into an (H, W[, C]) uint8 array.
+
+    Clippings are decoded in their stored mode; only palette and other modes
+    that do not map onto a plain array are converted, once per file.
+    """
+    with Image.open(path) as image:
+        if image.format == "JPEG":
+            # Let libjpeg emit the target mode directly. The size is kept as-is:
+            # symbol boxes are in clipping pixels, so no reduced-scale decode.
+            draft_mode = image.mode if image.mode in _ARRAY_MODES else "RGB"
+            image.draft(draft_mode, image.size)
+        if image.mode not in _ARRAY_MODES:
+            has_alpha = image.mode == "P" and "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        array = np.asarray(image)
+
+    assert array.dtype == np.uint8, f"unexpected legend image mode for {path}"
+    # Cached arrays are shared between requests and symbol workers
+    array.setflags(write=False)
+    return array
+
+
+# Decoded legend clippings are reused across requests (users typically save a
+# legend's symbols several times while annotating). Keyed by path and
+# file_version so a re-exported clipping is decoded again; bounded by total
+# array size.
+_LEGEND_CACHE_BYTES = 256 * 1024 * 1024
+_legend_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_legend_cache_bytes = 0
+_legend_cache_lock = threading.Lock()
+
+
+def _get_legend_array(path: str, version: FileVersion) -> np.ndarray:
+    """Return the decoded legend clipping at path, decoding it on a cache miss."""
+    global _legend_cache_bytes
+    key = (path, version)
+
+    with _legend_cache_lock:
+        array = _legend_cache.get(key)
+        if array is not None:
+            _legend_cache.move_to_end(key)
+            return array
+
+    array = _load_legend_array(path)
+
+    with _legend_cache_lock:
+        if key not in _legend_cache:
+            _legend_cache[key] = array
+            _legend_cache_bytes += array.nbytes
+        _legend_cache.move_to_end(key)
+        while _legend_cache_bytes > _LEGEND_CACHE_BYTES and len(_legend_cache) > 1:
+            _, evicted = _legend_cache.popitem(last=False)
+            _legend_cache_bytes -= evicted.nbytes
+
+    return array
+
+
+def _uuid4_batch(count: int) -> list:
+    """Generate count random (version 4) UUID strings from one urandom read."""
+    raw = os.urandom(16 * count)
+    return [
+        str(uuid.UUID(bytes=raw[offset : offset + 16], version=4))
+        for offset in range(0, 16 * count, 16)
+    ]
+
+
+def _clamp_to_image(boxes: np.ndarray, width: int, height: int):
+    """
+    Clamp [left, top, width, height] pixel boxes to an image of the given size.
+
+    Only boxes that extend past the image are changed; in-bounds boxes are
+    returned untouched. Returns (boxes, out_of_bounds mask).
+    """
+    left, top, box_width, box_height = boxes.T
+    out_of_bounds = (
+        (left < 0)
+        | (top < 0)
+        | (left + box_width > width)
+        | (top + box_height > height)
+    )
+
+    clamped_left = np.clip(left, 0, width - 1)
+    clamped_top = np.clip(top, 0, height - 1)
+    clamped = np.stack(
+        [
+            clamped_left,
+            clamped_top,
+            np.clip(box_width, 1, width - clamped_left),
+            np.clip(box_height, 1, height - clamped_top),
+        ],
+        axis=1,
+    )
+    return np.where(out_of_bounds[:, None], clamped, boxes), out_of_bounds
+
+
+def _contains(outer: PDFCoordinates, inner: PDFCoordinates) -> bool:
+    """Whether the inner PDF rectangle lies entirely within the outer one."""
+    return (
+        inner.left >= outer.left
+        and inner.top >= outer.top
+        and inner.left + inner.width <= outer.left + outer.width
+        and inner.top + inner.height <= outer.top + outer.height
+    )
+
+
+# Constant tail of symbols_metadata.json
+_PROCESSING_INFO_JSON = dumps(
+    {
+        "version": "1.0",
+        "coordinate_systems": [
+            "legend_relative: coordinates within the legend clipping image",
+            "canvas_absolute: coordinates in the original page canvas",
+            "pdf_absolute: coordinates in the original PDF (points)",
+        ],
+    }
+)
+
+
+@symbol_annotation_bp.route("/api/save_symbol_clippings", methods=["POST"])
 def save_symbol_clippings():
     """
     Save individual symbol clippings from Symbol Legend annotations.
     Each symbol becomes its own image file with metadata linking back to the original PDF coordinates.
     """
-    print("\n--- Received request on /api/save_symbol_clippings ---")
-
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request for symbol clippings")
-        return "", 200
-
     try:
-        data = request.get_json()
-        pdf_document = None  # Initialize to handle cleanup on errors
+        data = json_body()
 
         if not data:
-            return jsonify({"error": "No data received"}), 400
+            return err("No data received", 400)
 
         doc_id = data.get("docId")
         symbols = data.get("symbols", [])
         clipping_images = data.get("clippingImages", {})
 
         if not doc_id:
-            return jsonify({"error": "Document ID is required"}), 400
+            return err("Document ID is required", 400)
 
         if not symbols:
-            return jsonify({"error": "No symbols to save"}), 400
+            return err("No symbols to save", 400)
 
-        print(f"🔣 Saving symbol clippings for document: {doc_id}")
-        print(f"   -> Number of symbols: {len(symbols)}")
+        log.info("Saving %d symbol clippings for document %s", len(symbols), doc_id)
 
         # Get the processed folder path from app config
-        from flask import current_app
-
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
-        if not os.path.exists(doc_dir):
-            return jsonify({"error": "Document not found"}), 404
 
-        # Create symbols directory
+        # One directory listing answers every existence check below
+        try:
+            with os.scandir(doc_dir) as it:
+                doc_entries = {entry.name: entry for entry in it}
+        except (FileNotFoundError, NotADirectoryError):
+            return err("Document not found", 404)
+
+        # Page metadata for coordinate transformation using new system
+        if "page_metadata.json" not in doc_entries:
+            return err("Page metadata not found", 404)
+        metadata_entry = doc_entries["page_metadata.json"]
+
+        # Original PDF, rendered by the symbol dimension fallback
+        if "original.pdf" not in doc_entries:
+            return err("Original PDF not found", 404)
+        pdf_file = doc_entries["original.pdf"].path
+
+        # Resolved here: the symbol workers run outside the app context
+        image_format = _symbol_image_format(current_app.config)
+        image_ext, image_save_options = _SYMBOL_IMAGE_FORMATS[image_format]
+
+        # Create symbols directory; one listing of an existing one tells which
+        # legend directories still need to be created
         symbols_dir = os.path.join(doc_dir, "symbols")
-        os.makedirs(symbols_dir, exist_ok=True)
-
-        # Load page metadata for coordinate transformation using new system
-        metadata_file = os.path.join(doc_dir, "page_metadata.json")
-        if not os.path.exists(metadata_file):
-            return jsonify({"error": "Page metadata not found"}), 404
-
-        # Load the original PDF document for symbol dimension calculations
-        pdf_file = os.path.join(doc_dir, "original.pdf")
-        if not os.path.exists(pdf_file):
-            return jsonify({"error": "Original PDF not found"}), 404
-
-        pdf_document = fitz.open(pdf_file)
-        dimension_calculator = SymbolDimensionCalculator()
-
-        with open(metadata_file, "r") as f:
-            metadata_dict = json.load(f)
-
-        # Convert to new PageMetadata objects
-        page_metadata = {}
-        for page_num, page_data in metadata_dict["pages"].items():
-            page_metadata[int(page_num)] = PageMetadata.from_dict(page_data)
-
-        saved_symbols = []
-        symbol_metadata = []
+        if "symbols" in doc_entries:
+            with os.scandir(symbols_dir) as it:
+                existing_dirs = {entry.name for entry in it if entry.is_dir()}
+        else:
+            os.makedirs(symbols_dir, exist_ok=True)
+            existing_dirs = set()
+
+        # Parsed once per file version; PageMetadata objects are only built
+        # for the pages that legends are on
+        metadata_pages = load_json(
+            metadata_entry.path, file_version(metadata_entry.stat())
+        )["pages"]
+
+        # Symbol images, templates and the metadata file for this request
+        write_batch = _WriteBatch()
+
+        # Sized for every requested symbol; trimmed to saved_count at the end
+        saved_symbols = [None] * len(symbols)
+        symbol_records = [None] * len(symbols)
+        saved_count = 0
+
+        # 300 DPI renders of legend regions (futures from the dimension pool),
+        # started on first use by the PDF dimension fallback
+        legend_regions = {}
+        legend_regions_lock = threading.Lock()
 
         # Group symbols by legend for processing
-        symbols_by_legend = {}
+        symbols_by_legend = defaultdict(list)
         for symbol in symbols:
-            legend_id = symbol["legendId"]
-            if legend_id not in symbols_by_legend:
-                symbols_by_legend[legend_id] = []
-            symbols_by_legend[legend_id].append(symbol)
+            symbols_by_legend[symbol["legendId"]].append(symbol)
+
+        # Clipping URLs are served from the document directory
+        doc_url_prefix = f"/data/processed/{doc_id}/"
 
         # Process each legend and its symbols using new coordinate system
         for legend_id, legend_symbols in symbols_by_legend.items():
             if legend_id not in clipping_images:
-                print(f"   ⚠️  Skipping legend {legend_id} - no clipping image found")
+                log.warning("Skipping legend %s: no clipping image found", legend_id)
                 continue
 
             clipping_data = clipping_images[legend_id]
@@ -155,13 +429,17 @@ def save_symbol_clippings():
             clipping_url = clipping_data["url"]
             page_number = legend_annotation["pageNumber"]
 
-            print(f"   📐 Processing legend {legend_id} on page {page_number}")
-            print(f"     -> Legend clipping: {clipping_url}")
-            print(f"     -> Symbols in this legend: {len(legend_symbols)}")
+            log.debug(
+                "Processing legend %s on page %s (%s, %d symbols)",
+                legend_id,
+                page_number,
+                clipping_url,
+                len(legend_symbols),
+            )
 
             # Get legend PDF coordinates from the annotation (should be stored from DefineKeyAreasTab)
             if "pdfCoordinates" not in legend_annotation:
-                print(f"     ❌ Legend annotation missing PDF coordinates")
+                log.warning("Skipping legend %s: missing PDF coordinates", legend_id)
                 continue
 
             legend_pdf_coords = PDFCoordinates(
@@ -175,210 +453,242 @@ def save_symbol_clippings():
             clipping_transformer = ClippingCoordinateTransformer(
                 legend_pdf_coords=legend_pdf_coords,
                 clipping_dpi=HIGH_RES_DPI,  # Clippings are generated at high-res DPI
-                page_metadata=page_metadata[page_number],
+                page_metadata=PageMetadata.from_dict(metadata_pages[str(page_number)]),
             )
 
             # Load the legend clipping image
-            clipping_path = clipping_url.replace(f"/data/processed/{doc_id}/", "")
+            clipping_path = clipping_url.replace(doc_url_prefix, "")
             full_clipping_path = os.path.join(doc_dir, clipping_path)
 
-            if not os.path.exists(full_clipping_path):
-                print(f"     ❌ Legend clipping not found: {full_clipping_path}")
+            try:
+                clipping_stat = os.stat(full_clipping_path)
+            except FileNotFoundError:
+                log.warning("Legend clipping not found: %s", full_clipping_path)
                 continue
 
             try:
-                legend_image = Image.open(full_clipping_path)
-                print(f"     ✅ Loaded legend image: {legend_image.size}")
+                # Symbols are cut out of the decoded legend as array views
+                legend_array = _get_legend_array(
+                    full_clipping_path, file_version(clipping_stat)
+                )
+                legend_height, legend_width = legend_array.shape[:2]
 
                 # Create legend-specific directory
-                legend_dir = os.path.join(symbols_dir, f"legend_{legend_id}")
-                os.makedirs(legend_dir, exist_ok=True)
-
-                # Process each symbol in this legend using new coordinate system
+                legend_dir_name = f"legend_{legend_id}"
+                legend_dir = os.path.join(symbols_dir, legend_dir_name)
+                legend_relative_dir = f"symbols/{legend_dir_name}/"
+                if legend_dir_name not in existing_dirs:
+                    os.makedirs(legend_dir, exist_ok=True)
+                    existing_dirs.add(legend_dir_name)
+
+                # Unnamed symbols are not saved; drop them before any transform
+                # work. Symbols keep their position in the legend (i) for
+                # their file names.
+                named_symbols = []
                 for i, symbol in enumerate(legend_symbols, 1):
                     symbol_name = symbol["name"].strip()
-                    if not symbol_name:
-                        continue
+                    if symbol_name:
+                        named_symbols.append((i, symbol, symbol_name))
+
+                # Transform every symbol box in this legend in one pass
+                canvas_boxes = np.array(
+                    [
+                        [
+                            symbol["left"],
+                            symbol["top"],
+                            symbol["width"],
+                            symbol["height"],
+                        ]
+                        for _, symbol, _ in named_symbols
+                    ],
+                    dtype=np.float64,
+                )
+                canvas_sizes = np.array(
+                    [
+                        [
+                            symbol.get("canvasWidth", legend_width),
+                            symbol.get("canvasHeight", legend_height),
+                        ]
+                        for _, symbol, _ in named_symbols
+                    ],
+                    dtype=np.float64,
+                )
+                clipping_boxes = clipping_transformer.canvas_to_clipping_batch(
+                    canvas_boxes, canvas_sizes
+                )
+                pdf_boxes = clipping_transformer.clipping_to_pdf_batch(clipping_boxes)
+
+                # Crops must stay inside the legend image (PDF boxes are not clamped)
+                clipping_boxes, out_of_bounds = _clamp_to_image(
+                    clipping_boxes, legend_width, legend_height
+                )
+
+                # Python scalars for the per-symbol dataclasses and JSON output
+                canvas_rows = canvas_boxes.tolist()
+                canvas_size_rows = canvas_sizes.tolist()
+                clipping_rows = clipping_boxes.tolist()
+                out_of_bounds = out_of_bounds.tolist()
+                symbol_ids = _uuid4_batch(len(named_symbols))
 
-                    # Create safe filename from symbol name
-                    safe_name = "".join(
-                        c for c in symbol_name if c.isalnum() or c in (" ", "-", "_")
-                    ).rstrip()
-                    safe_name = safe_name.replace(" ", "_")
+                # Process each symbol in this legend using new coordinate system
+                def _process_symbol(row, i, symbol, symbol_name):
+                    safe_name = _safe_filename(symbol_name)
+                    description = symbol.get("description", "")
 
-                    # Create symbol canvas coordinates (from UI annotation)
+                    # Symbol canvas coordinates (from UI annotation)
                     symbol_canvas_coords = CanvasCoordinates(
-                        left=float(symbol["left"]),
-                        top=float(symbol["top"]),
-                        width=float(symbol["width"]),
-                        height=float(symbol["height"]),
-                        canvas_width=float(
-                            symbol.get("canvasWidth", legend_image.width)
-                        ),
-                        canvas_height=float(
-                            symbol.get("canvasHeight", legend_image.height)
-                        ),
+                        *canvas_rows[row], *canvas_size_rows[row]
                     )
 
-                    # Transform to absolute PDF coordinates
-                    symbol_pdf_coords = clipping_transformer.symbol_canvas_to_pdf(
-                        symbol_canvas_coords
-                    )
+                    # Absolute PDF coordinates
+                    symbol_pdf_coords = PDFCoordinates.from_array(pdf_boxes[row])
 
-                    # Also get clipping coordinates for image extraction
-                    symbol_clipping_coords = clipping_transformer.canvas_to_clipping(
-                        symbol_canvas_coords
+                    # Clipping coordinates for image extraction
+                    symbol_clipping_coords = ClippingCoordinates(
+                        *clipping_rows[row],
+                        clipping_dpi=clipping_transformer.clipping_dpi,
                     )
 
-                    print(f"     🔣 Processing symbol '{symbol_name}':")
-                    print(
-                        f"       Canvas: ({symbol_canvas_coords.left:.1f}, {symbol_canvas_coords.top:.1f}) {symbol_canvas_coords.width:.1f}x{symbol_canvas_coords.height:.1f}"
-                    )
-                    print(
-                        f"       PDF: ({symbol_pdf_coords.left:.2f}, {symbol_pdf_coords.top:.2f}) {symbol_pdf_coords.width:.2f}x{symbol_pdf_coords.height:.2f}"
+                    log.debug(
+                        "Symbol %r: canvas %s, pdf %s",
+                        symbol_name,
+                        symbol_canvas_coords,
+                        symbol_pdf_coords,
                     )
 
-                    # Validate clipping coordinates are within legend image bounds
-                    if (
-                        symbol_clipping_coords.left_pixels < 0
-                        or symbol_clipping_coords.top_pixels < 0
-                        or symbol_clipping_coords.left_pixels
-                        + symbol_clipping_coords.width_pixels
-                        > legend_image.width
-                        or symbol_clipping_coords.top_pixels
-                        + symbol_clipping_coords.height_pixels
-                        > legend_image.height
-                    ):
-                        print(
-                            f"       ⚠️  Symbol coordinates out of bounds, adjusting..."
-                        )
-
-                        # Clamp to image bounds
-                        left = max(
-                            0,
-                            min(
-                                symbol_clipping_coords.left_pixels,
-                                legend_image.width - 1,
-                            ),
-                        )
-                        top = max(
-                            0,
-                            min(
-                                symbol_clipping_coords.top_pixels,
-                                legend_image.height - 1,
-                            ),
-                        )
-                        width = max(
-                            1,
-                            min(
-                                symbol_clipping_coords.width_pixels,
-                                legend_image.width - left,
-                            ),
-                        )
-                        height = max(
-                            1,
-                            min(
-                                symbol_clipping_coords.height_pixels,
-                                legend_image.height - top,
-                            ),
-                        )
-
-                        # Update clipping coordinates
-                        symbol_clipping_coords = ClippingCoordinates(
-                            left_pixels=left,
-                            top_pixels=top,
-                            width_pixels=width,
-                            height_pixels=height,
-                            clipping_dpi=symbol_clipping_coords.clipping_dpi,
-                        )
+                    if out_of_bounds[row]:
+                        log.debug("Symbol %r clamped to legend bounds", symbol_name)
 
-                    # Extract symbol from legend image
-                    symbol_box = (
-                        symbol_clipping_coords.left_pixels,
-                        symbol_clipping_coords.top_pixels,
-                        symbol_clipping_coords.left_pixels
-                        + symbol_clipping_coords.width_pixels,
-                        symbol_clipping_coords.top_pixels
-                        + symbol_clipping_coords.height_pixels,
-                    )
-                    symbol_image = legend_image.crop(symbol_box)
+                    # Extract symbol from legend image (bounds were clamped above)
+                    left = symbol_clipping_coords.left_pixels
+                    top = symbol_clipping_coords.top_pixels
+                    symbol_array = legend_array[
+                        top : top + symbol_clipping_coords.height_pixels,
+                        left : left + symbol_clipping_coords.width_pixels,
+                    ]
 
                     # Save symbol image
-                    symbol_filename = f"{safe_name}_{i}.png"
+                    symbol_filename = f"{safe_name}_{i}{image_ext}"
                     symbol_path = os.path.join(legend_dir, symbol_filename)
-                    symbol_image.save(symbol_path)
+                    write_batch.put(
+                        symbol_path, _encode_image(symbol_array, **image_save_options)
+                    )
 
-                    print(f"       ✅ Saved symbol image: {symbol_path}")
-                    print(f"       Image size: {symbol_image.size}")
+                    log.debug(
+                        "Queued symbol image %s %s",
+                        symbol_path,
+                        symbol_array.shape[1::-1],
+                    )
 
-                    # Generate tight template from the saved symbol image
+                    # Generate tight template from the symbol image (both
+                    # encodings are lossless, so this matches the saved file)
                     template_filename = f"{safe_name}_{i}_template.png"
                     template_path = os.path.join(legend_dir, template_filename)
-                    
-                    template_info = dimension_calculator.generate_tight_template(
-                        symbol_path, template_path
+
+                    template_info, template_array = (
+                        _dimension_calculator.tight_template(symbol_array)
                     )
-                    
+                    if template_array is not None:
+                        write_batch.put(
+                            template_path, _encode_image(template_array, format="PNG")
+                        )
+
                     if template_info["success"]:
-                        print(f"       🎯 Generated tight template: {template_path}")
                         # Use template dimensions for symbol dimensions
                         symbol_dimensions = template_info["template_dimensions"]
                         crop_offset = template_info["crop_offset"]
                     else:
-                        print(f"       ⚠️  Failed to generate tight template, using fallback dimensions")
+                        log.debug(
+                            "No tight template for symbol %r, measuring from PDF",
+                            symbol_name,
+                        )
                         # Fallback: Calculate symbol dimensions using contour analysis from PDF
                         try:
-                            symbol_dimensions = (
-                                dimension_calculator.calculate_dimensions_from_pdf(
-                                    pdf_document, page_number, symbol_pdf_coords
+                            # The legend region is rendered once and shared by
+                            # every symbol in it that needs this fallback.
+                            # PDF renders run in the shared worker processes.
+                            pool = get_process_pool()
+                            with legend_regions_lock:
+                                if legend_id not in legend_regions:
+                                    legend_regions[legend_id] = pool.submit(
+                                        render_pdf_region,
+                                        pdf_file,
+                                        page_number,
+                                        astuple(legend_pdf_coords),
+                                    )
+                                region_future = legend_regions[legend_id]
+                            legend_region = region_future.result()
+                            if legend_region is not None and _contains(
+                                legend_pdf_coords, symbol_pdf_coords
+                            ):
+                                symbol_dimensions = _dimension_calculator.calculate_dimensions_from_pixmap(
+                                    *legend_region, symbol_pdf_coords
                                 )
-                            )
+                            else:
+                                symbol_dimensions = pool.submit(
+                                    calculate_dimensions_from_pdf_file,
+                                    pdf_file,
+                                    page_number,
+                                    astuple(symbol_pdf_coords),
+                                ).result()
                             crop_offset = {"left": 0, "top": 0}
                         except Exception as e:
-                            print(f"       ⚠️  Failed to calculate symbol dimensions: {e}")
+                            log.warning(
+                                "Failed to calculate dimensions of symbol %r: %s",
+                                symbol_name,
+                                e,
+                            )
                             symbol_dimensions = {
                                 "height_pixels_300dpi": 0,
                                 "width_pixels_300dpi": 0,
                             }
                             crop_offset = {"left": 0, "top": 0}
-                    
-                    print(f"       📏 Symbol dimensions: {symbol_dimensions}")
-                    if crop_offset["left"] > 0 or crop_offset["top"] > 0:
-                        print(f"       📍 Template crop offset: {crop_offset}")
+
+                    log.debug(
+                        "Symbol %r dimensions %s, template crop offset %s",
+                        symbol_name,
+                        symbol_dimensions,
+                        crop_offset,
+                    )
 
                     # Create complete symbol annotation object
                     symbol_annotation = SymbolAnnotation(
-                        id=str(uuid.uuid4()),
+                        id=symbol_ids[row],
                         name=symbol_name,
-                        description=symbol.get("description", ""),
+                        description=description,
                         legend_annotation_id=legend_id,
                         legend_pdf_coords=legend_pdf_coords,
                         pdf_coords=symbol_pdf_coords,
                         clipping_coords=symbol_clipping_coords,
                         canvas_coords=symbol_canvas_coords,
+                        image_format=image_format,
                     )
 
+                    annotation_dict = symbol_annotation.to_dict()
+                    relative_path = legend_relative_dir + symbol_filename
+
                     # Store comprehensive symbol metadata using new coordinate system
                     symbol_meta = {
                         "id": symbol_annotation.id,
                         "name": symbol_name,
-                        "description": symbol.get("description", ""),
+                        "description": description,
                         "filename": symbol_filename,
-                        "relative_path": f"symbols/legend_{legend_id}/{symbol_filename}",
-                        "coordinates": symbol_annotation.to_dict()["coordinates"],
-                        "source_legend": symbol_annotation.to_dict()["source_legend"],
-                        "image_info": symbol_annotation.to_dict()["image_info"],
+                        "relative_path": relative_path,
+                        "coordinates": annotation_dict["coordinates"],
+                        "source_legend": annotation_dict["source_legend"],
+                        "image_info": annotation_dict["image_info"],
                         "page_number": page_number,
                         "coordinate_system": symbol.get("coordinateSystem", "UNKNOWN"),
                         "symbol_template_dimensions": symbol_dimensions,
                         # Template information (NEW)
                         "template_info": {
                             "template_filename": template_filename,
-                            "template_relative_path": f"symbols/legend_{legend_id}/{template_filename}",
+                            "template_relative_path": legend_relative_dir
+                            + template_filename,
                             "template_dimensions": symbol_dimensions,  # Same as symbol_template_dimensions for consistency
                             "crop_offset": crop_offset,
                             "has_tight_template": template_info["success"],
-                            "original_clipping_path": f"symbols/legend_{legend_id}/{symbol_filename}"
+                            "original_clipping_path": relative_path,
                         },
                         "frontend_data": {
                             "canvas_coords": {
@@ -394,119 +704,124 @@ def save_symbol_clippings():
                         },
                     }
 
-                    print(f"       📄 Symbol metadata created:")
-                    print(
-                        f"         Coordinate System: {symbol_meta['coordinate_system']}"
-                    )
-                    print(
-                        f"         PDF Coordinates: ({symbol_pdf_coords.left:.2f}, {symbol_pdf_coords.top:.2f}) {symbol_pdf_coords.width:.2f}x{symbol_pdf_coords.height:.2f}"
+                    # Encoded here, in parallel, and framed into the metadata
+                    # file below
+                    return symbol_name, dumps(symbol_meta)
+
+                # Collect in submission order so metadata order matches the request
+                futures = [
+                    _symbol_pool.submit(_process_symbol, row, *named_symbol)
+                    for row, named_symbol in enumerate(named_symbols)
+                ]
+                for future in futures:
+                    saved_symbols[saved_count], symbol_records[saved_count] = (
+                        future.result()
                     )
-                    print(
-                        f"         Canvas Coordinates: ({symbol.get('left')}, {symbol.get('top')}) {symbol.get('width')}x{symbol.get('height')}"
-                    )
-                    print(f"         Symbol Dimensions: {symbol_dimensions}")
-                    print(f"         Image saved: {symbol_path}")
-
-                    symbol_metadata.append(symbol_meta)
-                    saved_symbols.append(symbol_name)
-
-                legend_image.close()
-
-            except Exception as e:
-                print(f"     ❌ Error processing legend {legend_id}: {e}")
+                    saved_count += 1
+
+                log.info(
+                    "Legend %s (page %s): saved %d of %d symbols",
+                    legend_id,
+                    page_number,
+                    len(named_symbols),
+                    len(legend_symbols),
+                )
+
+            except Exception:
+                log.exception("Error processing legend %s", legend_id)
                 continue
 
+        del saved_symbols[saved_count:]
+        del symbol_records[saved_count:]
+
         # Save symbol metadata
         metadata_file = os.path.join(symbols_dir, "symbols_metadata.json")
-        complete_metadata = {
-            "docId": doc_id,
-            "timestamp": str(uuid.uuid4()),
-            "total_symbols": len(symbol_metadata),
-            "symbols_by_legend": len(symbols_by_legend),
-            "symbols": symbol_metadata,
-            "processing_info": {
-                "version": "1.0",
-                "coordinate_systems": [
-                    "legend_relative: coordinates within the legend clipping image",
-                    "canvas_absolute: coordinates in the original page canvas",
-                    "pdf_absolute: coordinates in the original PDF (points)",
-                ],
+        complete_metadata = dumps_with_encoded(
+            {
+                "docId": doc_id,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "total_symbols": len(symbol_records),
+                "symbols_by_legend": len(symbols_by_legend),
             },
-        }
+            symbols=b"[" + b",".join(symbol_records) + b"]",
+            processing_info=_PROCESSING_INFO_JSON,
+        )
 
-        with open(metadata_file, "w") as f:
-            json.dump(complete_metadata, f, indent=2)
-
-        print(f"   ✅ Symbol processing complete:")
-        print(f"     -> Saved {len(saved_symbols)} symbols")
-        print(f"     -> Metadata saved: {metadata_file}")
-
-        # Close the PDF document
-        pdf_document.close()
-
-        return (
-            jsonify(
-                {
-                    "message": "Symbol clippings saved successfully",
-                    "docId": doc_id,
-                    "savedSymbols": len(saved_symbols),
-                    "symbolsMetadata": metadata_file,
-                    "symbolsList": saved_symbols,
-                }
-            ),
-            200,
+        # Replaced atomically; the writer fsyncs it after this request has
+        # been released, so only the writes themselves are waited for
+        write_batch.put(metadata_file, complete_metadata, durable=True)
+        write_batch.wait()
+
+        log.info("Saved %d symbols to %s", len(saved_symbols), metadata_file)
+
+        return json_response(
+            {
+                "message": "Symbol clippings saved successfully",
+                "docId": doc_id,
+                "savedSymbols": len(saved_symbols),
+                "symbolsMetadata": metadata_file,
+                "symbolsList": saved_symbols,
+            }
         )
 
     except Exception as e:
-        # Ensure PDF document is closed even on error
-        try:
-            if pdf_document is not None:
-                pdf_document.close()
-        except:
-            pass
-        print(f"❌ ERROR: Failed to save symbol clippings: {e}")
-        import traceback
-
-        traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        log.exception("Failed to save symbol clippings")
+        return err(str(e), 500)
 
 
 @symbol_annotation_bp.route("/api/load_symbols/<doc_id>", methods=["GET"])
 def load_symbols(doc_id):
     """
     Load symbol metadata for a document.
-    """
-    print(f"\n--- Loading symbols for document: {doc_id} ---")
 
-    try:
-        from flask import current_app
+    symbols_metadata.json is sent as stored, without parsing it, with an ETag
+    derived from its mtime and size so unchanged metadata is answered with
+    304 Not Modified.
 
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
+    With USE_X_ACCEL set, the file is handed off to nginx through an
+    X-Accel-Redirect header instead, which needs an internal location such as:
+
+        location /internal-processed/ { internal; alias /data/processed/; }
+    """
+    try:
+        processed_folder = get_processed_folder()
 
         doc_dir = os.path.join(processed_folder, doc_id)
         symbols_dir = os.path.join(doc_dir, "symbols")
         metadata_file = os.path.join(symbols_dir, "symbols_metadata.json")
 
-        if not os.path.exists(metadata_file):
-            print(f"   ⚠️  No symbols metadata found for document {doc_id}")
-            return (
-                jsonify(
-                    {"docId": doc_id, "symbols": [], "message": "No symbols found"}
-                ),
-                200,
+        try:
+            st = os.stat(metadata_file)
+        except FileNotFoundError:
+            log.debug("No symbols metadata found for document %s", doc_id)
+            return json_response(
+                {"docId": doc_id, "symbols": [], "message": "No symbols found"}
             )
 
-        with open(metadata_file, "r") as f:
-            symbol_data = json.load(f)
-
-        print(f"   ✅ Loaded {len(symbol_data.get('symbols', []))} symbols")
+        if current_app.config.get("USE_X_ACCEL"):
+            accel_prefix = current_app.config.get(
+                "X_ACCEL_PREFIX", "/internal-processed/"
+            ).rstrip("/")
+            return Response(
+                "",
+                mimetype="application/json",
+                headers={
+                    "X-Accel-Redirect": (
+                        f"{accel_prefix}/{doc_id}/symbols/symbols_metadata.json"
+                    )
+                },
+            )
 
-        return jsonify(symbol_data), 200
+        response = send_file(
+            metadata_file,
+            mimetype="application/json",
+            etag=f"{st.st_mtime_ns:x}-{st.st_size:x}",
+            max_age=0,
+            conditional=True,
+        )
+        response.cache_control.must_revalidate = True
+        return response
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to load symbols: {e}")
-        return jsonify({"error": str(e)}), 500
+        log.exception("Failed to load symbols")
+        return err(str(e), 500)
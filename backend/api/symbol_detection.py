@@ -5,18 +5,165 @@ This module provides REST API endpoints for the symbol detection system,
 including detection execution, progress monitoring, and result management.
 """
 
+import functools
+import logging
 import os
 import json
-from flask import Blueprint, request, jsonify, current_app
+import queue
+from collections import OrderedDict, defaultdict
+from flask import Blueprint, Response, request
 from utils.symbol_detection import SymbolDetectionEngine, ProgressMonitor
+from utils.json_io import dumps, iter_dumps_with_mapping, sse_event
+from api.responses import JSON_MIMETYPE, json_response, err, get_processed_folder
+from api.detection_updates import flush_status_updates
 import threading
-import time
+
+log = logging.getLogger(__name__)
 
 # Create blueprint for symbol detection API
 symbol_detection_bp = Blueprint("symbol_detection", __name__)
 
+# Engines hold no per-request state, so one engine per document is reused
+# across requests (progress polling in particular) instead of rebuilding its
+# coordinator and storage each time. Keyed by the document directory and its
+# inode, so a document that is deleted and re-created gets a fresh engine.
+_ENGINE_CACHE_SIZE = 64
+_engine_cache = OrderedDict()
+_engine_cache_lock = threading.Lock()
+
+
+def _get_engine(doc_id):
+    """
+    Return a cached SymbolDetectionEngine for a document.
+
+    Checks the document directory first so unknown documents cost one stat
+    call and never construct an engine (or create its detections folder).
+
+    Returns:
+        The engine, or None if the document directory does not exist
+    """
+    processed_folder = get_processed_folder()
+    doc_dir = os.path.join(processed_folder, doc_id)
+    try:
+        key = (doc_dir, os.stat(doc_dir).st_ino)
+    except FileNotFoundError:
+        return None
+
+    with _engine_cache_lock:
+        engine = _engine_cache.get(key)
+        if engine is not None:
+            _engine_cache.move_to_end(key)
+            return engine
+
+    engine = SymbolDetectionEngine(doc_id, processed_folder)
+
+    with _engine_cache_lock:
+        engine = _engine_cache.setdefault(key, engine)
+        _engine_cache.move_to_end(key)
+        while len(_engine_cache) > _ENGINE_CACHE_SIZE:
+            _engine_cache.popitem(last=False)
+
+    return engine
+
+
+def _doc_endpoint(action):
+    """
+    Decorate a route scoped to one document (doc_id in the URL).
+
+    The document's engine is looked up before the view runs and passed as its
+    second argument; unknown documents get a 404 and unexpected errors a 500,
+    both as JSON.
+
+    Args:
+        action: What the route does, for the error log ("list detection runs")
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(doc_id, *args, **kwargs):
+            engine = _get_engine(doc_id)
+            if engine is None:
+                return err("Document not found", 404)
+
+            try:
+                return view(doc_id, engine, *args, **kwargs)
+            except Exception as e:
+                log.exception("Failed to %s", action)
+                return err(str(e), 500)
+
+        return wrapper
+
+    return decorator
+
+
+# Detection runs are queued and executed one at a time by a dedicated worker
+# thread instead of a new thread per request, so concurrent requests cannot
+# oversubscribe the CPU (see maxConcurrentRuns in /api/detection_health).
+# Items are (engine, prepared run, in-flight key).
+_detection_queue: "queue.Queue[tuple]" = queue.Queue()
+
+# Runs that are being prepared, queued or executing, by request (see
+# _inflight_key), so a repeated identical request (e.g. a double click) gets
+# the existing run ID instead of queueing the same work twice. The key is
+# reserved under the lock; the run itself is prepared outside it.
+_inflight_runs = {}
+_inflight_runs_lock = threading.Lock()
+
+
+class _InflightRun:
+    """Reservation of an in-flight key; run_id is set once it is prepared."""
+
+    def __init__(self):
+        self.run_id = None
+        self.settled = threading.Event()
+
+
+def _inflight_key(doc_id, symbol_ids, detection_params):
+    """Identity of a detection request: document, symbol set and parameters."""
+    symbols = tuple(sorted(symbol_ids)) if symbol_ids else None
+    return (doc_id, symbols, json.dumps(detection_params, sort_keys=True))
+
+
+def _detection_worker():
+    while True:
+        engine, prepared, inflight_key = _detection_queue.get()
+        try:
+            _run_detection_background(engine, prepared)
+        finally:
+            with _inflight_runs_lock:
+                _inflight_runs.pop(inflight_key, None)
+            _detection_queue.task_done()
+
+
+@symbol_detection_bp.record_once
+def _start_detection_worker(state):
+    threading.Thread(
+        target=_detection_worker, name="symbol-detection", daemon=True
+    ).start()
+
+
+# Progress push: each open /api/detection_progress_stream request subscribes a
+# queue for its document, and the detection worker publishes every progress
+# summary to those queues instead of clients polling the progress file.
+_progress_subscribers = defaultdict(set)
+_progress_subscribers_lock = threading.Lock()
+
+# Seconds between keep-alive comments on an idle progress stream
+_PROGRESS_STREAM_KEEPALIVE = 15
+_FINAL_STATUSES = ("completed", "failed")
+
+
+def _publish_progress(doc_id, progress_summary):
+    with _progress_subscribers_lock:
+        subscribers = list(_progress_subscribers.get(doc_id, ()))
+    if not subscribers:
+        return
+    event = {"docId": doc_id, **progress_summary, "hasProgress": True}
+    for subscriber in subscribers:
+        subscriber.put(event)
 
-@symbol_detection_bp.route("/api/run_symbol_detection", methods=["POST", "OPTIONS"])
+
+@symbol_detection_bp.route("/api/run_symbol_detection", methods=["POST"])
 def run_symbol_detection():
     """
     Execute symbol detection across pages for specified symbols.
@@ -43,9 +190,6 @@ def run_symbol_detection():
     }
     """
 
-    if request.method == "OPTIONS":
-        return "", 200
-
     try:
         data = request.get_json()
 
@@ -54,100 +198,156 @@ def run_symbol_detection():
         detection_params = data.get("detectionParams", {})
 
         if not doc_id:
-            return jsonify({"error": "Document ID is required"}), 400
-
-        print(f"🔍 Starting symbol detection for document: {doc_id}")
-        if symbol_ids:
-            print(f"   -> Detecting specific symbols: {symbol_ids}")
-        else:
-            print(f"   -> Detecting all symbols")
-
-        print(f"   -> Detection parameters: {detection_params}")
-
-        # Get processed folder path
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
-
-        # Validate document exists
-        doc_dir = os.path.join(processed_folder, doc_id)
-        if not os.path.exists(doc_dir):
-            return jsonify({"error": "Document not found"}), 404
-
-        # Create detection engine
-        engine = SymbolDetectionEngine(doc_id, processed_folder)
+            return err("Document ID is required", 400)
 
-        # Start detection in background thread
-        detection_thread = threading.Thread(
-            target=_run_detection_background,
-            args=(engine, symbol_ids, detection_params),
-            daemon=True,
+        log.info(
+            "Starting symbol detection for document %s (symbols: %s)",
+            doc_id,
+            symbol_ids or "all",
         )
-        detection_thread.start()
-
-        # Get initial run ID (engine creates it synchronously)
-        # We need to wait a moment for the thread to start and create the run
-        time.sleep(0.1)
-
-        # For now, we'll create a placeholder response
-        # In a real implementation, we'd need to modify the engine to return the run ID immediately
-
-        print(f"   ✅ Detection started in background thread")
-
-        return (
-            jsonify(
+        log.debug("Detection parameters: %s", detection_params)
+
+        # Validate document exists and get its detection engine
+        engine = _get_engine(doc_id)
+        if engine is None:
+            return err("Document not found", 404)
+
+        # Create the run here so its ID (with "running" progress) exists before
+        # the response, then hand the detection work to the worker. An
+        # identical request that is still queued or running is reused instead.
+        inflight_key = _inflight_key(doc_id, symbol_ids, detection_params)
+        existing_run_id = None
+        while True:
+            with _inflight_runs_lock:
+                reservation = _inflight_runs.get(inflight_key)
+                if reservation is None:
+                    reservation = _inflight_runs[inflight_key] = _InflightRun()
+                    break
+            reservation.settled.wait()
+            existing_run_id = reservation.run_id
+            if existing_run_id is not None:
+                break
+            # The identical request failed to prepare; try it ourselves
+
+        if existing_run_id is None:
+            try:
+                prepared = engine.prepare_detection(symbol_ids, detection_params)
+            except BaseException:
+                with _inflight_runs_lock:
+                    del _inflight_runs[inflight_key]
+                reservation.settled.set()
+                raise
+            reservation.run_id = prepared.run_id
+            reservation.settled.set()
+            _detection_queue.put((engine, prepared, inflight_key))
+
+        if existing_run_id is not None:
+            log.info("Identical detection run %s already in flight", existing_run_id)
+            return json_response(
                 {
-                    "message": "Symbol detection started successfully",
+                    "message": "Identical symbol detection already in progress",
+                    "runId": existing_run_id,
                     "docId": doc_id,
                     "status": "running",
-                    "estimatedDuration": "2-5 minutes depending on document size and number of symbols",
+                    "alreadyRunning": True,
                 }
-            ),
-            200,
+            )
+
+        log.info("Detection run %s queued for the background worker", prepared.run_id)
+
+        return json_response(
+            {
+                "message": "Symbol detection started successfully",
+                "runId": prepared.run_id,
+                "docId": doc_id,
+                "status": "running",
+                "estimatedDuration": "2-5 minutes depending on document size and number of symbols",
+            }
         )
 
     except FileNotFoundError as e:
-        print(f"❌ ERROR: File not found: {e}")
-        return jsonify({"error": f"Required files not found: {str(e)}"}), 404
+        log.warning("Required files not found: %s", e)
+        return err(f"Required files not found: {str(e)}", 404)
 
     except ValueError as e:
-        print(f"❌ ERROR: Invalid parameters: {e}")
-        return jsonify({"error": str(e)}), 400
+        log.warning("Invalid detection parameters: %s", e)
+        return err(str(e), 400)
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to start symbol detection: {e}")
-        import traceback
-
-        traceback.print_exc()
-        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+        log.exception("Failed to start symbol detection")
+        return err(f"Internal server error: {str(e)}", 500)
 
 
-def _run_detection_background(engine, symbol_ids, detection_params):
+def _run_detection_background(engine, prepared):
     """Run detection in background thread"""
     try:
-        print(f"🔄 Background detection thread started")
+        log.debug("Background detection started for run %s", prepared.run_id)
 
         # Define progress callback
         def progress_callback(progress_summary):
-            print(
-                f"📊 Progress: {progress_summary.get('progressPercent', 0):.1f}% - {progress_summary.get('currentStep', 'Processing...')}"
+            log.debug(
+                "Progress: %.1f%% - %s",
+                progress_summary.get("progressPercent", 0),
+                progress_summary.get("currentStep", "Processing..."),
             )
+            _publish_progress(engine.doc_id, progress_summary)
 
         # Run detection
-        run_id = engine.run_detection(symbol_ids, detection_params, progress_callback)
-        print(f"✅ Background detection completed: {run_id}")
+        run_id = engine.execute_detection(prepared, progress_callback)
+        log.info("Background detection completed: %s", run_id)
 
-    except Exception as e:
-        print(f"💥 Background detection failed: {e}")
-        import traceback
+    except Exception:
+        log.exception("Background detection failed for run %s", prepared.run_id)
+
+    finally:
+        # Final status (completed or failed) for open progress streams
+        _publish_progress(engine.doc_id, prepared.progress.get_progress_summary())
 
-        traceback.print_exc()
+
+def _latest_progress(engine, doc_id):
+    """Progress summary for the latest detection run of a document."""
+    # Get the most recent run
+    run_id = engine.latest_run_id()
+
+    if run_id is None:
+        return {
+            "message": "No detection runs found for this document",
+            "docId": doc_id,
+            "hasRuns": False,
+        }
+
+    # Get detailed progress
+    progress_data = engine.get_detection_progress(run_id)
+
+    if not progress_data:
+        return {
+            "message": "Progress data not available",
+            "docId": doc_id,
+            "runId": run_id,
+            "hasProgress": False,
+        }
+
+    # Return progress summary
+    return {
+        "docId": doc_id,
+        "runId": progress_data.get("runId"),
+        "status": progress_data.get("status"),
+        "progressPercent": progress_data.get("progressPercent", 0),
+        "currentStep": progress_data.get("currentStep"),
+        "estimatedTimeRemaining": progress_data.get("estimatedTimeRemaining"),
+        "processingRate": progress_data.get("processingRate", 0),
+        "completedSteps": progress_data.get("completedSteps", 0),
+        "totalSteps": progress_data.get("totalSteps", 0),
+        "errorCount": len(progress_data.get("errors", [])),
+        "warningCount": len(progress_data.get("warnings", [])),
+        "lastUpdated": progress_data.get("lastUpdated"),
+        "hasProgress": True,
+    }
 
 
 @symbol_detection_bp.route("/api/detection_progress/<doc_id>", methods=["GET"])
-def get_detection_progress(doc_id):
+@_doc_endpoint("get detection progress")
+def get_detection_progress(doc_id, engine):
     """
     Get real-time progress for the latest detection run of a document.
 
@@ -165,83 +365,72 @@ def get_detection_progress(doc_id):
     }
     """
 
-    try:
-        print(f"📊 Getting detection progress for document: {doc_id}")
-
-        # Get processed folder path
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
-
-        # Create detection engine to access storage
-        engine = SymbolDetectionEngine(doc_id, processed_folder)
+    return json_response(_latest_progress(engine, doc_id))
 
-        # Get list of detection runs (most recent first)
-        runs_list = engine.list_detection_runs()
 
-        if not runs_list:
-            return (
-                jsonify(
-                    {
-                        "message": "No detection runs found for this document",
-                        "docId": doc_id,
-                        "hasRuns": False,
-                    }
-                ),
-                200,
-            )
-
-        # Get the most recent run
-        latest_run = runs_list[0]
-        run_id = latest_run["runId"]
-
-        # Get detailed progress
-        progress_data = engine.get_detection_progress(run_id)
-
-        if not progress_data:
-            return (
-                jsonify(
-                    {
-                        "message": "Progress data not available",
-                        "docId": doc_id,
-                        "runId": run_id,
-                        "hasProgress": False,
-                    }
-                ),
-                200,
-            )
-
-        # Return progress summary
-        progress_summary = {
-            "docId": doc_id,
-            "runId": progress_data.get("runId"),
-            "status": progress_data.get("status"),
-            "progressPercent": progress_data.get("progressPercent", 0),
-            "currentStep": progress_data.get("currentStep"),
-            "estimatedTimeRemaining": progress_data.get("estimatedTimeRemaining"),
-            "processingRate": progress_data.get("processingRate", 0),
-            "completedSteps": progress_data.get("completedSteps", 0),
-            "totalSteps": progress_data.get("totalSteps", 0),
-            "errorCount": len(progress_data.get("errors", [])),
-            "warningCount": len(progress_data.get("warnings", [])),
-            "lastUpdated": progress_data.get("lastUpdated"),
-            "hasProgress": True,
-        }
-
-        return jsonify(progress_summary), 200
+@symbol_detection_bp.route("/api/detection_progress_stream/<doc_id>", methods=["GET"])
+@_doc_endpoint("stream detection progress")
+def stream_detection_progress(doc_id, engine):
+    """
+    Push progress for the latest detection run of a document as server-sent
+    events, as an alternative to polling /api/detection_progress.
 
-    except FileNotFoundError:
-        return jsonify({"error": "Document not found"}), 404
+    The first event is the current progress (same body as
+    /api/detection_progress); further events follow each progress update
+    until the run completes or fails.
+    """
 
-    except Exception as e:
-        print(f"❌ ERROR: Failed to get detection progress: {e}")
-        return jsonify({"error": str(e)}), 500
+    # Subscribe before reading the snapshot so no update is missed in between
+    subscriber = queue.Queue()
+    with _progress_subscribers_lock:
+        _progress_subscribers[doc_id].add(subscriber)
+
+    def unsubscribe():
+        with _progress_subscribers_lock:
+            subscribers = _progress_subscribers.get(doc_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del _progress_subscribers[doc_id]
+
+    def generate_progress():
+        try:
+            progress = _latest_progress(engine, doc_id)
+            yield sse_event(progress)
+            if not progress.get("hasProgress"):
+                return
+
+            # Only follow the run from the snapshot; the worker may still be
+            # finishing an earlier run of the same document
+            run_id = progress["runId"]
+            while progress["status"] not in _FINAL_STATUSES:
+                try:
+                    event = subscriber.get(timeout=_PROGRESS_STREAM_KEEPALIVE)
+                except queue.Empty:
+                    yield b": keepalive\n\n"
+                    continue
+                if event.get("runId") == run_id:
+                    progress = event
+                    yield sse_event(progress)
+        except Exception as e:
+            log.exception("Failed to stream detection progress")
+            yield sse_event({"error": str(e)})
+
+    response = Response(
+        generate_progress(),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
+    response.call_on_close(unsubscribe)
+    return response
 
 
 @symbol_detection_bp.route("/api/detection_results/<doc_id>", methods=["GET"])
-def get_detection_results(doc_id):
+@_doc_endpoint("get detection results")
+def get_detection_results(doc_id, engine):
     """
     Get detection results for the latest completed run of a document.
 
@@ -272,106 +461,110 @@ def get_detection_results(doc_id):
     }
     """
 
-    try:
-        run_id = request.args.get("runId")
-        include_rejected = (
-            request.args.get("includeRejected", "false").lower() == "true"
-        )
+    run_id = request.args.get("runId")
+    include_rejected = request.args.get("includeRejected", "false").lower() == "true"
+
+    log.debug(
+        "Getting detection results for document %s (run: %s)",
+        doc_id,
+        run_id or "latest",
+    )
 
-        print(f"📋 Getting detection results for document: {doc_id}")
-        if run_id:
-            print(f"   -> Specific run: {run_id}")
-        else:
-            print(f"   -> Latest run")
-
-        # Get processed folder path
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
+    # Get run ID if not specified
+    if not run_id:
+        runs_list = engine.list_detection_runs()
+        if not runs_list:
+            return json_response(
+                {
+                    "message": "No detection runs found",
+                    "docId": doc_id,
+                    "hasResults": False,
+                }
             )
 
-        # Create detection engine
-        engine = SymbolDetectionEngine(doc_id, processed_folder)
-
-        # Get run ID if not specified
-        if not run_id:
-            runs_list = engine.list_detection_runs()
-            if not runs_list:
-                return (
-                    jsonify(
-                        {
-                            "message": "No detection runs found",
-                            "docId": doc_id,
-                            "hasResults": False,
-                        }
-                    ),
-                    200,
-                )
-
-            # Find the latest completed run
-            completed_runs = [r for r in runs_list if r.get("status") == "completed"]
-            if not completed_runs:
-                return (
-                    jsonify(
-                        {
-                            "message": "No completed detection runs found",
-                            "docId": doc_id,
-                            "hasResults": False,
-                            "availableRuns": len(runs_list),
-                        }
-                    ),
-                    200,
-                )
-
-            run_id = completed_runs[0]["runId"]
-
-        # Load detection results
-        results = engine.load_detection_results(run_id)
-
-        if not results:
-            return (
-                jsonify(
-                    {
-                        "error": "Detection results not found",
-                        "docId": doc_id,
-                        "runId": run_id,
-                    }
-                ),
-                404,
+        # Find the latest completed run
+        completed_runs = [r for r in runs_list if r.get("status") == "completed"]
+        if not completed_runs:
+            return json_response(
+                {
+                    "message": "No completed detection runs found",
+                    "docId": doc_id,
+                    "hasResults": False,
+                    "availableRuns": len(runs_list),
+                }
             )
 
-        # Filter results if requested
-        if not include_rejected and "symbolDetections" in results:
-            for symbol_id, symbol_data in results["symbolDetections"].items():
-                if "detectionsByPage" in symbol_data:
-                    for page_num, detections in symbol_data["detectionsByPage"].items():
-                        # Filter out rejected detections
-                        filtered_detections = [
-                            d for d in detections if d.get("status") != "rejected"
-                        ]
-                        symbol_data["detectionsByPage"][page_num] = filtered_detections
-
-        # Create response
-        response = {
-            "docId": doc_id,
-            "runId": run_id,
-            "status": results.get("status"),
-            "summary": results.get("summary", {}),
-            "symbolResults": results.get("symbolDetections", {}),
-            "hasResults": True,
-            "createdAt": results.get("createdAt"),
-            "params": results.get("params", {}),
-        }
+        run_id = completed_runs[0]["runId"]
 
-        return jsonify(response), 200
+    # Accept/reject changes buffered by /api/update_detection_status_simple
+    # must be on disk before the run is versioned and read
+    flush_status_updates(os.path.join(get_processed_folder(), doc_id), run_id)
 
-    except Exception as e:
-        print(f"❌ ERROR: Failed to get detection results: {e}")
-        return jsonify({"error": str(e)}), 500
+    # Revalidate from file stats before reading any results
+    version = engine.detection_run_version(run_id)
+    etag = f"{run_id}.{version}.{'all' if include_rejected else 'visible'}"
+    if version is not None and etag in request.if_none_match:
+        return _revalidated(Response(status=304), etag)
+
+    # Load run metadata; symbol results are read (and rejected detections
+    # filtered out if requested) while streaming
+    loaded = engine.iter_detection_results(run_id, include_rejected)
+
+    if loaded is None:
+        return err("Detection results not found", 404, docId=doc_id, runId=run_id)
+
+    results, symbol_results = loaded
 
+    # Create response; symbolResults is encoded one symbol at a time
+    response = {
+        "docId": doc_id,
+        "runId": run_id,
+        "status": results.get("status"),
+        "summary": results.get("summary", {}),
+        "hasResults": True,
+        "createdAt": results.get("createdAt"),
+        "params": results.get("params", {}),
+    }
 
-@symbol_detection_bp.route("/api/update_detection_status", methods=["POST", "OPTIONS"])
+    return _revalidated(
+        Response(
+            iter_dumps_with_mapping(response, "symbolResults", symbol_results),
+            status=200,
+            mimetype="application/json",
+        ),
+        etag,
+    )
+
+
+def _revalidated(response, etag):
+    """Tag a response so clients revalidate it with If-None-Match."""
+    response.set_etag(etag)
+    response.cache_control.max_age = 0
+    response.cache_control.must_revalidate = True
+    return response
+
+
+# Simple-payload statuses and the update action each maps to
+_STATUS_ACTIONS = {"accepted": "accept", "rejected": "reject", "pending": "pending"}
+_UPDATE_ACTIONS = ("accept", "reject", "modify", "pending")
+
+
+def _validate_updates(updates):
+    """Return an error message for the first invalid update, or None."""
+    for i, update in enumerate(updates):
+        if "detectionId" not in update:
+            return f"Update {i}: Missing required field 'detectionId'"
+        if "action" not in update:
+            return f"Update {i}: Missing required field 'action'"
+        action = update["action"]
+        if action not in _UPDATE_ACTIONS:
+            return f"Update {i}: Invalid action '{action}'"
+        if action == "modify" and "newCoords" not in update:
+            return f"Update {i}: 'newCoords' required for modify action"
+    return None
+
+
+@symbol_detection_bp.route("/api/update_detection_status", methods=["POST"])
 def update_detection_status():
     """
     Update status of individual detections (accept/reject/modify).
@@ -399,9 +592,6 @@ def update_detection_status():
     }
     """
 
-    if request.method == "OPTIONS":
-        return "", 200
-
     try:
         data = request.get_json()
 
@@ -414,13 +604,9 @@ def update_detection_status():
             detection_id = data.get("detectionId")
             new_status = data.get("status") or data.get("newStatus")
             if detection_id and new_status:
-                if new_status not in ["accepted", "rejected", "pending"]:
-                    return jsonify({"error": f"Invalid status '{new_status}'"}), 400
-                action = (
-                    "accept"
-                    if new_status == "accepted"
-                    else "reject" if new_status == "rejected" else "pending"
-                )
+                action = _STATUS_ACTIONS.get(new_status)
+                if action is None:
+                    return err(f"Invalid status '{new_status}'", 400)
                 updates = [
                     {
                         "detectionId": detection_id,
@@ -430,82 +616,51 @@ def update_detection_status():
                 ]
 
         if not all([doc_id, run_id, updates]):
-            return (
-                jsonify(
-                    {"error": "Missing required parameters: docId, runId, updates"}
-                ),
-                400,
-            )
+            return err("Missing required parameters: docId, runId, updates", 400)
 
-        print(f"🔄 Updating detection statuses for document: {doc_id}, run: {run_id}")
-        print(f"   -> {len(updates)} updates to process")
+        log.info(
+            "Updating %d detection statuses for document %s, run %s",
+            len(updates),
+            doc_id,
+            run_id,
+        )
 
         # Validate updates
-        for i, update in enumerate(updates):
-            required_fields = ["detectionId", "action"]
-            for field in required_fields:
-                if field not in update:
-                    return (
-                        jsonify(
-                            {"error": f"Update {i}: Missing required field '{field}'"}
-                        ),
-                        400,
-                    )
-
-            if update["action"] not in ["accept", "reject", "modify", "pending"]:
-                return (
-                    jsonify(
-                        {"error": f"Update {i}: Invalid action '{update['action']}'"}
-                    ),
-                    400,
-                )
-
-            if update["action"] == "modify" and "newCoords" not in update:
-                return (
-                    jsonify(
-                        {"error": f"Update {i}: 'newCoords' required for modify action"}
-                    ),
-                    400,
-                )
-
-        # Get processed folder path
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
-
-        # Create detection engine and apply updates
-        engine = SymbolDetectionEngine(doc_id, processed_folder)
+        error = _validate_updates(updates)
+        if error:
+            return err(error, 400)
+
+        # Get detection engine and apply updates
+        engine = _get_engine(doc_id)
+        if engine is None:
+            return err("Document not found", 404)
+        # Apply any buffered updates for the run first, keeping request order
+        flush_status_updates(os.path.join(get_processed_folder(), doc_id), run_id)
         engine.update_detection_status(run_id, updates)
 
-        print(f"   ✅ Successfully updated {len(updates)} detection statuses")
-
-        return (
-            jsonify(
-                {
-                    "message": "Detection status updated successfully",
-                    "updatedCount": len(updates),
-                    "docId": doc_id,
-                    "runId": run_id,
-                }
-            ),
-            200,
+        return json_response(
+            {
+                "message": "Detection status updated successfully",
+                "updatedCount": len(updates),
+                "docId": doc_id,
+                "runId": run_id,
+            }
         )
 
     except FileNotFoundError:
-        return jsonify({"error": "Document or detection run not found"}), 404
+        return err("Document or detection run not found", 404)
 
     except ValueError as e:
-        return jsonify({"error": str(e)}), 400
+        return err(str(e), 400)
 
     except Exception as e:
-        print(f"❌ ERROR: Failed to update detection status: {e}")
-        return jsonify({"error": str(e)}), 500
+        log.exception("Failed to update detection status")
+        return err(str(e), 500)
 
 
 @symbol_detection_bp.route("/api/detection_runs/<doc_id>", methods=["GET"])
-def list_detection_runs(doc_id):
+@_doc_endpoint("list detection runs")
+def list_detection_runs(doc_id, engine):
     """
     List all detection runs for a document.
 
@@ -524,34 +679,26 @@ def list_detection_runs(doc_id):
     }
     """
 
-    try:
-        print(f"📋 Listing detection runs for document: {doc_id}")
-
-        # Get processed folder path
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
-
-        # Create detection engine
-        engine = SymbolDetectionEngine(doc_id, processed_folder)
+    log.debug("Listing detection runs for document %s", doc_id)
 
-        # Get runs list
-        runs = engine.list_detection_runs()
+    # The runs index is rewritten on every run change, so its stat is the
+    # validator; repeat polls of an unchanged index skip reading it
+    etag = f"runs.{engine.runs_index_version()}"
+    if etag in request.if_none_match:
+        return _revalidated(Response(status=304), etag)
 
-        return jsonify({"docId": doc_id, "runs": runs, "totalRuns": len(runs)}), 200
+    # Get runs list
+    runs = engine.list_detection_runs()
 
-    except FileNotFoundError:
-        return jsonify({"error": "Document not found"}), 404
-
-    except Exception as e:
-        print(f"❌ ERROR: Failed to list detection runs: {e}")
-        return jsonify({"error": str(e)}), 500
+    return _revalidated(
+        json_response({"docId": doc_id, "runs": runs, "totalRuns": len(runs)}),
+        etag,
+    )
 
 
 @symbol_detection_bp.route("/api/detection_runs/<doc_id>/<run_id>", methods=["DELETE"])
-def delete_detection_run(doc_id, run_id):
+@_doc_endpoint("delete detection run")
+def delete_detection_run(doc_id, engine, run_id):
     """
     Delete a specific detection run.
 
@@ -563,51 +710,58 @@ def delete_detection_run(doc_id, run_id):
     }
     """
 
-    try:
-        print(f"🗑️ Deleting detection run: {run_id} for document: {doc_id}")
+    log.info("Deleting detection run %s for document %s", run_id, doc_id)
 
-        # Get processed folder path
-        processed_folder = current_app.config.get("PROCESSED_FOLDER")
-        if not processed_folder:
-            processed_folder = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed")
-            )
+    # Delete the run
+    success = engine.delete_detection_run(run_id)
 
-        # Create detection engine
-        engine = SymbolDetectionEngine(doc_id, processed_folder)
+    if success:
+        return json_response(
+            {
+                "message": "Detection run deleted successfully",
+                "docId": doc_id,
+                "runId": run_id,
+            }
+        )
+    else:
+        return err("Detection run not found", 404, docId=doc_id, runId=run_id)
 
-        # Delete the run
-        success = engine.delete_detection_run(run_id)
 
-        if success:
-            return (
-                jsonify(
-                    {
-                        "message": "Detection run deleted successfully",
-                        "docId": doc_id,
-                        "runId": run_id,
-                    }
-                ),
-                200,
-            )
-        else:
-            return (
-                jsonify(
-                    {
-                        "error": "Detection run not found",
-                        "docId": doc_id,
-                        "runId": run_id,
-                    }
-                ),
-                404,
-            )
+# Health check endpoint. The payload is constant, so it is encoded once at
+# import; an import failure is cached as the (503) response instead.
+def _build_health_response():
+    try:
+        from utils.symbol_detection import __version__, __description__
 
+        payload = {
+            "status": "healthy",
+            "service": "Symbol Detection API",
+            "version": __version__,
+            "description": __description__,
+            "capabilities": [
+                "Multi-symbol detection",
+                "Real-time progress tracking",
+                "Result storage and retrieval",
+                "Detection status management",
+                "Coordinate transformation",
+            ],
+            "systemInfo": {
+                "algorithmBase": "gem_v5 with IoU verification",
+                "detectionDPI": 300,
+                "coordinateSystem": "PDF points (single source of truth)",
+                "supportedFormats": ["PDF"],
+                "maxConcurrentRuns": 1,  # Current limitation
+            },
+        }
+        return dumps(payload), 200
     except Exception as e:
-        print(f"❌ ERROR: Failed to delete detection run: {e}")
-        return jsonify({"error": str(e)}), 500
+        log.exception("Detection health check failed")
+        return dumps({"status": "error", "message": str(e)}), 503
+
+
+_HEALTH_BODY, _HEALTH_STATUS = _build_health_response()
 
 
-# Health check endpoint
 @symbol_detection_bp.route("/api/detection_health", methods=["GET"])
 def detection_health():
     """
@@ -621,35 +775,4 @@ def detection_health():
         "systemInfo": {...}
     }
     """
-
-    try:
-        from utils.symbol_detection import __version__, __description__
-
-        return (
-            jsonify(
-                {
-                    "status": "healthy",
-                    "service": "Symbol Detection API",
-                    "version": __version__,
-                    "description": __description__,
-                    "capabilities": [
-                        "Multi-symbol detection",
-                        "Real-time progress tracking",
-                        "Result storage and retrieval",
-                        "Detection status management",
-                        "Coordinate transformation",
-                    ],
-                    "systemInfo": {
-                        "algorithmBase": "gem_v5 with IoU verification",
-                        "detectionDPI": 300,
-                        "coordinateSystem": "PDF points (single source of truth)",
-                        "supportedFormats": ["PDF"],
-                        "maxConcurrentRuns": 1,  # Current limitation
-                    },
-                }
-            ),
-            200,
-        )
-
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    return Response(_HEALTH_BODY, status=_HEALTH_STATUS, mimetype=JSON_MIMETYPE)
@@ -1,15 +1,39 @@
 import os
+import json
 import uuid
-from flask import Flask, request, jsonify, send_from_directory
+import hashlib
+import logging
+import mimetypes
+import queue
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask import Flask, Response, abort, request, jsonify, send_from_directory
 from flask_cors import CORS
+from werkzeug.security import safe_join
 import fitz  # PyMuPDF
+from PIL import features
 
 # Import new modular components
 from api.page_to_html import page_to_html_bp
 from api.symbol_annotation import symbol_annotation_bp
 from api.symbol_detection import symbol_detection_bp
 from api.detection_updates import detection_updates_bp
-from utils.pdf_processor import PDFProcessor
+from utils.pdf_processor import (
+    DEFAULT_PAGE_IMAGE_FORMAT,
+    PAGE_IMAGE_FORMATS,
+    PDFProcessor,
+    render_page_images,
+)
+from utils.atomic_write import write_file_atomic
+from utils.file_cache import read_bytes_cached
+from utils.json_io import dumps, loads
+from utils.logging_config import configure_logging
+from utils.process_pool import get_process_pool
+
+configure_logging()
+log = logging.getLogger(__name__)
 
 # --- Basic Flask App Setup ---
 app = Flask(__name__)
@@ -49,6 +73,25 @@ PROCESSED_FOLDER = os.path.abspath(
 )
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["PROCESSED_FOLDER"] = PROCESSED_FOLDER
+# Encoding for saved symbol clippings: "WEBP" (lossless) or "PNG"
+app.config["SYMBOL_IMAGE_FORMAT"] = os.getenv("SYMBOL_IMAGE_FORMAT", "WEBP")
+# Behind nginx, let it serve symbols_metadata.json via X-Accel-Redirect
+app.config["USE_X_ACCEL"] = os.getenv("USE_X_ACCEL", "").lower() in ("1", "true", "yes")
+app.config["X_ACCEL_PREFIX"] = os.getenv("X_ACCEL_PREFIX", "/internal-processed/")
+
+# Resolution of the legacy page_<n>.png images written on upload; a request
+# can override it with a "dpi" form field, clamped to PAGE_IMAGE_DPI_RANGE.
+# The images are only displayed, and their DPI is recorded in page_metadata.
+app.config["PAGE_IMAGE_DPI"] = int(os.getenv("PAGE_IMAGE_DPI", "150"))
+PAGE_IMAGE_DPI_RANGE = (72, 300)
+# Encoding for those images: "WEBP" (lossless) or "PNG"
+app.config["PAGE_IMAGE_FORMAT"] = os.getenv(
+    "PAGE_IMAGE_FORMAT", DEFAULT_PAGE_IMAGE_FORMAT
+)
+
+# Buffer size for the upload copy and the JSON files written below; much
+# larger than the 8-16 KiB defaults so multi-MB writes take few syscalls
+WRITE_BUFFER_SIZE = 1 << 20
 
 # Ensure the directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -60,10 +103,226 @@ print(f" -> Uploads will be stored in: {os.path.abspath(UPLOAD_FOLDER)}")
 print(f" -> Processed data will be stored in: {os.path.abspath(PROCESSED_FOLDER)}")
 
 
+def _page_image_format() -> str:
+    """Configured page image format, falling back to PNG without libwebp."""
+    image_format = app.config["PAGE_IMAGE_FORMAT"].upper()
+    if image_format not in PAGE_IMAGE_FORMATS:
+        raise ValueError(f"Unsupported PAGE_IMAGE_FORMAT: {image_format}")
+    if image_format == "WEBP" and not features.check("webp"):
+        return "PNG"
+    return image_format
+
+
+# Annotations, summaries and project data are written by one background
+# thread so autosave requests do not wait on the disk. Pending saves are kept
+# by path: a burst of saves to one file is written once, with the latest data,
+# and the load endpoints read a pending save before the file. A failed write
+# keeps its pending save (so loads still return it) and is retried after each
+# of _SAVE_RETRY_DELAYS in turn, then dropped. A save whose document directory
+# no longer exists is dropped at once.
+_SAVE_RETRY_DELAYS = (1.0, 2.0, 4.0, 8.0, 16.0)
+_pending_saves = {}
+# Failed write attempts by path, for saves that are being retried
+_save_failures = {}
+_pending_saves_lock = threading.Lock()
+_save_queue: "queue.Queue[str]" = queue.Queue()
+
+
+def _queue_save(path: str, data: bytes) -> None:
+    with _pending_saves_lock:
+        already_queued = path in _pending_saves
+        _pending_saves[path] = data
+    if not already_queued:
+        _save_queue.put(path)
+
+
+def _read_saved(path: str):
+    """Latest saved bytes for path (a pending save, else the file) or None."""
+    with _pending_saves_lock:
+        data = _pending_saves.get(path)
+    if data is not None:
+        return data
+    try:
+        return read_bytes_cached(path)
+    except FileNotFoundError:
+        return None
+
+
+def _saved_json_response(saved: bytes) -> Response:
+    """
+    Stored JSON, sent as-is without parsing, with an ETag of its content so
+    unchanged data is answered with 304 Not Modified. The content (not the
+    file's mtime) is hashed because it may come from a pending save.
+
+    Saves are stored compact; ?pretty=1 re-encodes with indentation for
+    reading by hand.
+    """
+    if request.args.get("pretty") == "1":
+        saved = dumps(loads(saved), indent=True)
+    response = Response(saved, mimetype="application/json")
+    response.add_etag()
+    response.cache_control.max_age = 0
+    response.cache_control.must_revalidate = True
+    return response.make_conditional(request)
+
+
+def _retry_save(path: str) -> None:
+    """Schedule another write of a failed save, or drop it."""
+    if not os.path.isdir(os.path.dirname(path)):
+        log.warning("Dropped save to %s: its directory no longer exists", path)
+        _drop_save(path)
+        return
+
+    with _pending_saves_lock:
+        failures = _save_failures.get(path, 0)
+        _save_failures[path] = failures + 1
+    if failures == len(_SAVE_RETRY_DELAYS):
+        log.exception("Dropped save to %s after %d failed writes", path, failures + 1)
+        _drop_save(path)
+        return
+
+    if failures == 0:
+        log.exception("Failed to write %s; retrying", path)
+    else:
+        log.warning("Failed to write %s again (attempt %d)", path, failures + 1)
+    retry = threading.Timer(_SAVE_RETRY_DELAYS[failures], _save_queue.put, (path,))
+    retry.daemon = True
+    retry.start()
+
+
+def _drop_save(path: str) -> None:
+    with _pending_saves_lock:
+        _pending_saves.pop(path, None)
+        _save_failures.pop(path, None)
+
+
+def _save_worker():
+    while True:
+        path = _save_queue.get()
+        with _pending_saves_lock:
+            data = _pending_saves[path]
+        try:
+            write_file_atomic(path, data, fsync=True)
+        except Exception:
+            _retry_save(path)
+        else:
+            with _pending_saves_lock:
+                _save_failures.pop(path, None)
+                if _pending_saves[path] is data:
+                    del _pending_saves[path]
+                else:
+                    # Saved again while writing; write the newer data too
+                    _save_queue.put(path)
+        finally:
+            _save_queue.task_done()
+
+
+threading.Thread(target=_save_worker, name="project-saves", daemon=True).start()
+
+# PDF readers (MuPDF included) accept the %PDF- header anywhere in the first
+# 1024 bytes, so uploads are checked over the same window
+_PDF_HEADER_WINDOW = 1024
+
+
+def _looks_like_pdf(file) -> bool:
+    """Whether an upload has the PDF magic, checked without parsing it."""
+    head = file.stream.read(_PDF_HEADER_WINDOW)
+    file.stream.seek(0)
+    return b"%PDF-" in head
+
+
+# Processed uploads by content, so re-uploading an identical PDF returns the
+# existing document. Maps "<sha256>:<dpi>:<image format>" to a docId.
+_UPLOAD_INDEX_FILE = "upload_hashes.json"
+_upload_index_lock = threading.Lock()
+
+# Per upload key locks, held from the index lookup until the new document is
+# recorded, so identical concurrent uploads are processed once: the others
+# wait and are then answered from the index. Entries are reference counted
+# and dropped once no request holds or waits on them.
+_upload_key_locks = {}
+_upload_key_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _upload_key_lock(upload_key: str):
+    with _upload_key_locks_guard:
+        entry = _upload_key_locks.get(upload_key)
+        if entry is None:
+            entry = _upload_key_locks[upload_key] = [threading.Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _upload_key_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _upload_key_locks[upload_key]
+
+
+def _upload_digest(file) -> str:
+    """SHA-256 of an upload's contents; the stream is rewound afterwards."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.stream.read(WRITE_BUFFER_SIZE), b""):
+        digest.update(chunk)
+    file.stream.seek(0)
+    return digest.hexdigest()
+
+
+def _upload_index_path() -> str:
+    return os.path.join(app.config["PROCESSED_FOLDER"], _UPLOAD_INDEX_FILE)
+
+
+def _find_processed_upload(upload_key: str):
+    """docId of a finished document for this upload key, or None."""
+    try:
+        index = loads(read_bytes_cached(_upload_index_path()))
+    except FileNotFoundError:
+        return None
+    doc_id = index.get(upload_key)
+    if doc_id is None:
+        return None
+    doc_dir = os.path.join(app.config["PROCESSED_FOLDER"], doc_id)
+    if not os.path.exists(os.path.join(doc_dir, "page_metadata.json")):
+        return None  # Deleted since it was recorded
+    return doc_id
+
+
+def _record_processed_upload(upload_key: str, doc_id: str) -> None:
+    index_path = _upload_index_path()
+    with _upload_index_lock:
+        try:
+            with open(index_path, "rb") as f:
+                index = loads(f.read())
+        except FileNotFoundError:
+            index = {}
+        index[upload_key] = doc_id
+        write_file_atomic(index_path, dumps(index), fsync=True)
+
+
+def _processed_upload_response(doc_id: str) -> dict:
+    """The /api/upload response for an already processed document."""
+    doc_dir = os.path.join(app.config["PROCESSED_FOLDER"], doc_id)
+    with open(os.path.join(doc_dir, "page_metadata.json"), "rb") as f:
+        metadata = loads(f.read())
+    with open(os.path.join(doc_dir, "processing_metadata.json"), "rb") as f:
+        processing_summary = loads(f.read())["processing_summary"]
+    return {
+        "message": "File already processed",
+        "docId": doc_id,
+        "totalPages": metadata["totalPages"],
+        "processing_summary": processing_summary,
+        "pageMetadata": metadata["pages"],
+        "pageImageExtension": metadata.get("pageImageExtension", ".png"),
+        "cached": True,
+    }
+
+
 # --- API Endpoints ---
 
 
-@app.route("/api/upload", methods=["POST", "OPTIONS"])
+@app.route("/api/upload", methods=["POST"])
 def upload_and_process_pdf():
     """
     Handles the PDF file upload and processes it using the modular PDF processor.
@@ -75,11 +334,6 @@ def upload_and_process_pdf():
     print(f"Request origin: {request.headers.get('Origin', 'No origin header')}")
     print(f"Request headers: {dict(request.headers)}")
 
-    # Handle preflight OPTIONS request
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request")
-        return "", 200
-
     # 1. Check if a file was sent
     if "file" not in request.files:
         print("❌ ERROR: No file part in the request.")
@@ -91,96 +345,144 @@ def upload_and_process_pdf():
         print("❌ ERROR: No file selected.")
         return jsonify({"error": "No file selected"}), 400
 
-    if file and file.filename.endswith(".pdf"):
+    try:
+        dpi = int(request.form.get("dpi", app.config["PAGE_IMAGE_DPI"]))
+    except ValueError:
+        return jsonify({"error": "dpi must be an integer"}), 400
+    dpi = min(max(dpi, PAGE_IMAGE_DPI_RANGE[0]), PAGE_IMAGE_DPI_RANGE[1])
+
+    if file and _looks_like_pdf(file):
         try:
-            # 2. Save the uploaded PDF temporarily
             original_filename = file.filename
             print(f"📄 Received file: {original_filename}")
 
-            temp_pdf_path = os.path.join(app.config["UPLOAD_FOLDER"], original_filename)
-            file.save(temp_pdf_path)
-            print(f"   -> Temporarily saved PDF to: {temp_pdf_path}")
-
-            # 3. Process the PDF using the new modular processor
-            doc_id = str(uuid.uuid4())
-            output_dir = os.path.join(app.config["PROCESSED_FOLDER"], doc_id)
-
-            # Create the modular PDF processor
-            pdf_processor = PDFProcessor(dpi=300, high_res_dpi=300)
-
-            # Process the PDF
-            processing_results = pdf_processor.process_pdf(
-                temp_pdf_path, output_dir, doc_id
-            )
-
-            # Create legacy page images for backward compatibility
-            doc = fitz.open(temp_pdf_path)
-            num_pages = len(doc)
-
-            # Create standardized page metadata using new coordinate system
-            from utils.coordinate_mapping import PageMetadata, DEFAULT_DPI, HIGH_RES_DPI
-
-            page_metadata = {}
-            dpi = DEFAULT_DPI
-
-            for page_num in range(num_pages):
-                page = doc.load_page(page_num)
-                page_number = page_num + 1
-
-                # Get original PDF page dimensions (in points)
-                pdf_rect = page.rect
-
-                # Calculate image dimensions
-                image_width_pixels = int(pdf_rect.width * dpi / 72.0)
-                image_height_pixels = int(pdf_rect.height * dpi / 72.0)
-                high_res_width_pixels = int(pdf_rect.width * HIGH_RES_DPI / 72.0)
-                high_res_height_pixels = int(pdf_rect.height * HIGH_RES_DPI / 72.0)
-
-                # Create standardized page metadata
-                page_meta = PageMetadata(
-                    page_number=page_number,
-                    pdf_width_points=pdf_rect.width,
-                    pdf_height_points=pdf_rect.height,
-                    pdf_rotation_degrees=page.rotation,
-                    image_width_pixels=image_width_pixels,
-                    image_height_pixels=image_height_pixels,
-                    image_dpi=dpi,
-                    high_res_image_width_pixels=high_res_width_pixels,
-                    high_res_image_height_pixels=high_res_height_pixels,
-                    high_res_dpi=HIGH_RES_DPI,
+            image_format = _page_image_format()
+            image_extension = PAGE_IMAGE_FORMATS[image_format][0]
+
+            # An identical PDF already processed (or being processed) with the
+            # same image settings is answered with that document instead of
+            # being processed again
+            upload_key = f"{_upload_digest(file)}:{dpi}:{image_format}"
+            with _upload_key_lock(upload_key):
+                prior_doc_id = _find_processed_upload(upload_key)
+                if prior_doc_id is not None:
+                    log.info("Identical upload already processed: %s", prior_doc_id)
+                    return jsonify(_processed_upload_response(prior_doc_id)), 200
+
+                # 2. Save the uploaded PDF straight to the document's original.pdf;
+                # the processor reuses it instead of copying a temporary file
+                doc_id = str(uuid.uuid4())
+                output_dir = os.path.join(app.config["PROCESSED_FOLDER"], doc_id)
+                os.makedirs(output_dir, exist_ok=True)
+
+                pdf_path = os.path.join(output_dir, "original.pdf")
+                file.save(pdf_path, buffer_size=WRITE_BUFFER_SIZE)
+                print(f"   -> Saved PDF to: {pdf_path}")
+
+                # 3. Process the PDF using the new modular processor
+
+                # Create the modular PDF processor
+                pdf_processor = PDFProcessor(dpi=300, high_res_dpi=300)
+
+                # Process the PDF in the shared process pool, alongside the
+                # legacy page renders below, so this request thread only waits on
+                # futures and does not hold the GIL away from other requests
+                render_pool = get_process_pool()
+                processing_future = render_pool.submit(
+                    pdf_processor.process_pdf, pdf_path, output_dir, doc_id
                 )
 
-                # Create pixmap for this page at standard DPI (300 DPI)
-                pix = page.get_pixmap(dpi=dpi)
+                # Create legacy page images for backward compatibility
+                doc = fitz.open(pdf_path)
+                num_pages = len(doc)
+
+                # Create standardized page metadata using new coordinate system
+                from utils.coordinate_mapping import PageMetadata, HIGH_RES_DPI
+
+                page_metadata = {}
+
+                for page_num in range(num_pages):
+                    page = doc.load_page(page_num)
+                    page_number = page_num + 1
+
+                    # Get original PDF page dimensions (in points)
+                    pdf_rect = page.rect
+
+                    # Calculate image dimensions
+                    image_width_pixels = int(pdf_rect.width * dpi / 72.0)
+                    image_height_pixels = int(pdf_rect.height * dpi / 72.0)
+                    high_res_width_pixels = int(pdf_rect.width * HIGH_RES_DPI / 72.0)
+                    high_res_height_pixels = int(pdf_rect.height * HIGH_RES_DPI / 72.0)
+
+                    # Create standardized page metadata
+                    page_meta = PageMetadata(
+                        page_number=page_number,
+                        pdf_width_points=pdf_rect.width,
+                        pdf_height_points=pdf_rect.height,
+                        pdf_rotation_degrees=page.rotation,
+                        image_width_pixels=image_width_pixels,
+                        image_height_pixels=image_height_pixels,
+                        image_dpi=dpi,
+                        high_res_image_width_pixels=high_res_width_pixels,
+                        high_res_image_height_pixels=high_res_height_pixels,
+                        high_res_dpi=HIGH_RES_DPI,
+                    )
 
-                # Save the page image
-                image_path = os.path.join(output_dir, f"page_{page_number}.png")
-                pix.save(image_path)
+                    # Store metadata using new format
+                    page_metadata[page_number] = page_meta.to_dict()
+
+                doc.close()
+
+                # Render the page images at the requested DPI, in contiguous
+                # chunks of pages so each worker opens the PDF once per chunk
+                chunk_size = max(1, num_pages // (4 * (os.cpu_count() or 1)))
+                page_chunks = [
+                    list(range(start, min(start + chunk_size, num_pages)))
+                    for start in range(0, num_pages, chunk_size)
+                ]
+                rendered_chunks = render_pool.map(
+                    render_page_images,
+                    [pdf_path] * len(page_chunks),
+                    page_chunks,
+                    [output_dir] * len(page_chunks),
+                    [dpi] * len(page_chunks),
+                    [image_format] * len(page_chunks),
+                )
+                # One summary line rather than a print per page
+                rendered_pages = sum(len(rendered) for rendered in rendered_chunks)
                 print(
-                    f"   -> Page {page_number} image saved: {image_path} ({pix.width}x{pix.height})"
+                    f"   -> {rendered_pages} page images saved at {dpi} DPI ({image_extension})"
                 )
 
-                # Store metadata using new format
-                page_metadata[page_number] = page_meta.to_dict()
+                processing_results = processing_future.result()
 
-            # Save standardized metadata to JSON file
-            metadata_file = os.path.join(output_dir, "page_metadata.json")
-            import json
-
-            with open(metadata_file, "w") as f:
-                json.dump(
-                    {"docId": doc_id, "totalPages": num_pages, "pages": page_metadata},
-                    f,
-                    indent=2,
-                )
-
-            doc.close()
+                # URLs of the canvas page images written by the PDF processor, so
+                # /api/get_page_image can answer without touching the filesystem
+                page_images = {}
+                for page_number in range(1, num_pages + 1):
+                    pixmap_name = f"page_{page_number}/page_{page_number}_pixmap.png"
+                    if os.path.exists(os.path.join(output_dir, pixmap_name)):
+                        page_images[page_number] = (
+                            f"/data/processed/{doc_id}/{pixmap_name}"
+                        )
 
-            # 4. Clean up the temporary PDF
-            os.remove(temp_pdf_path)
-            print(f"   -> Cleaned up temporary file: {temp_pdf_path}")
+                # Save standardized metadata to JSON file
+                metadata_file = os.path.join(output_dir, "page_metadata.json")
+                with open(metadata_file, "w", buffering=WRITE_BUFFER_SIZE) as f:
+                    json.dump(
+                        {
+                            "docId": doc_id,
+                            "totalPages": num_pages,
+                            "pages": page_metadata,
+                            "page_images": page_images,
+                            "pageImageExtension": image_extension,
+                        },
+                        f,
+                        indent=2,
+                    )
+                _record_processed_upload(upload_key, doc_id)
 
-            # 5. Return a success response
+            # 4. Return a success response
             print(
                 "--- ✅ Successfully processed PDF. Sending response to frontend. ---"
             )
@@ -190,8 +492,6 @@ def upload_and_process_pdf():
             print(f"📊 Processing summary: {processing_results['processing_summary']}")
 
             # Test JSON serialization of each component
-            import json
-
             try:
                 json.dumps(processing_results["processing_summary"])
                 print("✅ processing_summary is JSON serializable")
@@ -211,6 +511,7 @@ def upload_and_process_pdf():
                 "totalPages": num_pages,
                 "processing_summary": processing_results["processing_summary"],
                 "pageMetadata": page_metadata,  # This should be serialized dicts now
+                "pageImageExtension": image_extension,
             }
 
             print(f"📤 Response data keys: {response_data.keys()}")
@@ -242,7 +543,7 @@ def upload_and_process_pdf():
     return jsonify({"error": "Invalid file type"}), 400
 
 
-@app.route("/api/save_annotations", methods=["POST", "OPTIONS"])
+@app.route("/api/save_annotations", methods=["POST"])
 def save_annotations():
     """
     Saves annotation data for a document to a JSON file.
@@ -250,11 +551,6 @@ def save_annotations():
     print("\n--- Received request on /api/save_annotations ---")
     print(f"Request method: {request.method}")
 
-    # Handle preflight OPTIONS request
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request for annotations")
-        return "", 200
-
     try:
         data = request.get_json()
 
@@ -281,26 +577,24 @@ def save_annotations():
         # Save annotations to JSON file
         annotations_file = os.path.join(doc_dir, "annotations.json")
 
+        # Count annotations by page for metadata
+        annotations_by_page = Counter(
+            annotation.get("pageNumber", 1) for annotation in annotations
+        )
+
         # Create the annotation data structure
         annotation_data = {
             "docId": doc_id,
-            "timestamp": str(uuid.uuid4()),  # Using uuid as timestamp for now
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "annotations": annotations,
-            "metadata": {"totalAnnotations": len(annotations), "annotationsByPage": {}},
+            "metadata": {
+                "totalAnnotations": len(annotations),
+                "annotationsByPage": dict(annotations_by_page),
+            },
         }
 
-        # Group annotations by page for metadata
-        for annotation in annotations:
-            page = annotation.get("pageNumber", 1)
-            if page not in annotation_data["metadata"]["annotationsByPage"]:
-                annotation_data["metadata"]["annotationsByPage"][page] = 0
-            annotation_data["metadata"]["annotationsByPage"][page] += 1
-
-        # Write to file
-        import json
-
-        with open(annotations_file, "w") as f:
-            json.dump(annotation_data, f, indent=2)
+        # Queue the write; the background writer replaces the file
+        _queue_save(annotations_file, dumps(annotation_data))
 
         print(f"   ✅ Annotations saved to: {annotations_file}")
 
@@ -332,7 +626,8 @@ def load_annotations(doc_id):
         doc_dir = os.path.join(app.config["PROCESSED_FOLDER"], doc_id)
         annotations_file = os.path.join(doc_dir, "annotations.json")
 
-        if not os.path.exists(annotations_file):
+        saved = _read_saved(annotations_file)
+        if saved is None:
             print(f"   ⚠️  No annotations file found for document {doc_id}")
             return (
                 jsonify(
@@ -345,31 +640,22 @@ def load_annotations(doc_id):
                 200,
             )
 
-        import json
+        log.debug("Loaded annotations for %s", doc_id)
 
-        with open(annotations_file, "r") as f:
-            annotation_data = json.load(f)
-
-        print(f"   ✅ Loaded {len(annotation_data.get('annotations', []))} annotations")
-
-        return jsonify(annotation_data), 200
+        return _saved_json_response(saved)
 
     except Exception as e:
         print(f"❌ ERROR: Failed to load annotations: {e}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/save_summaries", methods=["POST", "OPTIONS"])
+@app.route("/api/save_summaries", methods=["POST"])
 def save_summaries():
     """
     Saves page summaries for a document to a JSON file.
     """
     print("\n--- Received request on /api/save_summaries ---")
 
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request for summaries")
-        return "", 200
-
     try:
         data = request.get_json()
 
@@ -390,20 +676,18 @@ def save_summaries():
 
         summaries_file = os.path.join(doc_dir, "summaries.json")
 
+        timestamp = datetime.now(timezone.utc).isoformat()
         summary_data = {
             "docId": doc_id,
-            "timestamp": str(uuid.uuid4()),
+            "timestamp": timestamp,
             "summaries": summaries,
             "metadata": {
                 "totalPages": len(summaries),
-                "lastUpdated": str(uuid.uuid4()),  # placeholder for actual timestamp
+                "lastUpdated": timestamp,
             },
         }
 
-        import json
-
-        with open(summaries_file, "w") as f:
-            json.dump(summary_data, f, indent=2)
+        _queue_save(summaries_file, dumps(summary_data))
 
         print(f"   ✅ Summaries saved to: {summaries_file}")
 
@@ -434,7 +718,8 @@ def load_summaries(doc_id):
         doc_dir = os.path.join(app.config["PROCESSED_FOLDER"], doc_id)
         summaries_file = os.path.join(doc_dir, "summaries.json")
 
-        if not os.path.exists(summaries_file):
+        saved = _read_saved(summaries_file)
+        if saved is None:
             print(f"   ⚠️  No summaries file found for document {doc_id}")
             return (
                 jsonify(
@@ -443,23 +728,16 @@ def load_summaries(doc_id):
                 200,
             )
 
-        import json
+        log.debug("Loaded summaries for %s", doc_id)
 
-        with open(summaries_file, "r") as f:
-            summary_data = json.load(f)
-
-        print(
-            f"   ✅ Loaded summaries for {len(summary_data.get('summaries', {}))} pages"
-        )
-
-        return jsonify(summary_data), 200
+        return _saved_json_response(saved)
 
     except Exception as e:
         print(f"❌ ERROR: Failed to load summaries: {e}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/generate_summary", methods=["POST", "OPTIONS"])
+@app.route("/api/generate_summary", methods=["POST"])
 def generate_summary():
     """
     Generates an AI summary for a specific page (placeholder implementation).
@@ -467,10 +745,6 @@ def generate_summary():
     """
     print("\n--- Received request on /api/generate_summary ---")
 
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request for summary generation")
-        return "", 200
-
     try:
         data = request.get_json()
 
@@ -508,17 +782,13 @@ def generate_summary():
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/save_project_data", methods=["POST", "OPTIONS"])
+@app.route("/api/save_project_data", methods=["POST"])
 def save_project_data():
     """
     Saves complete project data including annotations, summaries, and pipeline state.
     """
     print("\n--- Received request on /api/save_project_data ---")
 
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request for project data")
-        return "", 200
-
     try:
         data = request.get_json()
 
@@ -539,21 +809,19 @@ def save_project_data():
 
         project_file = os.path.join(doc_dir, "project_data.json")
 
+        timestamp = datetime.now(timezone.utc).isoformat()
         complete_project_data = {
             "docId": doc_id,
-            "timestamp": str(uuid.uuid4()),
+            "timestamp": timestamp,
             "projectData": project_data,
             "metadata": {
                 "version": "1.0",
-                "lastUpdated": str(uuid.uuid4()),  # placeholder for actual timestamp
+                "lastUpdated": timestamp,
                 "pipeline_stage": "define_key_areas",  # this would be dynamic
             },
         }
 
-        import json
-
-        with open(project_file, "w") as f:
-            json.dump(complete_project_data, f, indent=2)
+        _queue_save(project_file, dumps(complete_project_data))
 
         print(f"   ✅ Project data saved to: {project_file}")
 
@@ -584,7 +852,8 @@ def load_project_data(doc_id):
         doc_dir = os.path.join(app.config["PROCESSED_FOLDER"], doc_id)
         project_file = os.path.join(doc_dir, "project_data.json")
 
-        if not os.path.exists(project_file):
+        saved = _read_saved(project_file)
+        if saved is None:
             print(f"   ⚠️  No project data file found for document {doc_id}")
             return (
                 jsonify(
@@ -603,31 +872,22 @@ def load_project_data(doc_id):
                 200,
             )
 
-        import json
-
-        with open(project_file, "r") as f:
-            project_data = json.load(f)
-
         print(f"   ✅ Loaded project data")
 
-        return jsonify(project_data), 200
+        return _saved_json_response(saved)
 
     except Exception as e:
         print(f"❌ ERROR: Failed to load project data: {e}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/generate_clippings", methods=["POST", "OPTIONS"])
+@app.route("/api/generate_clippings", methods=["POST"])
 def generate_clippings():
     """
     Generates high-resolution clippings from PDF based on canvas annotations.
     """
     print("\n--- Received request on /api/generate_clippings ---")
 
-    if request.method == "OPTIONS":
-        print("Handling preflight OPTIONS request for clippings")
-        return "", 200
-
     try:
         data = request.get_json()
 
@@ -660,8 +920,6 @@ def generate_clippings():
         if not os.path.exists(metadata_file):
             return jsonify({"error": "Page metadata not found"}), 404
 
-        import json
-
         with open(metadata_file, "r") as f:
             metadata = json.load(f)
 
@@ -1096,10 +1354,28 @@ def generate_test_clipping(doc, clipping_results, doc_dir):
 def serve_processed_file(path):
     """
     Serves files from the processed data directory.
+
+    With USE_X_ACCEL set, the file is handed off to nginx through an
+    X-Accel-Redirect header so it is sent without passing through Python,
+    which needs an internal location such as:
+
+        location /internal-processed/ { internal; alias /data/processed/; }
     """
-    print(f"---  Serving file request: {path} ---")
+    log.debug("Serving file request: %s", path)
+    if app.config["USE_X_ACCEL"]:
+        # Same path check send_from_directory applies
+        if safe_join(app.config["PROCESSED_FOLDER"], path) is None:
+            abort(404)
+        accel_prefix = app.config["X_ACCEL_PREFIX"].rstrip("/")
+        return Response(
+            "",
+            mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream",
+            headers={"X-Accel-Redirect": f"{accel_prefix}/{path}"},
+        )
     return send_from_directory(app.config["PROCESSED_FOLDER"], path)
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5001)
+    # Spawned process pool workers re-import the main module, so the server
+    # is started from server.py, which does not import this one at the top
+    raise SystemExit("Start the development server with: python server.py")
@@ -0,0 +1,13 @@
+"""
+Development server entry point: python server.py
+
+The shared process pool spawns its workers, and each worker re-imports the
+main module. Starting the server from this module, which imports the Flask
+app only under the __main__ guard, keeps the workers from loading the app
+(logging setup, blueprints and background threads).
+"""
+
+if __name__ == "__main__":
+    from app import app
+
+    app.run(debug=True, port=5001)
@@ -100,15 +100,24 @@ def test_get_page_html():
         response = requests.get("http://localhost:5001/api/get_page_html/TEST/1")
         
         if response.status_code == 200:
-            result = response.json()
+            html_content = response.text
             print("✅ Success!")
-            print(f"   Doc ID: {result['docId']}")
-            print(f"   Page Number: {result['pageNumber']}")
-            print(f"   HTML Content Length: {len(result['htmlContent'])} characters")
-            print(f"   HTML File Path: {result['htmlFilePath']}")
+            print(f"   Content-Type: {response.headers.get('Content-Type')}")
+            print(f"   Doc ID: {response.headers.get('X-Doc-Id')}")
+            print(f"   Page Number: {response.headers.get('X-Page-Number')}")
+            print(f"   HTML Content Length: {len(html_content)} characters")
+            
+            # Unchanged pages should revalidate with 304 Not Modified
+            etag = response.headers.get("ETag")
+            if etag:
+                cached = requests.get(
+                    "http://localhost:5001/api/get_page_html/TEST/1",
+                    headers={"If-None-Match": etag},
+                )
+                print(f"   Conditional request status: {cached.status_code}")
             
             # Show a snippet of the HTML
-            html_snippet = result['htmlContent'][:200] + "..." if len(result['htmlContent']) > 200 else result['htmlContent']
+            html_snippet = html_content[:200] + "..." if len(html_content) > 200 else html_content
             print(f"   HTML Snippet: {html_snippet}")
             
             return True
@@ -128,7 +137,7 @@ def main():
     """Run all tests."""
     
     print("🚀 Starting API tests for page-to-HTML endpoints")
-    print("📋 Make sure the Flask server is running (python app.py)")
+    print("📋 Make sure the Flask server is running (python server.py)")
     print("=" * 60)
     
     success_count = 0
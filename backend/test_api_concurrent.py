@@ -148,12 +148,10 @@ def test_get_page_html():
         response = requests.get(api_url)
         
         if response.status_code == 200:
-            result = response.json()
-            html_content = result["htmlContent"]
+            html_content = response.text
             
             print(f"   ✅ Page {page_num} HTML retrieved!")
             print(f"   HTML length: {len(html_content)} characters")
-            print(f"   File path: {result['htmlFilePath']}")
             
             # Show a preview of the HTML
             preview = html_content[:200] + "..." if len(html_content) > 200 else html_content
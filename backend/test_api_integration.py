@@ -440,7 +440,7 @@ def run_api_integration_tests():
     # Test API health first
     if not test_api_health():
         print(f"\n❌ API server is not responding. Please start the backend server:")
-        print(f"   cd backend && python app.py")
+        print(f"   cd backend && python server.py")
         return False
     
     # Create test document
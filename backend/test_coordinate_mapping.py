@@ -31,6 +31,16 @@ def test_coordinate_classes():
     rect_tuple = pdf_coords.to_rect_tuple()
     assert rect_tuple == (100.0, 200.0, 250.0, 275.0)
     
+    # Round trip through the NumPy row representation
+    pdf_row = PDFCoordinates.array_from_dict(pdf_dict)
+    assert pdf_row.tolist() == [100.0, 200.0, 150.0, 75.0]
+    assert PDFCoordinates.from_array(pdf_row) == pdf_coords
+    try:
+        PDFCoordinates.array_from_dict({"left_points": 1.0})
+        assert False, "Expected ValueError for incomplete pdfCoords"
+    except ValueError:
+        pass
+    
     # Test ImageCoordinates
     img_coords = ImageCoordinates(left=278, top=556, width=417, height=208, dpi=200)
     img_dict = img_coords.to_dict()
@@ -127,6 +137,67 @@ def test_basic_transformations():
     print("✅ Basic transformations test passed")
 
 
+def test_batch_transformations():
+    """Test that batched PDF → Image transforms match the single-box path"""
+    print("🧪 Testing batched coordinate transformations...")
+    
+    metadata = PageMetadata(
+        page_number=1,
+        pdf_width_points=612.0,
+        pdf_height_points=792.0,
+        pdf_rotation_degrees=0,
+        image_width_pixels=1700,
+        image_height_pixels=2200,
+        image_dpi=200,
+        high_res_image_width_pixels=2550,
+        high_res_image_height_pixels=3300,
+        high_res_dpi=300
+    )
+    
+    transformer = CoordinateTransformer(metadata)
+    
+    boxes = [
+        PDFCoordinates(left=100.0, top=200.0, width=150.0, height=75.0),
+        PDFCoordinates(left=0.0, top=0.0, width=612.0, height=792.0),
+        PDFCoordinates(left=33.3, top=47.9, width=0.5, height=12.25),
+    ]
+    batch = transformer.pdf_to_image_batch(
+        [[b.left, b.top, b.width, b.height] for b in boxes]
+    )
+    
+    assert batch.shape == (len(boxes), 4)
+    for box, row in zip(boxes, batch.tolist()):
+        single = transformer.pdf_to_image(box)
+        assert row == [single.left, single.top, single.width, single.height]
+    
+    # A single flat box is accepted as a batch of one
+    assert transformer.pdf_to_image_batch([100.0, 200.0, 150.0, 75.0]).shape == (1, 4)
+    
+    # Legend clipping transforms: canvas → clipping → PDF
+    clipping_transformer = ClippingCoordinateTransformer(
+        legend_pdf_coords=PDFCoordinates(left=100.0, top=100.0, width=200.0, height=150.0),
+        clipping_dpi=HIGH_RES_DPI,
+        page_metadata=metadata
+    )
+    canvas_boxes = [
+        CanvasCoordinates(left=10.0, top=20.0, width=42.5, height=30.0, canvas_width=833.0, canvas_height=625.0),
+        CanvasCoordinates(left=0.0, top=0.0, width=400.0, height=300.0, canvas_width=400.0, canvas_height=320.0),
+        CanvasCoordinates(left=-5.0, top=7.7, width=1.3, height=9.9, canvas_width=1000.0, canvas_height=500.0),
+    ]
+    clipping_batch = clipping_transformer.canvas_to_clipping_batch(
+        [[c.left, c.top, c.width, c.height] for c in canvas_boxes],
+        [[c.canvas_width, c.canvas_height] for c in canvas_boxes]
+    )
+    pdf_batch = clipping_transformer.clipping_to_pdf_batch(clipping_batch)
+    for canvas, clip_row, pdf_row in zip(canvas_boxes, clipping_batch.tolist(), pdf_batch.tolist()):
+        clipping = clipping_transformer.canvas_to_clipping(canvas)
+        assert clip_row == [clipping.left_pixels, clipping.top_pixels, clipping.width_pixels, clipping.height_pixels]
+        pdf = clipping_transformer.symbol_canvas_to_pdf(canvas)
+        assert pdf_row == [pdf.left, pdf.top, pdf.width, pdf.height]
+    
+    print("✅ Batched transformations test passed")
+
+
 def test_canvas_transformations():
     """Test Image ↔ Canvas transformations with aspect ratio"""
     print("🧪 Testing canvas transformations...")
@@ -365,6 +436,7 @@ def run_all_tests():
         test_coordinate_classes()
         test_page_metadata()
         test_basic_transformations()
+        test_batch_transformations()
         test_canvas_transformations()
         test_direct_canvas_pdf_transformation()
         test_clipping_transformations()
@@ -0,0 +1,396 @@
+"""
+Offline tests for DetectionStorage
+
+This script exercises the storage layer directly on a temporary document
+directory: batched status updates and the run totals they produce, bulk
+coordinate edits, lazy run loading and the latest-run pointer.
+"""
+
+import os
+import sys
+import tempfile
+import shutil
+from contextlib import contextmanager
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.coordinate_mapping import PDFCoordinates, ImageCoordinates
+from utils.symbol_detection.detection_algorithm import DetectionCandidate
+from utils.symbol_detection.detection_storage import DetectionStorage
+
+
+@contextmanager
+def temp_storage():
+    """Yield a DetectionStorage on a fresh temporary document directory"""
+    doc_dir = tempfile.mkdtemp(prefix="detection_storage_test_")
+    try:
+        yield DetectionStorage(doc_dir)
+    finally:
+        shutil.rmtree(doc_dir, ignore_errors=True)
+
+
+def make_candidate(index):
+    """Create a detection candidate with distinct coordinates"""
+    return DetectionCandidate(
+        candidate_id=index,
+        image_coords=ImageCoordinates(
+            left=100 * index, top=50, width=40, height=40, dpi=300
+        ),
+        pdf_coords=PDFCoordinates(left=24.0 * index, top=12.0, width=9.6, height=9.6),
+        match_confidence=0.5 + index / 100,
+        iou_score=0.4,
+        matched_angle=0,
+        template_size=(40, 40),
+    )
+
+
+def create_test_run(storage, detections_per_symbol=3):
+    """
+    Create a run with two symbols and return (run_id, {symbol_id: [detection IDs]})
+    """
+    symbol_ids = ["sym_a", "sym_b"]
+    run_id = storage.create_detection_run(
+        {
+            "symbol_ids": symbol_ids,
+            "detection_params": {},
+            "total_symbols": len(symbol_ids),
+            "total_pages": 1,
+        }
+    )
+
+    for symbol_id in symbol_ids:
+        candidates = [make_candidate(i) for i in range(detections_per_symbol)]
+        storage.save_symbol_detections(
+            run_id, symbol_id, {"name": symbol_id}, {1: candidates}
+        )
+    storage.complete_detection_run(run_id)
+
+    detection_ids = {}
+    run_data = storage.load_detection_run(run_id)
+    for symbol_id, symbol_data in run_data["symbolDetections"].items():
+        detection_ids[symbol_id] = [
+            d["detectionId"] for d in symbol_data["detectionsByPage"]["1"]
+        ]
+    return run_id, detection_ids
+
+
+def check(label, condition):
+    """Print a check result and return whether it passed"""
+    print(f"   {'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def test_mixed_status_totals():
+    """Run totals after a batch mixing accept, reject and modify"""
+    with temp_storage() as storage:
+        print("\n🧪 Testing run totals after mixed status updates")
+        print("-" * 50)
+
+        run_id, ids = create_test_run(storage)
+        new_coords = PDFCoordinates(left=1.0, top=2.0, width=3.0, height=4.0).to_dict()
+        storage.update_detection_status(
+            run_id,
+            [
+                {"detectionId": ids["sym_a"][0], "action": "accept"},
+                {"detectionId": ids["sym_a"][1], "action": "reject"},
+                {"detectionId": ids["sym_b"][0], "action": "accept"},
+                {
+                    "detectionId": ids["sym_b"][1],
+                    "action": "modify",
+                    "newCoords": new_coords,
+                    "reviewedBy": "tester",
+                },
+            ],
+        )
+
+        run_data = storage.load_detection_run(run_id)
+        summary = run_data["summary"]
+        sym_a = run_data["symbolDetections"]["sym_a"]
+        sym_b = run_data["symbolDetections"]["sym_b"]
+        modified = sym_b["detectionsByPage"]["1"][1]
+        index_summary = storage.list_detection_runs()[0]["summary"]
+
+        results = [
+            check(
+                "Run summary counts accepted/rejected/modified/pending",
+                (
+                    summary["acceptedDetections"],
+                    summary["rejectedDetections"],
+                    summary["modifiedDetections"],
+                    summary["pendingDetections"],
+                )
+                == (2, 1, 1, 2),
+            ),
+            check(
+                "Symbol summaries match their detections",
+                (sym_a["summary"]["acceptedCount"], sym_a["summary"]["rejectedCount"])
+                == (1, 1)
+                and (
+                    sym_b["summary"]["modifiedCount"],
+                    sym_b["summary"]["pendingCount"],
+                )
+                == (1, 1),
+            ),
+            check(
+                "Modify stores the new coordinates and reviewer",
+                modified["pdfCoords"] == new_coords
+                and modified["reviewedBy"] == "tester",
+            ),
+            check(
+                "Runs index carries the same totals",
+                index_summary["acceptedDetections"] == 2
+                and index_summary["pendingDetections"] == 2,
+            ),
+        ]
+        return all(results)
+
+
+def test_repeated_updates():
+    """Repeated updates to one detection, in one batch and across batches"""
+    with temp_storage() as storage:
+        print("\n🧪 Testing repeated updates to one detection")
+        print("-" * 45)
+
+        run_id, ids = create_test_run(storage)
+        detection_id = ids["sym_a"][0]
+
+        # Within a batch, updates apply in request order
+        storage.update_detection_status(
+            run_id,
+            [
+                {"detectionId": detection_id, "action": "accept"},
+                {"detectionId": detection_id, "action": "reject"},
+            ],
+        )
+        after_batch = storage.load_detection_by_id(run_id, detection_id)
+        summary_batch = storage.load_detection_run(run_id)["summary"]
+
+        # A later batch overrides the earlier status
+        storage.update_detection_status(
+            run_id, [{"detectionId": detection_id, "action": "accept"}]
+        )
+        after_second = storage.load_detection_by_id(run_id, detection_id)
+        summary_second = storage.load_detection_run(run_id)["summary"]
+
+        results = [
+            check("Last update in a batch wins", after_batch["status"] == "rejected"),
+            check(
+                "Detection is counted once per batch",
+                (
+                    summary_batch["rejectedDetections"],
+                    summary_batch["acceptedDetections"],
+                )
+                == (1, 0)
+                and summary_batch["pendingDetections"] == 5,
+            ),
+            check("Later batch overrides status", after_second["status"] == "accepted"),
+            check(
+                "Totals move the detection between counts",
+                (
+                    summary_second["acceptedDetections"],
+                    summary_second["rejectedDetections"],
+                )
+                == (1, 0),
+            ),
+        ]
+        return all(results)
+
+
+def test_bulk_coordinate_updates():
+    """update_detection_coordinates_bulk across symbols"""
+    with temp_storage() as storage:
+        print("\n🧪 Testing bulk coordinate updates")
+        print("-" * 35)
+
+        run_id, ids = create_test_run(storage)
+        storage.update_detection_status(
+            run_id, [{"detectionId": ids["sym_a"][2], "action": "accept"}]
+        )
+
+        pdf_coords = PDFCoordinates(left=5.0, top=6.0, width=7.0, height=8.0).to_dict()
+        image_coords = ImageCoordinates(
+            left=21, top=25, width=29, height=33, dpi=300
+        ).to_dict()
+        coords = {"pdfCoords": pdf_coords, "imageCoords": image_coords}
+        updated = storage.update_detection_coordinates_bulk(
+            run_id,
+            {
+                ids["sym_a"][0]: coords,
+                ids["sym_b"][2]: coords,
+                "det_missing": coords,
+            },
+        )
+
+        edited = storage.load_detections_by_ids(
+            run_id, [ids["sym_a"][0], ids["sym_b"][2]]
+        )
+        untouched = storage.load_detection_by_id(run_id, ids["sym_a"][1])
+        summary = storage.load_detection_run(run_id)["summary"]
+
+        try:
+            storage.update_detection_coordinates_bulk("missing_run", {})
+            missing_run_raises = False
+        except ValueError:
+            missing_run_raises = True
+
+        results = [
+            check(
+                "Returns only the IDs that were found",
+                sorted(updated) == sorted([ids["sym_a"][0], ids["sym_b"][2]]),
+            ),
+            check(
+                "Edited detections carry the new coordinates",
+                len(edited) == 2
+                and all(
+                    d["pdfCoords"] == pdf_coords
+                    and d["imageCoords"] == image_coords
+                    and d["isUserModified"]
+                    for d in edited.values()
+                ),
+            ),
+            check(
+                "Other detections are unchanged",
+                untouched["pdfCoords"] == make_candidate(1).pdf_coords.to_dict()
+                and not untouched.get("isUserModified"),
+            ),
+            check(
+                "Review totals survive the edit",
+                summary["acceptedDetections"] == 1
+                and summary["pendingDetections"] == 5,
+            ),
+            check("Unknown run raises ValueError", missing_run_raises),
+        ]
+        return all(results)
+
+
+def test_iter_detection_run():
+    """iter_detection_run metadata, lazy symbols and rejected filtering"""
+    with temp_storage() as storage:
+        print("\n🧪 Testing iter_detection_run")
+        print("-" * 30)
+
+        run_id, ids = create_test_run(storage)
+        storage.update_detection_status(
+            run_id, [{"detectionId": ids["sym_b"][0], "action": "reject"}]
+        )
+
+        run_data, symbols = storage.iter_detection_run(run_id)
+        all_symbols = dict(symbols)
+        _, filtered_symbols = storage.iter_detection_run(run_id, include_rejected=False)
+        filtered = dict(filtered_symbols)
+        filtered_ids = [
+            d["detectionId"] for d in filtered["sym_b"]["detectionsByPage"]["1"]
+        ]
+
+        results = [
+            check(
+                "Metadata is loaded without the symbol files",
+                run_data["runId"] == run_id and "symbolDetections" not in run_data,
+            ),
+            check(
+                "Iterator yields every symbol",
+                sorted(all_symbols) == ["sym_a", "sym_b"],
+            ),
+            check(
+                "include_rejected=False drops rejected detections",
+                ids["sym_b"][0] not in filtered_ids and len(filtered_ids) == 2,
+            ),
+            check(
+                "Other symbols are not filtered",
+                len(filtered["sym_a"]["detectionsByPage"]["1"]) == 3,
+            ),
+            check(
+                "Unknown run returns None",
+                storage.iter_detection_run("missing") is None,
+            ),
+        ]
+        return all(results)
+
+
+def test_latest_run_after_delete():
+    """latest_run_id follows deletes of the latest and of older runs"""
+    with temp_storage() as storage:
+        print("\n🧪 Testing latest-run pointer after deletes")
+        print("-" * 45)
+
+        first_run, _ = create_test_run(storage, detections_per_symbol=1)
+        second_run, _ = create_test_run(storage, detections_per_symbol=1)
+        third_run, _ = create_test_run(storage, detections_per_symbol=1)
+
+        results = [check("Newest run is latest", storage.latest_run_id() == third_run)]
+
+        storage.delete_detection_run(first_run)
+        results.append(
+            check(
+                "Deleting an older run keeps the pointer",
+                storage.latest_run_id() == third_run,
+            )
+        )
+
+        storage.delete_detection_run(third_run)
+        results.append(
+            check(
+                "Deleting the latest run falls back to the runs index",
+                not os.path.exists(storage.latest_run_file)
+                and storage.latest_run_id() == second_run,
+            )
+        )
+
+        storage.delete_detection_run(second_run)
+        results.append(
+            check("No runs left gives None", storage.latest_run_id() is None)
+        )
+        results.append(
+            check(
+                "Deleting a missing run returns False",
+                storage.delete_detection_run(second_run) is False,
+            )
+        )
+        return all(results)
+
+
+def run_detection_storage_tests():
+    """Run all detection storage tests"""
+    print("🧪 DETECTION STORAGE - OFFLINE TESTS")
+    print("=" * 60)
+
+    tests = [
+        ("Mixed Status Totals", test_mixed_status_totals),
+        ("Repeated Updates", test_repeated_updates),
+        ("Bulk Coordinate Updates", test_bulk_coordinate_updates),
+        ("Iterate Detection Run", test_iter_detection_run),
+        ("Latest Run After Delete", test_latest_run_after_delete),
+    ]
+
+    passed_tests = 0
+    total_tests = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed_tests += 1
+                print(f"✅ {test_name} tests PASSED")
+            else:
+                print(f"❌ {test_name} tests FAILED")
+        except Exception as e:
+            print(f"💥 {test_name} tests CRASHED: {e}")
+            import traceback
+
+            traceback.print_exc()
+
+    print("\n📊 DETECTION STORAGE TEST SUMMARY")
+    print("-" * 30)
+    print(f"Passed: {passed_tests}/{total_tests}")
+
+    if passed_tests == total_tests:
+        print("\n🎉 ALL DETECTION STORAGE TESTS PASSED!")
+        return True
+    else:
+        print("\n❌ Some tests failed. Please review and fix issues.")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_detection_storage_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,208 @@
+"""
+Offline tests for the buffered detection status updates
+
+This script checks the status buffer in api.detection_updates against a real
+run on a temporary document directory: updates are never lost when a
+background flush fails, and an explicit flush waits for a background flush
+that is already writing.
+"""
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api import detection_updates
+from api.detection_updates import flush_status_updates
+from utils.symbol_detection.detection_storage import DetectionStorage
+from test_detection_storage import check, create_test_run, temp_storage
+
+_original_update = DetectionStorage.update_detection_status
+
+
+def queue_status(storage, run_id, detection_id, action):
+    """Buffer one status update the way /api/update_detection_status_simple does"""
+    detection_updates._queue_status_update(
+        storage.doc_dir,
+        run_id,
+        {"detectionId": detection_id, "action": action, "reviewedBy": "tester"},
+    )
+
+
+def wait_for_timer(storage, run_id):
+    """Wait until the run's flush timer has fired (or been cancelled)"""
+    timer = detection_updates._status_flush_timers.get((storage.doc_dir, run_id))
+    if timer is not None:
+        timer.join()
+
+
+def test_failed_flush_keeps_updates():
+    """A failed background flush keeps its updates and those queued after it"""
+    with temp_storage() as storage:
+        print("\n🧪 Testing updates survive a failed background flush")
+        print("-" * 55)
+
+        run_id, ids = create_test_run(storage)
+        first, second = ids["sym_a"][0], ids["sym_b"][0]
+        failures = [OSError("No space left on device")]
+
+        def failing_update(self, *args, **kwargs):
+            if failures:
+                raise failures.pop()
+            return _original_update(self, *args, **kwargs)
+
+        with patch.object(DetectionStorage, "update_detection_status", failing_update):
+            queue_status(storage, run_id, first, "accept")
+            wait_for_timer(storage, run_id)
+            failed_buffer = dict(
+                detection_updates._pending_status_updates.get(
+                    (storage.doc_dir, run_id), {}
+                )
+            )
+
+            queue_status(storage, run_id, second, "reject")
+            flushed = flush_status_updates(storage.doc_dir, run_id)
+
+        results = [
+            check("Failed updates stay buffered", list(failed_buffer) == [first]),
+            check("Explicit flush writes both updates", flushed == 2),
+            check(
+                "Both statuses are on disk",
+                storage.load_detection_by_id(run_id, first)["status"] == "accepted"
+                and storage.load_detection_by_id(run_id, second)["status"]
+                == "rejected",
+            ),
+            check(
+                "Buffer is empty afterwards",
+                (storage.doc_dir, run_id)
+                not in detection_updates._pending_status_updates,
+            ),
+        ]
+        return all(results)
+
+
+def test_failed_explicit_flush_raises():
+    """An explicit flush raises its write error and keeps the updates"""
+    with temp_storage() as storage:
+        print("\n🧪 Testing explicit flush errors")
+        print("-" * 35)
+
+        run_id, ids = create_test_run(storage)
+        detection_id = ids["sym_a"][1]
+
+        def failing_update(self, *args, **kwargs):
+            raise OSError("No space left on device")
+
+        with patch.object(DetectionStorage, "update_detection_status", failing_update):
+            queue_status(storage, run_id, detection_id, "accept")
+            try:
+                flush_status_updates(storage.doc_dir, run_id)
+                raised = False
+            except OSError:
+                raised = True
+
+        flushed = flush_status_updates(storage.doc_dir, run_id)
+
+        results = [
+            check("Explicit flush raises the write error", raised),
+            check("A later flush writes the kept update", flushed == 1),
+            check(
+                "Status is on disk",
+                storage.load_detection_by_id(run_id, detection_id)["status"]
+                == "accepted",
+            ),
+        ]
+        return all(results)
+
+
+def test_explicit_flush_waits_for_timer():
+    """An explicit flush during a slow background write waits for it"""
+    with temp_storage() as storage:
+        print("\n🧪 Testing explicit flush waits for a running background flush")
+        print("-" * 65)
+
+        run_id, ids = create_test_run(storage)
+        older, newer = ids["sym_a"][2], ids["sym_b"][2]
+        writing = threading.Event()
+
+        def slow_update(self, *args, **kwargs):
+            writing.set()
+            time.sleep(0.5)
+            return _original_update(self, *args, **kwargs)
+
+        with patch.object(DetectionStorage, "update_detection_status", slow_update):
+            queue_status(storage, run_id, older, "accept")
+            writing.wait(5)
+            started = time.monotonic()
+            flush_status_updates(storage.doc_dir, run_id)
+            waited = time.monotonic() - started
+            status_after_flush = storage.load_detection_by_id(run_id, older)["status"]
+
+        # A batch update applied after the flush is not overwritten by the
+        # older buffered status
+        storage.update_detection_status(
+            run_id,
+            [
+                {"detectionId": older, "action": "reject"},
+                {"detectionId": newer, "action": "accept"},
+            ],
+        )
+        wait_for_timer(storage, run_id)
+
+        results = [
+            check("Flush waited for the background write", waited >= 0.2),
+            check("Buffered status is on disk", status_after_flush == "accepted"),
+            check(
+                "Later batch update wins",
+                storage.load_detection_by_id(run_id, older)["status"] == "rejected",
+            ),
+        ]
+        return all(results)
+
+
+def run_status_buffer_tests():
+    """Run all status buffer tests"""
+    print("🧪 DETECTION STATUS BUFFER - OFFLINE TESTS")
+    print("=" * 60)
+
+    tests = [
+        ("Failed Flush Keeps Updates", test_failed_flush_keeps_updates),
+        ("Failed Explicit Flush Raises", test_failed_explicit_flush_raises),
+        ("Explicit Flush Waits For Timer", test_explicit_flush_waits_for_timer),
+    ]
+
+    passed_tests = 0
+    total_tests = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed_tests += 1
+                print(f"✅ {test_name} tests PASSED")
+            else:
+                print(f"❌ {test_name} tests FAILED")
+        except Exception as e:
+            print(f"💥 {test_name} tests CRASHED: {e}")
+            import traceback
+
+            traceback.print_exc()
+
+    print("\n📊 STATUS BUFFER TEST SUMMARY")
+    print("-" * 30)
+    print(f"Passed: {passed_tests}/{total_tests}")
+
+    if passed_tests == total_tests:
+        print("\n🎉 ALL STATUS BUFFER TESTS PASSED!")
+        return True
+    else:
+        print("\n❌ Some tests failed. Please review and fix issues.")
+        return False
+
+
+if __name__ == "__main__":
+    success = run_status_buffer_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,34 @@
+"""
+Atomic file replacement for files that are read while they are rewritten.
+
+Data is written to a temporary file next to the target and moved over it with
+os.replace, so readers see either the old or the new contents, never a partial
+file. Each write uses its own temporary name, so concurrent writers of the
+same path (threads or processes) never share one.
+"""
+
+import os
+import uuid
+
+
+def write_file_atomic(path: str, data: bytes, fsync: bool = False) -> None:
+    """
+    Replace the file at path with data.
+
+    Args:
+        path: File to write
+        data: Complete new contents
+        fsync: Flush the data to disk before the file is replaced, so the
+            replacement is durable as well as atomic
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "xb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
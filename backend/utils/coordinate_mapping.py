@@ -15,8 +15,45 @@ from dataclasses import dataclass, asdict
 from typing import Dict, Tuple
 import math
 
+import numpy as np
 
-@dataclass
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: run the plain Python function."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Transform kernels. These are plain scalar/array functions so numba can compile
+# them when it is installed; fastmath stays off so results match bit-for-bit.
+
+
+@njit(cache=True)
+def _pdf_to_image_kernel(left, top, width, height, scale):
+    """Scale one PDF box to pixels, truncating toward zero like int()."""
+    return (
+        int(left * scale),
+        int(top * scale),
+        int(width * scale),
+        int(height * scale),
+    )
+
+
+@njit(cache=True)
+def _pdf_to_image_batch_kernel(boxes, scale):
+    """Scale an (N, 4) float64 array of PDF boxes to int64 pixels."""
+    return (boxes * scale).astype(np.int64)
+
+
+# Field order of a PDF box when it is handled as a NumPy row
+PDF_COORD_KEYS = ("left_points", "top_points", "width_points", "height_points")
+
+
+@dataclass(slots=True)
 class PDFCoordinates:
     """
     PDF coordinates in points (72 DPI), origin at top-left.
@@ -41,8 +78,27 @@ class PDFCoordinates:
         """Return as (x0, y0, x1, y1) tuple for PyMuPDF Rect"""
         return (self.left, self.top, self.left + self.width, self.top + self.height)
 
+    @staticmethod
+    def array_from_dict(data: Dict[str, float]) -> np.ndarray:
+        """
+        Parse a serialized pdfCoords dict into a float64 [left, top, width, height] row.
 
-@dataclass
+        Raises:
+            ValueError: If a field is missing or not numeric
+        """
+        try:
+            return np.array([data[key] for key in PDF_COORD_KEYS], dtype=np.float64)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid pdfCoords: {e}") from None
+
+    @classmethod
+    def from_array(cls, row) -> "PDFCoordinates":
+        """Build from a [left, top, width, height] row (e.g. from array_from_dict)."""
+        left, top, width, height = np.asarray(row, dtype=np.float64).tolist()
+        return cls(left=left, top=top, width=width, height=height)
+
+
+@dataclass(slots=True)
 class ImageCoordinates:
     """
     Image coordinates in pixels at specific DPI, origin at top-left.
@@ -65,7 +121,7 @@ class ImageCoordinates:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CanvasCoordinates:
     """
     Canvas coordinates in pixels for UI display, origin at top-left.
@@ -90,7 +146,7 @@ class CanvasCoordinates:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ClippingCoordinates:
     """
     Coordinates within a legend clipping image (pixels at clipping DPI).
@@ -175,10 +231,13 @@ class CoordinateTransformer:
         Both use top-left origin, so no Y-axis flip needed!
         """
         # Convert points to pixels - simple scaling, no coordinate system changes
-        image_left = int(pdf_coords.left * self.pdf_to_image_scale)
-        image_top = int(pdf_coords.top * self.pdf_to_image_scale)
-        image_width = int(pdf_coords.width * self.pdf_to_image_scale)
-        image_height = int(pdf_coords.height * self.pdf_to_image_scale)
+        image_left, image_top, image_width, image_height = _pdf_to_image_kernel(
+            float(pdf_coords.left),
+            float(pdf_coords.top),
+            float(pdf_coords.width),
+            float(pdf_coords.height),
+            self.pdf_to_image_scale,
+        )
 
         return ImageCoordinates(
             left=image_left,
@@ -188,6 +247,21 @@ class CoordinateTransformer:
             dpi=self.page_metadata.image_dpi,
         )
 
+    def pdf_to_image_batch(self, pdf_boxes) -> np.ndarray:
+        """
+        Transform many PDF boxes to standard image coordinates at once.
+
+        Args:
+            pdf_boxes: Array-like of shape (N, 4) with rows of
+                [left, top, width, height] in points
+
+        Returns:
+            int64 array of shape (N, 4) in pixels, truncated exactly as
+            pdf_to_image does for a single box
+        """
+        boxes = np.ascontiguousarray(pdf_boxes, dtype=np.float64).reshape(-1, 4)
+        return _pdf_to_image_batch_kernel(boxes, self.pdf_to_image_scale)
+
     def image_to_pdf(self, image_coords: ImageCoordinates) -> PDFCoordinates:
         """
         Transform image coordinates back to PDF coordinates.
@@ -356,6 +430,45 @@ class ClippingCoordinateTransformer:
             clipping_dpi=self.clipping_dpi,
         )
 
+    def canvas_to_clipping_batch(self, canvas_boxes, canvas_sizes) -> np.ndarray:
+        """
+        Transform many canvas boxes to clipping image coordinates at once.
+
+        Args:
+            canvas_boxes: Array-like of shape (N, 4) with rows of
+                [left, top, width, height] in canvas pixels
+            canvas_sizes: Array-like of shape (N, 2) with rows of
+                [canvas_width, canvas_height]
+
+        Returns:
+            int64 array of shape (N, 4) in clipping pixels, truncated exactly
+            as canvas_to_clipping does for a single box
+        """
+        boxes = np.asarray(canvas_boxes, dtype=np.float64).reshape(-1, 4)
+        sizes = np.asarray(canvas_sizes, dtype=np.float64).reshape(-1, 2)
+        clipping_size = np.array(
+            [self.clipping_width_pixels, self.clipping_height_pixels], dtype=np.float64
+        )
+        canvas_scale = (sizes / clipping_size).min(axis=1, keepdims=True)
+        return np.trunc(boxes / canvas_scale).astype(np.int64)
+
+    def clipping_to_pdf_batch(self, clipping_boxes) -> np.ndarray:
+        """
+        Transform many clipping boxes to absolute PDF coordinates at once.
+
+        Args:
+            clipping_boxes: Array-like of shape (N, 4) with rows of
+                [left, top, width, height] in clipping pixels
+
+        Returns:
+            float64 array of shape (N, 4) of [left, top, width, height] in points
+        """
+        boxes = np.asarray(clipping_boxes, dtype=np.float64).reshape(-1, 4)
+        legend_offset = np.array(
+            [self.legend_pdf_coords.left, self.legend_pdf_coords.top, 0.0, 0.0]
+        )
+        return boxes * self.points_per_pixel + legend_offset
+
     def clipping_to_pdf(self, clipping_coords: ClippingCoordinates) -> PDFCoordinates:
         """
         Transform clipping coordinates to absolute PDF coordinates.
@@ -0,0 +1,98 @@
+"""
+In-process caches for artifacts stored under data/processed.
+
+Files such as page_metadata.json and the generated page HTML are written once
+during processing and then read on nearly every API request. Entries are keyed
+by the path and its file_version(), so rewriting a file on disk invalidates its
+cached value automatically.
+"""
+
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping, Tuple
+
+FileVersion = Tuple[int, int, int]
+
+
+def file_version(st: os.stat_result) -> FileVersion:
+    """
+    Cache key for a file's contents: (st_mtime_ns, st_ino, st_size).
+
+    The mtime alone can repeat when a file is replaced twice within one
+    filesystem timestamp tick; os.replace always gives the file a new inode.
+    """
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+@lru_cache(maxsize=256)
+def load_json(path: str, version: FileVersion) -> Mapping[str, Any]:
+    """
+    Parse a JSON file once per file version.
+
+    Args:
+        path: Absolute path to the JSON file
+        version: file_version(os.stat(path))
+
+    Returns:
+        Read-only view of the parsed document. Use dict(...) for a mutable copy.
+    """
+    with open(path, "r") as f:
+        return MappingProxyType(json.load(f))
+
+
+def load_json_cached(path: str) -> Mapping[str, Any]:
+    """
+    Load a JSON file, reusing the parsed result while the file is unchanged.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    return load_json(path, file_version(os.stat(path)))
+
+
+@lru_cache(maxsize=256)
+def read_text(path: str, version: FileVersion) -> str:
+    """
+    Read a UTF-8 text file once per file version.
+
+    Args:
+        path: Absolute path to the file
+        version: file_version(os.stat(path))
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def read_text_cached(path: str) -> str:
+    """
+    Read a text file, reusing the contents while the file is unchanged.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    return read_text(path, file_version(os.stat(path)))
+
+
+@lru_cache(maxsize=256)
+def read_bytes(path: str, version: FileVersion) -> bytes:
+    """
+    Read a file's raw bytes once per file version.
+
+    Args:
+        path: Absolute path to the file
+        version: file_version(os.stat(path))
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_bytes_cached(path: str) -> bytes:
+    """
+    Read a file's bytes, reusing the contents while the file is unchanged.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    return read_bytes(path, file_version(os.stat(path)))
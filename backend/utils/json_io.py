@@ -0,0 +1,102 @@
+"""
+JSON encoding helpers for TimberGem.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise, so callers get the same bytes-oriented interface either way.
+"""
+
+import gzip
+import json
+from typing import Any, Iterable, Iterator, Tuple
+
+from .atomic_write import write_file_atomic
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj: JSON-serializable object (non-string dict keys are allowed)
+        indent: Pretty-print with two-space indentation
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_with_encoded(obj: dict, **encoded: bytes) -> bytes:
+    """
+    Serialize a dict followed by extra fields whose values are already JSON.
+
+    Lets large members be encoded piecewise (e.g. one list item per worker)
+    instead of building and encoding the whole document at once.
+
+    Args:
+        obj: Leading fields, serialized as with dumps()
+        encoded: Trailing fields as encoded JSON bytes, in output order
+    """
+    parts = [dumps(obj)[:-1]]
+    separator = b"," if obj else b""
+    for key, value in encoded.items():
+        parts += (separator, dumps(key), b":", value)
+        separator = b","
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+def iter_dumps_with_mapping(
+    obj: dict, key: str, items: Iterable[Tuple[str, Any]]
+) -> Iterator[bytes]:
+    """
+    Serialize a dict plus one trailing object field as a stream of chunks.
+
+    Streaming counterpart of dumps_with_encoded: the trailing field's members
+    are pulled from items and encoded one at a time, so only one member needs
+    to be in memory at once.
+
+    Args:
+        obj: Leading fields, serialized as with dumps()
+        key: Name of the trailing object field
+        items: (member key, member value) pairs for the trailing field
+    """
+    yield dumps(obj)[:-1] + (b"," if obj else b"") + dumps(key) + b":{"
+    separator = b""
+    for member_key, value in items:
+        yield separator + dumps(member_key) + b":" + dumps(value)
+        separator = b","
+    yield b"}}"
+
+
+# Server-sent events framing: each event is "data: <json>\n\n"
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
+
+def sse_event(obj: Any) -> bytes:
+    """Encode an object as a single server-sent event frame."""
+    return _SSE_PREFIX + dumps(obj) + _SSE_SUFFIX
+
+
+def write_json_gz(path: str, obj: Any) -> None:
+    """
+    Write an object as gzip-compressed JSON, replacing the file atomically.
+
+    The output is suitable for serving as-is with Content-Encoding: gzip.
+    """
+    write_file_atomic(path, gzip.compress(dumps(obj), compresslevel=6, mtime=0))
@@ -47,6 +47,8 @@ class GeminiProvider(LLMProvider):
     def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.5-pro"):
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.model = model
+        # Client is created on first use and reused, keeping its HTTP connections
+        self._client = None
         
     def is_configured(self) -> bool:
         return self.api_key is not None
@@ -65,7 +67,9 @@ class GeminiProvider(LLMProvider):
             from google.genai import types
             
             # Create client
-            client = genai.Client(api_key=self.api_key)
+            if self._client is None:
+                self._client = genai.Client(api_key=self.api_key)
+            client = self._client
             
             # Prepare content parts
             content_parts = []
@@ -162,8 +166,10 @@ class GeminiProvider(LLMProvider):
             print(f"       )")
             print(f"   )")
             
-            # Generate response
-            response = client.models.generate_content(
+            # Generate response; the SDK call blocks, so run it in a thread
+            # rather than stalling the event loop for other pages and requests
+            response = await asyncio.to_thread(
+                client.models.generate_content,
                 model=self.model,
                 contents=contents,
                 config=generate_content_config,
@@ -324,6 +330,8 @@ class OpenAIProvider(LLMProvider):
     def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4-vision-preview"):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
+        # Client is created on first use and reused, keeping its HTTP connections
+        self._client = None
         
     def is_configured(self) -> bool:
         return self.api_key is not None
@@ -340,7 +348,9 @@ class OpenAIProvider(LLMProvider):
         try:
             from openai import AsyncOpenAI
             
-            client = AsyncOpenAI(api_key=self.api_key)
+            if self._client is None:
+                self._client = AsyncOpenAI(api_key=self.api_key)
+            client = self._client
             
             # Prepare messages
             messages = [
@@ -402,6 +412,8 @@ class ClaudeProvider(LLMProvider):
     def __init__(self, api_key: Optional[str] = None, model: str = "claude-3-5-sonnet-20241022"):
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.model = model
+        # Client is created on first use and reused, keeping its HTTP connections
+        self._client = None
         
     def is_configured(self) -> bool:
         return self.api_key is not None
@@ -418,7 +430,9 @@ class ClaudeProvider(LLMProvider):
         try:
             import anthropic
             
-            client = anthropic.AsyncAnthropic(api_key=self.api_key)
+            if self._client is None:
+                self._client = anthropic.AsyncAnthropic(api_key=self.api_key)
+            client = self._client
             
             # Prepare message content
             content_parts = [{"type": "text", "text": request.user_message}]
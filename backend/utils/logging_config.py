@@ -0,0 +1,43 @@
+"""
+Logging setup for the TimberGem backend.
+
+Records are put on a queue by the logging thread and written to stderr by a
+single listener thread, so request handlers and background workers never
+block on console I/O.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Route root logging through a QueueHandler/QueueListener pair.
+
+    Args:
+        level: Root log level; defaults to the LOG_LEVEL environment variable,
+            or INFO. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -4,6 +4,7 @@ import asyncio
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from .json_io import write_json_gz
 from .pdf_processor import PDFProcessor
 from .llm_interface import LLMInterface, LLMProvider, LLMResponse
 
@@ -48,15 +49,24 @@ class PageToHTMLPipeline:
     3. Saves results and provides comprehensive feedback
     """
 
-    def __init__(self, config: PageToHTMLConfig):
+    def __init__(
+        self, config: PageToHTMLConfig, llm_interface: Optional[LLMInterface] = None
+    ):
+        """
+        Args:
+            config: Pipeline configuration
+            llm_interface: Existing interface to reuse (and its provider's
+                client); one is created from the configuration if omitted
+        """
         self.config = config
         self.pdf_processor = PDFProcessor(
             dpi=config.dpi, high_res_dpi=config.high_res_dpi
         )
 
         # Initialize LLM interface
-        llm_provider = self._create_llm_provider()
-        self.llm_interface = LLMInterface(llm_provider)
+        if llm_interface is None:
+            llm_interface = LLMInterface(self._create_llm_provider())
+        self.llm_interface = llm_interface
 
         # Load system prompt
         self.system_prompt = self._load_system_prompt()
@@ -126,10 +136,11 @@ Ensure the HTML is valid and well-formatted."""
         print(f"🚀 Starting page-to-HTML pipeline for {pdf_path}")
         print(f"   Configuration: {self.config.llm_provider} provider")
 
-        # Step 1: Process PDF to extract artifacts
+        # Step 1: Process PDF to extract artifacts. Rendering is blocking work,
+        # so it runs in a thread and other pipelines on the loop keep going.
         print(f"\n📄 Step 1: Processing PDF...")
-        processing_results = self.pdf_processor.process_pdf(
-            pdf_path, output_dir, doc_id
+        processing_results = await asyncio.to_thread(
+            self.pdf_processor.process_pdf, pdf_path, output_dir, doc_id
         )
 
         # Step 2: Generate HTML for each page using LLM
@@ -171,8 +182,7 @@ Ensure the HTML is valid and well-formatted."""
 
         # Save final results
         results_file = os.path.join(output_dir, "page_to_html_results.json")
-        with open(results_file, "w") as f:
-            json.dump(final_results, f, indent=2)
+        await asyncio.to_thread(self._save_results, results_file, final_results)
 
         print(f"\n✅ Pipeline complete!")
         print(
@@ -187,6 +197,19 @@ Ensure the HTML is valid and well-formatted."""
 
         return final_results
 
+    @staticmethod
+    def _save_results(results_file: str, final_results: Dict) -> None:
+        """
+        Write the results file, then the gzip-compressed /api/load_html_results
+        body next to it, so that endpoint can serve it without re-encoding.
+        """
+        with open(results_file, "w") as f:
+            json.dump(final_results, f, indent=2)
+        write_json_gz(
+            results_file + ".gz",
+            {"docId": final_results["docId"], "results": final_results},
+        )
+
     async def _generate_html_for_all_pages(
         self, processing_results: Dict, output_dir: str
     ) -> List[PageHTMLResult]:
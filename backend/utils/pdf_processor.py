@@ -3,6 +3,7 @@ import json
 import fitz  # PyMuPDF
 from typing import Dict, List, Tuple, Optional
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from .coordinate_mapping import PageMetadata, DEFAULT_DPI, HIGH_RES_DPI
 
 
@@ -177,3 +178,70 @@ class PDFProcessor:
             high_res_image_height_pixels=high_res_height_pixels,
             high_res_dpi=self.high_res_dpi,
         )
+
+
+# --- Process pool entry point ---
+# PyMuPDF holds the GIL while rendering and a document must not be shared
+# between processes, so each worker call opens the PDF itself. Encoded pages
+# are written by a helper thread (file writes release the GIL), so each write
+# overlaps the next page's render and goes out in one call.
+
+
+# Encodings for the legacy page images: (extension, Pixmap.pil_tobytes options).
+# PNG keeps MuPDF's own encoder. WebP is lossless and tuned for speed like the
+# symbol images; on line drawings it encodes faster and is much smaller.
+PAGE_IMAGE_FORMATS = {
+    "WEBP": (".webp", {"format": "WEBP", "lossless": True, "method": 0, "quality": 0}),
+    "PNG": (".png", None),
+}
+DEFAULT_PAGE_IMAGE_FORMAT = "WEBP"
+
+
+def _write_file(path: str, data: bytes) -> None:
+    with open(path, "wb", buffering=0) as f:
+        f.write(data)
+
+
+def render_page_images(
+    pdf_path: str,
+    page_nums: List[int],
+    output_dir: str,
+    dpi: int,
+    image_format: str = "PNG",
+) -> List[Tuple[int, int, int]]:
+    """
+    Render pages to page_<n> image files in output_dir.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_nums: Page numbers to render (0-based)
+        output_dir: Directory to save the page images
+        dpi: Render resolution
+        image_format: Key of PAGE_IMAGE_FORMATS
+
+    Returns:
+        (page_number, width, height) for each rendered page, 1-based
+    """
+    extension, pil_options = PAGE_IMAGE_FORMATS[image_format]
+    # One render matrix for the whole chunk (what get_pixmap(dpi=...) builds
+    # per call); RGB without alpha, as the viewer needs no transparency
+    zoom = dpi / 72
+    matrix = fitz.Matrix(zoom, zoom)
+    rendered = []
+    with ThreadPoolExecutor(max_workers=1) as writer, fitz.open(pdf_path) as doc:
+        writes = []
+        for page_num in page_nums:
+            pix = doc.load_page(page_num).get_pixmap(
+                matrix=matrix, colorspace=fitz.csRGB, alpha=False
+            )
+            pix.set_dpi(dpi, dpi)
+            if pil_options is None:
+                data = pix.tobytes("png")
+            else:
+                data = pix.pil_tobytes(**pil_options)
+            image_path = os.path.join(output_dir, f"page_{page_num + 1}{extension}")
+            writes.append(writer.submit(_write_file, image_path, data))
+            rendered.append((page_num + 1, pix.width, pix.height))
+        for write in writes:
+            write.result()
+    return rendered
@@ -0,0 +1,35 @@
+"""
+Process pool shared by the CPU-bound work that holds the GIL.
+
+PyMuPDF keeps the GIL while it renders and encodes, so page images, upload
+processing and the symbol dimension fallback run in worker processes instead
+of threads. One pool of cpu_count() workers serves all of them, so
+concurrent uploads and symbol saves do not oversubscribe the CPU.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared pool, creating it on first use.
+
+    Workers are spawned rather than forked because the server process is
+    multi-threaded. Submitted functions must be importable from utils; the
+    workers never need the Flask app.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
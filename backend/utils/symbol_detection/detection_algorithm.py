@@ -6,16 +6,16 @@ for use within the TimberGem system, ensuring proper coordinate transformations
 and integration with the existing data structures.
 """
 
+import logging
+
 import cv2
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
-import sys
-import os
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from coordinate_mapping import PDFCoordinates, ImageCoordinates, PageMetadata, CoordinateTransformer
+from ..coordinate_mapping import PDFCoordinates, ImageCoordinates, PageMetadata, CoordinateTransformer
+
+log = logging.getLogger(__name__)
 
 
 @dataclass
@@ -90,10 +90,11 @@ class SymbolDetectionAlgorithm:
             ValueError: If inputs are invalid or incompatible
         """
         
-        print(f"🔍 Starting symbol detection on page {page_metadata.page_number}")
-        print(f"   Page pixmap shape: {page_pixmap.shape}")
-        print(f"   Template shape: {template_image.shape}")
-        print(f"   Target dimensions: {target_dimensions}")
+        log.debug(
+            "Detecting on page %s: pixmap %s, template %s, target %s",
+            page_metadata.page_number, page_pixmap.shape,
+            template_image.shape, target_dimensions
+        )
         
         # 1. Validate inputs
         self._validate_inputs(page_pixmap, template_image, target_dimensions)
@@ -103,36 +104,34 @@ class SymbolDetectionAlgorithm:
         target_width = target_dimensions["width_pixels_300dpi"]
         target_height = target_dimensions["height_pixels_300dpi"]
         
-        print(f"   Detection parameters: {params}")
-        print(f"   Target size: {target_width}x{target_height} pixels")
+        log.debug(
+            "Detection parameters: %s; target size %dx%d pixels",
+            params, target_width, target_height
+        )
         
         # 3. Generate template variations (Stage 1 preparation from gem_v5.py)
-        print("   🔄 Generating template variations...")
         template_variations = self._generate_template_variations(
             template_image, target_width, target_height, params
         )
-        print(f"   Generated {len(template_variations)} template variations")
+        log.debug("Generated %d template variations", len(template_variations))
         
         # 4. Run candidate generation (Stage 1 from gem_v5.py)
-        print("   🎯 Running candidate generation...")
         candidates = self._generate_candidates(
             page_pixmap, template_variations, params["match_threshold"]
         )
-        print(f"   Found {len(candidates)} initial candidates")
+        log.debug("Found %d initial candidates", len(candidates))
         
         # 5. IoU verification (Stage 2 from gem_v5.py)
-        print("   ✅ Running IoU verification...")
         verified_candidates = self._verify_candidates_iou(
             page_pixmap, candidates, template_variations, params["iou_threshold"]
         )
-        print(f"   Verified {len(verified_candidates)} candidates")
+        log.debug("Verified %d candidates", len(verified_candidates))
         
         # 6. Transform coordinates to PDF space
-        print("   📐 Transforming coordinates to PDF space...")
         detection_candidates = self._transform_to_pdf_coordinates(
             verified_candidates, page_metadata
         )
-        print(f"   ✅ Detection complete: {len(detection_candidates)} final detections")
+        log.debug("Detection complete: %d final detections", len(detection_candidates))
         
         return detection_candidates
     
@@ -205,7 +204,7 @@ class SymbolDetectionAlgorithm:
             if new_width > 0 and new_height > 0:
                 scale_variations.append((new_width, new_height))
         
-        print(f"     Scale variations: {scale_variations}")
+        log.debug("Scale variations: %s", scale_variations)
         
         # Generate rotation and edge map variations for each scale
         for scale_width, scale_height in scale_variations:
@@ -236,10 +235,12 @@ class SymbolDetectionAlgorithm:
                     variations[(scale_width, scale_height, angle)] = template_edges
                     
                 except Exception as e:
-                    print(f"     ⚠️ Failed to create variation {scale_width}x{scale_height}@{angle}°: {e}")
+                    log.warning(
+                        "Failed to create variation %dx%d@%s: %s",
+                        scale_width, scale_height, angle, e
+                    )
                     continue
         
-        print(f"     Successfully created {len(variations)} template variations")
         return variations
     
     def _generate_candidates(
@@ -272,14 +273,14 @@ class SymbolDetectionAlgorithm:
                     })
                     
             except Exception as e:
-                print(f"     ⚠️ Template matching failed for {width}x{height}@{angle}°: {e}")
+                log.warning("Template matching failed for %dx%d@%s: %s", width, height, angle, e)
                 continue
         
-        print(f"     Raw detections: {len(all_detections_raw)}")
+        log.debug("Raw detections: %d", len(all_detections_raw))
         
         # Group close points (NMS from gem_v5.py lines 171-172)
         unique_candidates = self._group_close_points(all_detections_raw, self.NMS_DISTANCE_THRESHOLD)
-        print(f"     After NMS: {len(unique_candidates)} unique candidates")
+        log.debug("After NMS: %d unique candidates", len(unique_candidates))
         
         return unique_candidates
     
@@ -322,12 +323,14 @@ class SymbolDetectionAlgorithm:
                         "matched_angle": int(angle),
                         "status": "pending"
                     })
-                    print(f"     ✅ Candidate {i}: conf={candidate['confidence']:.3f}, IoU={iou_score:.3f}")
-                else:
-                    print(f"     ❌ Candidate {i}: conf={candidate['confidence']:.3f}, IoU={iou_score:.3f} (rejected)")
+                log.debug(
+                    "Candidate %d: conf=%.3f, IoU=%.3f%s",
+                    i, candidate["confidence"], iou_score,
+                    "" if is_verified else " (rejected)"
+                )
                     
             except Exception as e:
-                print(f"     ⚠️ IoU verification failed for candidate {i}: {e}")
+                log.warning("IoU verification failed for candidate %d: %s", i, e)
                 continue
         
         return verified_candidates
@@ -423,12 +426,17 @@ class SymbolDetectionAlgorithm:
                 
                 detection_candidates.append(detection_candidate)
                 
-                print(f"     📐 Transformed candidate {candidate['candidate_id']}:")
-                print(f"        Detection coords: ({candidate['x']}, {candidate['y']}) {candidate['width']}x{candidate['height']} @ 300 DPI")
-                print(f"        PDF coords: ({pdf_coords.left:.2f}, {pdf_coords.top:.2f}) {pdf_coords.width:.2f}x{pdf_coords.height:.2f} points")
+                log.debug(
+                    "Transformed candidate %s: (%s, %s) %sx%s @ 300 DPI -> %s",
+                    candidate["candidate_id"], candidate["x"], candidate["y"],
+                    candidate["width"], candidate["height"], pdf_coords
+                )
                 
             except Exception as e:
-                print(f"     ❌ Failed to transform candidate {candidate.get('candidate_id', 'unknown')}: {e}")
+                log.warning(
+                    "Failed to transform candidate %s: %s",
+                    candidate.get("candidate_id", "unknown"), e
+                )
                 continue
         
         return detection_candidates
\ No newline at end of file
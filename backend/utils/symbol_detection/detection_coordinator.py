@@ -8,9 +8,11 @@ multiple symbols and pages, integrating with storage and progress tracking syste
 import os
 import cv2
 import json
+import logging
 import fitz
 import numpy as np
-from typing import Dict, List, Optional, Callable, Any
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Callable, Any, Tuple
 from PIL import Image
 
 from .detection_algorithm import SymbolDetectionAlgorithm
@@ -18,6 +20,18 @@ from .detection_storage import DetectionStorage
 from .detection_progress import DetectionProgress
 from ..coordinate_mapping import PageMetadata
 
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class PreparedDetectionRun:
+    """A detection run that has been validated and created but not yet executed."""
+    run_id: str
+    symbols_to_process: Dict[str, Dict[str, Any]]
+    page_metadata: Dict[int, PageMetadata]
+    detection_params: Optional[Dict[str, Any]]
+    progress: DetectionProgress
+
 
 class DetectionCoordinator:
     """
@@ -47,7 +61,7 @@ class DetectionCoordinator:
         if not os.path.exists(self.doc_dir):
             raise FileNotFoundError(f"Document directory not found: {self.doc_dir}")
         
-        print(f"🎭 Detection coordinator initialized for document {doc_id}")
+        log.debug("Detection coordinator initialized for document %s", doc_id)
     
     def run_detection(
         self, 
@@ -70,8 +84,33 @@ class DetectionCoordinator:
             ValueError: If no symbol templates found or invalid parameters
             FileNotFoundError: If required document files missing
         """
+        prepared = self.prepare_detection(symbol_ids, detection_params)
+        return self.execute_detection(prepared, progress_callback)
+    
+    def prepare_detection(
+        self,
+        symbol_ids: Optional[List[str]] = None,
+        detection_params: Optional[Dict[str, Any]] = None
+    ) -> PreparedDetectionRun:
+        """
+        Validate inputs and create the detection run, without running detection.
         
-        print(f"🚀 Starting detection run for document {self.doc_id}")
+        The run is stored with "running" progress right away, so its ID can be
+        handed to clients before execute_detection picks it up.
+        
+        Args:
+            symbol_ids: List of symbol IDs to detect (None = all symbols)
+            detection_params: Override default detection parameters
+            
+        Returns:
+            PreparedDetectionRun to pass to execute_detection
+            
+        Raises:
+            ValueError: If no symbol templates found or invalid parameters
+            FileNotFoundError: If required document files missing
+        """
+        
+        log.info("Preparing detection run for document %s", self.doc_id)
         
         # 1. Load and validate symbol metadata
         symbols_metadata = self._load_symbols_metadata()
@@ -92,9 +131,9 @@ class DetectionCoordinator:
         else:
             symbols_to_process = {s["id"]: s for s in symbols_metadata["symbols"]}
         
-        print(f"📊 Processing {len(symbols_to_process)} symbols:")
-        for symbol_id, symbol in symbols_to_process.items():
-            print(f"   - {symbol['name']} ({symbol_id})")
+        log.debug(
+            "Processing %d symbols: %s", len(symbols_to_process), list(symbols_to_process)
+        )
         
         # 2. Load page metadata and validate
         page_metadata = self._load_page_metadata()
@@ -103,7 +142,7 @@ class DetectionCoordinator:
         if total_pages == 0:
             raise ValueError("No page metadata found")
         
-        print(f"📄 Processing across {total_pages} pages")
+        log.debug("Processing across %d pages", total_pages)
         
         # 3. Create detection run
         run_params = {
@@ -122,6 +161,35 @@ class DetectionCoordinator:
         progress = DetectionProgress(run_id, run_dir)
         progress.start_detection(len(symbols_to_process), total_pages, symbol_names)
         
+        return PreparedDetectionRun(
+            run_id=run_id,
+            symbols_to_process=symbols_to_process,
+            page_metadata=page_metadata,
+            detection_params=detection_params,
+            progress=progress,
+        )
+    
+    def execute_detection(
+        self,
+        prepared: PreparedDetectionRun,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> str:
+        """
+        Run detection for a run created by prepare_detection.
+        
+        Args:
+            prepared: Run returned by prepare_detection
+            progress_callback: Optional callback for progress updates
+            
+        Returns:
+            Detection run ID for tracking results
+        """
+        run_id = prepared.run_id
+        symbols_to_process = prepared.symbols_to_process
+        page_metadata = prepared.page_metadata
+        detection_params = prepared.detection_params
+        progress = prepared.progress
+        
         try:
             # 5. Load PDF document once for efficiency
             pdf_document = self._load_pdf_document()
@@ -142,8 +210,11 @@ class DetectionCoordinator:
                         "width_pixels_300dpi": template_width,
                         "height_pixels_300dpi": template_height
                     }
-                    print(f"   📏 Using actual template dimensions: {template_width}x{template_height} pixels (gem_v5.py approach)")
-                    print(f"   📊 Contour-detected dimensions were: {symbol_metadata['symbol_template_dimensions']['width_pixels_300dpi']}x{symbol_metadata['symbol_template_dimensions']['height_pixels_300dpi']} pixels")
+                    log.debug(
+                        "Using actual template dimensions %dx%d pixels (contour-detected: %s)",
+                        template_width, template_height,
+                        symbol_metadata["symbol_template_dimensions"]
+                    )
                     
                     # Detect symbol across all pages using actual template dimensions
                     symbol_detections = self._detect_symbol_across_pages(
@@ -172,7 +243,7 @@ class DetectionCoordinator:
                 except Exception as e:
                     error_msg = f"Failed to process symbol {symbol_metadata.get('name', symbol_id)}: {str(e)}"
                     progress.add_error(error_msg, {"symbolId": symbol_id, "symbolName": symbol_metadata.get('name')})
-                    print(f"❌ {error_msg}")
+                    log.error(error_msg)
                     
                     # Continue with other symbols instead of failing entire run
                     continue
@@ -182,7 +253,7 @@ class DetectionCoordinator:
             self.storage.complete_detection_run(run_id, success=True)
             pdf_document.close()
             
-            print(f"🎉 Detection run {run_id} completed successfully")
+            log.info("Detection run %s completed successfully", run_id)
             return run_id
             
         except Exception as e:
@@ -191,7 +262,7 @@ class DetectionCoordinator:
             progress.add_error(error_msg)
             progress.complete_detection(success=False, final_message=error_msg)
             self.storage.complete_detection_run(run_id, success=False, final_message=error_msg)
-            print(f"💥 Critical error: {error_msg}")
+            log.error("Detection run %s failed: %s", run_id, error_msg)
             raise
     
     def _detect_symbol_across_pages(
@@ -222,7 +293,7 @@ class DetectionCoordinator:
         detections_by_page = {}
         symbol_name = symbol_metadata["name"]
         
-        print(f"🔍 Detecting '{symbol_name}' across {len(page_metadata)} pages")
+        log.debug("Detecting %r across %d pages", symbol_name, len(page_metadata))
         
         for page_num, page_meta in page_metadata.items():
             try:
@@ -244,9 +315,7 @@ class DetectionCoordinator:
                 # Store detections if any found
                 if page_detections:
                     detections_by_page[page_num] = page_detections
-                    print(f"   📍 Page {page_num}: {len(page_detections)} detections")
-                else:
-                    print(f"   📍 Page {page_num}: No detections")
+                log.debug("Page %s: %d detections", page_num, len(page_detections))
                 
                 # Update progress
                 progress.update_page_progress(page_num, len(page_detections), len(page_metadata))
@@ -259,7 +328,7 @@ class DetectionCoordinator:
                     "symbolId": symbol_metadata["id"],
                     "symbolName": symbol_name
                 })
-                print(f"❌ {error_msg}")
+                log.error(error_msg)
                 
                 # Continue with other pages
                 continue
@@ -267,7 +336,10 @@ class DetectionCoordinator:
         total_detections = sum(len(detections) for detections in detections_by_page.values())
         pages_with_detections = len(detections_by_page)
         
-        print(f"✅ Symbol '{symbol_name}' complete: {total_detections} detections across {pages_with_detections} pages")
+        log.debug(
+            "Symbol %r complete: %d detections across %d pages",
+            symbol_name, total_detections, pages_with_detections
+        )
         
         return detections_by_page
     
@@ -275,18 +347,18 @@ class DetectionCoordinator:
         """Load symbols metadata from file"""
         metadata_file = os.path.join(self.doc_dir, "symbols", "symbols_metadata.json")
         if not os.path.exists(metadata_file):
-            print(f"⚠️ Symbols metadata not found: {metadata_file}")
+            log.warning("Symbols metadata not found: %s", metadata_file)
             return None
         
         try:
             with open(metadata_file, 'r') as f:
                 metadata = json.load(f)
             
-            print(f"📋 Loaded metadata for {len(metadata.get('symbols', []))} symbols")
+            log.debug("Loaded metadata for %d symbols", len(metadata.get("symbols", [])))
             return metadata
             
         except Exception as e:
-            print(f"❌ Failed to load symbols metadata: {e}")
+            log.error("Failed to load symbols metadata: %s", e)
             return None
     
     def _find_symbol_by_id(self, symbols_list: List[Dict[str, Any]], symbol_id: str) -> Optional[Dict[str, Any]]:
@@ -311,11 +383,11 @@ class DetectionCoordinator:
             for page_num, page_data in metadata_dict["pages"].items():
                 page_metadata[int(page_num)] = PageMetadata.from_dict(page_data)
             
-            print(f"📐 Loaded page metadata for {len(page_metadata)} pages")
+            log.debug("Loaded page metadata for %d pages", len(page_metadata))
             return page_metadata
             
         except Exception as e:
-            print(f"❌ Failed to load page metadata: {e}")
+            log.error("Failed to load page metadata: %s", e)
             raise
     
     def _load_pdf_document(self) -> fitz.Document:
@@ -327,11 +399,11 @@ class DetectionCoordinator:
         
         try:
             pdf_document = fitz.open(pdf_path)
-            print(f"📄 Loaded PDF document: {len(pdf_document)} pages")
+            log.debug("Loaded PDF document: %d pages", len(pdf_document))
             return pdf_document
             
         except Exception as e:
-            print(f"❌ Failed to load PDF document: {e}")
+            log.error("Failed to load PDF document: %s", e)
             raise
     
     def _load_symbol_template(self, symbol_metadata: Dict[str, Any]) -> np.ndarray:
@@ -352,11 +424,11 @@ class DetectionCoordinator:
         if has_tight_template and template_info.get("template_relative_path"):
             # Use tight template
             template_path = os.path.join(self.doc_dir, template_info["template_relative_path"])
-            print(f"🎯 Using tight template: {template_path}")
+            log.debug("Using tight template: %s", template_path)
         else:
             # Fallback to original clipping
             template_path = os.path.join(self.doc_dir, symbol_metadata["relative_path"])
-            print(f"📦 Using original clipping: {template_path}")
+            log.debug("Using original clipping: %s", template_path)
         
         if not os.path.exists(template_path):
             # If tight template is missing, try original as fallback
@@ -364,7 +436,7 @@ class DetectionCoordinator:
                 fallback_path = os.path.join(self.doc_dir, symbol_metadata["relative_path"])
                 if os.path.exists(fallback_path):
                     template_path = fallback_path
-                    print(f"⚠️ Tight template missing, using original: {template_path}")
+                    log.warning("Tight template missing, using original: %s", template_path)
                 else:
                     raise FileNotFoundError(f"Neither tight template nor original clipping found")
             else:
@@ -381,11 +453,11 @@ class DetectionCoordinator:
             else:
                 template_gray = template_array
             
-            print(f"🖼️ Loaded template: {template_path} ({template_gray.shape})")
+            log.debug("Loaded template: %s %s", template_path, template_gray.shape)
             return template_gray
             
         except Exception as e:
-            print(f"❌ Failed to load symbol template: {e}")
+            log.error("Failed to load symbol template: %s", e)
             raise
     
     def _load_page_pixmap(self, pdf_document: fitz.Document, page_index: int) -> np.ndarray:
@@ -419,7 +491,7 @@ class DetectionCoordinator:
             return img_gray
             
         except Exception as e:
-            print(f"❌ Failed to load page pixmap for page {page_index + 1}: {e}")
+            log.error("Failed to load page pixmap for page %d: %s", page_index + 1, e)
             raise
     
     def get_detection_progress(self, run_id: str) -> Optional[Dict[str, Any]]:
@@ -442,7 +514,7 @@ class DetectionCoordinator:
             with open(progress_file, 'r') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"❌ Failed to load progress: {e}")
+            log.warning("Failed to load progress: %s", e)
             return None
     
     def load_detection_results(self, run_id: str) -> Optional[Dict[str, Any]]:
@@ -457,6 +529,21 @@ class DetectionCoordinator:
         """
         return self.storage.load_detection_run(run_id)
     
+    def iter_detection_results(
+        self, run_id: str, include_rejected: bool = True
+    ) -> Optional[Tuple[Dict[str, Any], Iterator[Tuple[str, Dict[str, Any]]]]]:
+        """
+        Load run metadata with a lazy iterator over per-symbol results.
+        
+        Args:
+            run_id: Detection run ID
+            include_rejected: Whether to keep rejected detections
+            
+        Returns:
+            (run metadata, iterator of (symbol_id, detections)) or None if not found
+        """
+        return self.storage.iter_detection_run(run_id, include_rejected)
+    
     def update_detection_status(self, run_id: str, updates: List[Dict[str, Any]]):
         """
         Update status of individual detections.
@@ -476,6 +563,24 @@ class DetectionCoordinator:
         """
         return self.storage.list_detection_runs()
     
+    def latest_run_id(self) -> Optional[str]:
+        """
+        ID of the most recently created detection run (None if there are none).
+        """
+        return self.storage.latest_run_id()
+    
+    def runs_index_version(self) -> Optional[str]:
+        """
+        Version tag for the runs index (None if it does not exist).
+        """
+        return self.storage.runs_index_version()
+    
+    def detection_run_version(self, run_id: str) -> Optional[str]:
+        """
+        Version tag for a run's stored results (None if the run is not found).
+        """
+        return self.storage.detection_run_version(run_id)
+    
     def delete_detection_run(self, run_id: str) -> bool:
         """
         Delete a detection run and all its data.
@@ -511,7 +616,7 @@ class DetectionCoordinator:
             import numpy as np
             
             symbol_name = symbol_metadata["name"]
-            print(f"🎨 Creating debug overlay for {symbol_name}")
+            log.debug("Creating debug overlay for %s", symbol_name)
             
             # Create overlay for each page that has detections
             for page_num, detections in symbol_detections.items():
@@ -554,8 +659,8 @@ class DetectionCoordinator:
                 overlay_path = os.path.join(overlay_dir, f"debug_overlay_page_{page_num}.png")
                 
                 cv2.imwrite(overlay_path, overlay_image)
-                print(f"🖼️ Saved debug overlay: {overlay_path}")
+                log.debug("Saved debug overlay: %s", overlay_path)
                 
         except Exception as e:
-            print(f"❌ Failed to create debug overlay: {e}")
+            log.warning("Failed to create debug overlay: %s", e)
             # Don't raise - this is optional debug feature
\ No newline at end of file
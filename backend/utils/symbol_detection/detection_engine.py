@@ -5,8 +5,8 @@ This provides the complete detection system including multi-symbol, multi-page
 orchestration, storage, and progress tracking capabilities.
 """
 
-from typing import Dict, List, Optional, Callable, Any
-from .detection_coordinator import DetectionCoordinator
+from typing import Dict, Iterator, List, Optional, Callable, Any, Tuple
+from .detection_coordinator import DetectionCoordinator, PreparedDetectionRun
 from .detection_algorithm import SymbolDetectionAlgorithm, DetectionCandidate
 
 
@@ -63,6 +63,45 @@ class SymbolDetectionEngine:
         """
         return self.coordinator.run_detection(symbol_ids, detection_params, progress_callback)
     
+    def prepare_detection(
+        self,
+        symbol_ids: Optional[List[str]] = None,
+        detection_params: Optional[Dict[str, Any]] = None
+    ) -> PreparedDetectionRun:
+        """
+        Validate inputs and create a detection run without executing it.
+        
+        Args:
+            symbol_ids: List of symbol IDs to detect (None = all symbols)
+            detection_params: Detection algorithm parameters (see run_detection)
+            
+        Returns:
+            PreparedDetectionRun whose run_id is already stored with "running"
+            progress; pass it to execute_detection
+            
+        Raises:
+            ValueError: If no symbol templates found or invalid parameters
+            FileNotFoundError: If required document files missing
+        """
+        return self.coordinator.prepare_detection(symbol_ids, detection_params)
+    
+    def execute_detection(
+        self,
+        prepared: PreparedDetectionRun,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> str:
+        """
+        Execute a detection run created by prepare_detection.
+        
+        Args:
+            prepared: Run returned by prepare_detection
+            progress_callback: Optional callback function for progress updates
+            
+        Returns:
+            Detection run ID
+        """
+        return self.coordinator.execute_detection(prepared, progress_callback)
+    
     def get_detection_progress(self, run_id: str) -> Optional[Dict[str, Any]]:
         """
         Get real-time progress for a detection run.
@@ -87,6 +126,25 @@ class SymbolDetectionEngine:
         """
         return self.coordinator.load_detection_results(run_id)
     
+    def iter_detection_results(
+        self, run_id: str, include_rejected: bool = True
+    ) -> Optional[Tuple[Dict[str, Any], Iterator[Tuple[str, Dict[str, Any]]]]]:
+        """
+        Load run metadata with a lazy iterator over per-symbol results.
+        
+        Unlike load_detection_results, each symbol's detections file is read
+        only when the iterator reaches it.
+        
+        Args:
+            run_id: Detection run ID
+            include_rejected: If False, rejected detections are filtered out
+                as each symbol is loaded
+            
+        Returns:
+            (run metadata, iterator of (symbol_id, detections)) or None if not found
+        """
+        return self.coordinator.iter_detection_results(run_id, include_rejected)
+    
     def update_detection_status(self, run_id: str, updates: List[Dict[str, Any]]):
         """
         Update status of individual detections (accept/reject/modify).
@@ -110,6 +168,39 @@ class SymbolDetectionEngine:
         """
         return self.coordinator.list_detection_runs()
     
+    def latest_run_id(self) -> Optional[str]:
+        """
+        ID of the most recently created detection run.
+        
+        Cheaper than list_detection_runs()[0] when only the ID is needed.
+        
+        Returns:
+            Run ID, or None if the document has no runs
+        """
+        return self.coordinator.latest_run_id()
+    
+    def runs_index_version(self) -> Optional[str]:
+        """
+        Version tag for the runs index, usable as an HTTP validator.
+        
+        Returns:
+            Tag that changes whenever the index is rewritten, or None if absent
+        """
+        return self.coordinator.runs_index_version()
+    
+    def detection_run_version(self, run_id: str) -> Optional[str]:
+        """
+        Version tag for a run's stored results, usable as an HTTP validator.
+        
+        Args:
+            run_id: Detection run ID
+            
+        Returns:
+            Tag that changes whenever the run's results change, or None if the
+            run is not found
+        """
+        return self.coordinator.detection_run_version(run_id)
+    
     def delete_detection_run(self, run_id: str) -> bool:
         """
         Delete a detection run and all its data.
@@ -10,8 +10,11 @@ import os
 import threading
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Callable, Any
+import logging
 import time
 
+log = logging.getLogger(__name__)
+
 
 class DetectionProgress:
     """
@@ -56,7 +59,7 @@ class DetectionProgress:
         }
         self._save_progress()
         
-        print(f"📊 Progress tracking initialized for run {run_id}")
+        log.debug("Progress tracking initialized for run %s", run_id)
     
     def start_detection(self, total_symbols: int, total_pages: int, symbol_names: List[str] = None):
         """
@@ -100,7 +103,10 @@ class DetectionProgress:
             
             self._save_progress()
         
-        print(f"🚀 Detection started: {total_symbols} symbols × {total_pages} pages = {total_symbols * total_pages} total operations")
+        log.info(
+            "Detection started: %d symbols x %d pages = %d total operations",
+            total_symbols, total_pages, total_symbols * total_pages
+        )
     
     def start_symbol_processing(self, symbol_name: str, symbol_index: int, total_symbols: int):
         """
@@ -128,7 +134,7 @@ class DetectionProgress:
             self._update_timestamps()
             self._save_progress()
         
-        print(f"🔧 Processing symbol: {symbol_name} ({symbol_index + 1}/{total_symbols})")
+        log.debug("Processing symbol: %s (%d/%d)", symbol_name, symbol_index + 1, total_symbols)
     
     def update_page_progress(self, page_num: int, detections_found: int, total_pages: int):
         """
@@ -199,7 +205,7 @@ class DetectionProgress:
             self._update_timestamps()
             self._save_progress()
         
-        print(f"✅ Completed symbol: {symbol_name} ({total_detections} detections)")
+        log.debug("Completed symbol: %s (%d detections)", symbol_name, total_detections)
     
     def add_error(self, error_message: str, context: Dict[str, Any] = None):
         """
@@ -225,7 +231,7 @@ class DetectionProgress:
             self._update_timestamps()
             self._save_progress()
         
-        print(f"❌ Error logged: {error_message}")
+        log.error("Detection error: %s", error_message)
     
     def add_warning(self, warning_message: str, context: Dict[str, Any] = None):
         """
@@ -251,7 +257,7 @@ class DetectionProgress:
             self._update_timestamps()
             self._save_progress()
         
-        print(f"⚠️ Warning logged: {warning_message}")
+        log.warning("Detection warning: %s", warning_message)
     
     def complete_detection(self, success: bool = True, final_message: str = None):
         """
@@ -290,7 +296,7 @@ class DetectionProgress:
             self._update_timestamps()
             self._save_progress()
         
-        print(f"🏁 Detection {'completed' if success else 'failed'}: {final_message}")
+        log.info("Detection %s: %s", "completed" if success else "failed", final_message)
     
     def get_progress(self) -> Dict[str, Any]:
         """
@@ -403,7 +409,7 @@ class DetectionProgress:
             os.rename(temp_file, self.progress_file)
             
         except Exception as e:
-            print(f"⚠️ Failed to save progress: {e}")
+            log.warning("Failed to save progress: %s", e)
 
 
 class ProgressMonitor:
@@ -432,7 +438,7 @@ class ProgressMonitor:
             with open(progress_file, 'r') as f:
                 return json.load(f)
         except (json.JSONDecodeError, IOError) as e:
-            print(f"⚠️ Failed to load progress file: {e}")
+            log.warning("Failed to load progress file: %s", e)
             return None
     
     @staticmethod
@@ -469,7 +475,7 @@ class ProgressMonitor:
             
             # Check timeout
             if timeout and (time.time() - start_time) > timeout:
-                print(f"⏰ Progress monitoring timed out after {timeout} seconds")
+                log.warning("Progress monitoring timed out after %s seconds", timeout)
                 return None
             
             time.sleep(poll_interval)
@@ -5,11 +5,14 @@ This module handles the storage, retrieval, and management of detection results,
 providing a clean interface for persisting detection runs and their outcomes.
 """
 
+import hashlib
 import json
+import logging
 import os
 import uuid
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any, TYPE_CHECKING
+from typing import Dict, Iterator, List, Optional, Any, Set, Tuple, TYPE_CHECKING
 from dataclasses import asdict
 import shutil
 import threading
@@ -19,6 +22,12 @@ from .detection_algorithm import DetectionCandidate
 if TYPE_CHECKING:
     from ..coordinate_mapping import PDFCoordinates, ImageCoordinates
 
+log = logging.getLogger(__name__)
+
+
+# Per-symbol summary counts that roll up into the run's review totals
+_REVIEW_COUNT_KEYS = ("acceptedCount", "rejectedCount", "pendingCount", "modifiedCount")
+
 
 class DetectionStorage:
     """
@@ -33,16 +42,31 @@ class DetectionStorage:
     _lock_registry: Dict[str, threading.Lock] = {}
     _registry_guard = threading.Lock()
 
-    def __init__(self, doc_dir: str):
+    # Document directories whose detections layout has already been created,
+    # keyed by (doc_dir, st_ino, st_mtime_ns) so a recreated document is redone
+    _initialized_docs: Set[tuple] = set()
+
+    def __init__(self, doc_dir: str, doc_dir_stat: Optional[os.stat_result] = None):
         """
         Initialize detection storage for a specific document.
 
         Args:
             doc_dir: Path to the document's processed directory
+            doc_dir_stat: os.stat result for doc_dir, if the caller already has
+                one. Lets repeated instantiations skip the directory setup checks.
         """
         self.doc_dir = doc_dir
         self.detections_dir = os.path.join(doc_dir, "symbols", "detections")
         self.runs_index_file = os.path.join(self.detections_dir, "detection_runs.json")
+        # Small pointer to the newest run, so progress polling need not read
+        # the whole runs index
+        self.latest_run_file = os.path.join(self.detections_dir, "latest_run.json")
+
+        init_key = None
+        if doc_dir_stat is not None:
+            init_key = (doc_dir, doc_dir_stat.st_ino, doc_dir_stat.st_mtime_ns)
+            if init_key in self._initialized_docs:
+                return
 
         # Ensure directories exist
         os.makedirs(self.detections_dir, exist_ok=True)
@@ -51,6 +75,10 @@ class DetectionStorage:
         if not os.path.exists(self.runs_index_file):
             self._initialize_runs_index()
 
+        if init_key is not None:
+            with self._registry_guard:
+                self._initialized_docs.add(init_key)
+
     @classmethod
     def _get_path_lock(cls, path: str) -> threading.Lock:
         with cls._registry_guard:
@@ -122,8 +150,6 @@ class DetectionStorage:
         run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
         os.makedirs(run_dir, exist_ok=True)
 
-        print(f"📁 Created detection run directory: {run_dir}")
-
         # Create run metadata
         run_metadata = {
             "runId": run_id,
@@ -149,7 +175,14 @@ class DetectionStorage:
         # Update runs index
         self._update_runs_index(run_id, run_metadata)
 
-        print(f"✅ Detection run {run_id} created successfully")
+        lock = self._get_path_lock(self.latest_run_file)
+        with lock:
+            self._atomic_write_json(
+                self.latest_run_file,
+                {"runId": run_id, "createdAt": run_metadata["createdAt"]},
+            )
+
+        log.info("Created detection run %s", run_id)
         return run_id
 
     def save_symbol_detections(
@@ -172,8 +205,6 @@ class DetectionStorage:
         symbol_dir = os.path.join(run_dir, f"symbol_{symbol_id}")
         os.makedirs(symbol_dir, exist_ok=True)
 
-        print(f"💾 Saving detections for symbol {symbol_info.get('name', symbol_id)}")
-
         # Convert DetectionCandidate objects to serializable format
         serializable_detections = {}
         total_detections = 0
@@ -224,8 +255,11 @@ class DetectionStorage:
         with lock:
             self._atomic_write_json(symbol_file, symbol_data)
 
-        print(
-            f"   📊 Saved {total_detections} detections across {len(detections_by_page)} pages"
+        log.debug(
+            "Saved %d detections for symbol %s across %d pages",
+            total_detections,
+            symbol_info.get("name", symbol_id),
+            len(detections_by_page),
         )
 
         # Update run metadata with this symbol's results
@@ -244,34 +278,51 @@ class DetectionStorage:
                 - action: "accept", "reject", or "modify"
                 - newCoords: New coordinates if action is "modify"
                 - reviewedBy: User who made the review
+
+        The whole batch is applied in one pass over the run's symbol files:
+        each file is read once and rewritten at most once, and the run summary
+        is written once at the end.
         """
-        print(
-            f"🔄 Updating {len(detection_updates)} detection statuses for run {run_id}"
+        log.debug(
+            "Updating %d detection statuses for run %s", len(detection_updates), run_id
         )
 
         run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
         if not os.path.exists(run_dir):
             raise ValueError(f"Detection run {run_id} not found")
 
-        # Group updates by symbol
-        updates_by_symbol = {}
+        # Updates still to apply, by detection ID (in request order)
+        pending_updates = defaultdict(list)
         for update in detection_updates:
-            detection_id = update["detectionId"]
-            # Find which symbol this detection belongs to
-            symbol_id = self._find_symbol_for_detection(run_id, detection_id)
-            if symbol_id:
-                if symbol_id not in updates_by_symbol:
-                    updates_by_symbol[symbol_id] = []
-                updates_by_symbol[symbol_id].append(update)
-
-        # Apply updates to each symbol's detection file
-        for symbol_id, symbol_updates in updates_by_symbol.items():
-            self._apply_symbol_detection_updates(run_id, symbol_id, symbol_updates)
+            pending_updates[update["detectionId"]].append(update)
 
-        # Update run summary statistics
-        self._recalculate_run_summary(run_id)
+        reviewed_at = datetime.now(timezone.utc).isoformat()
+        review_totals = dict.fromkeys(_REVIEW_COUNT_KEYS, 0)
+
+        for item in os.listdir(run_dir):
+            if not item.startswith("symbol_"):
+                continue
+            symbol_file = os.path.join(run_dir, item, "detections.json")
+            if not os.path.exists(symbol_file):
+                continue
 
-        print(f"✅ Updated statuses for {len(detection_updates)} detections")
+            lock = self._get_path_lock(symbol_file)
+            with lock:
+                symbol_data = self._safe_load_json(symbol_file)
+                if pending_updates and self._apply_detection_updates(
+                    symbol_data, pending_updates, reviewed_at
+                ):
+                    symbol_data["summary"] = self._recalculate_symbol_summary(
+                        symbol_data["detectionsByPage"]
+                    )
+                    self._atomic_write_json(symbol_file, symbol_data)
+
+            # Every symbol contributes to the run totals, updated or not
+            for key in _REVIEW_COUNT_KEYS:
+                review_totals[key] += symbol_data["summary"].get(key, 0)
+
+        # Update run summary statistics
+        self._save_review_totals(run_id, review_totals)
 
     def load_detection_run(self, run_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -283,6 +334,30 @@ class DetectionStorage:
         Returns:
             Dict containing complete run data or None if not found
         """
+        loaded = self.iter_detection_run(run_id)
+        if loaded is None:
+            return None
+
+        run_data, symbol_detections = loaded
+        run_data["symbolDetections"] = dict(symbol_detections)
+        return run_data
+
+    def iter_detection_run(
+        self, run_id: str, include_rejected: bool = True
+    ) -> Optional[Tuple[Dict[str, Any], Iterator[Tuple[str, Dict[str, Any]]]]]:
+        """
+        Load detection run metadata, deferring the per-symbol detection files.
+
+        Args:
+            run_id: Detection run ID
+            include_rejected: If False, rejected detections are dropped from
+                each symbol's detectionsByPage as its file is loaded
+
+        Returns:
+            (run metadata, iterator of (symbol_id, detections dict)) or None if
+            not found. Each symbol's detections file is read only when the
+            iterator reaches it.
+        """
         run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
         if not os.path.exists(run_dir):
             return None
@@ -296,8 +371,12 @@ class DetectionStorage:
         with lock:
             run_data = self._safe_load_json(metadata_file)
 
-        # Load all symbol detections
-        symbol_detections = {}
+        return run_data, self._iter_symbol_detections(run_dir, include_rejected)
+
+    def _iter_symbol_detections(
+        self, run_dir: str, include_rejected: bool = True
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (symbol_id, detections dict) for each symbol in a run directory"""
         for item in os.listdir(run_dir):
             if item.startswith("symbol_"):
                 symbol_id = item.replace("symbol_", "")
@@ -305,10 +384,20 @@ class DetectionStorage:
                 if os.path.exists(symbol_file):
                     s_lock = self._get_path_lock(symbol_file)
                     with s_lock:
-                        symbol_detections[symbol_id] = self._safe_load_json(symbol_file)
+                        symbol_data = self._safe_load_json(symbol_file)
+                    if not include_rejected:
+                        self._drop_rejected(symbol_data)
+                    yield symbol_id, symbol_data
 
-        run_data["symbolDetections"] = symbol_detections
-        return run_data
+    @staticmethod
+    def _drop_rejected(symbol_data: Dict[str, Any]):
+        """Remove rejected detections from one symbol's detectionsByPage"""
+        detections_by_page = symbol_data.get("detectionsByPage")
+        if detections_by_page:
+            symbol_data["detectionsByPage"] = {
+                page_num: [d for d in detections if d.get("status") != "rejected"]
+                for page_num, detections in detections_by_page.items()
+            }
 
     def list_detection_runs(self) -> List[Dict[str, Any]]:
         """
@@ -326,6 +415,79 @@ class DetectionStorage:
 
         return index_data.get("runs", [])
 
+    def latest_run_id(self) -> Optional[str]:
+        """
+        ID of the most recently created detection run.
+
+        Reads the latest-run pointer, falling back to the runs index when the
+        pointer is missing (older documents, or the latest run was deleted).
+
+        Returns:
+            Run ID, or None if the document has no runs
+        """
+        lock = self._get_path_lock(self.latest_run_file)
+        try:
+            with lock:
+                return self._safe_load_json(self.latest_run_file)["runId"]
+        except FileNotFoundError:
+            pass
+
+        runs = self.list_detection_runs()
+        return runs[0]["runId"] if runs else None
+
+    @staticmethod
+    def _stat_version(st: os.stat_result) -> str:
+        return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    def runs_index_version(self) -> Optional[str]:
+        """
+        Version tag for the runs index, from its mtime and size.
+
+        Returns:
+            Tag that changes whenever the index is rewritten, or None if absent
+        """
+        try:
+            return self._stat_version(os.stat(self.runs_index_file))
+        except FileNotFoundError:
+            return None
+
+    def detection_run_version(self, run_id: str) -> Optional[str]:
+        """
+        Version tag for a detection run's stored results.
+
+        Covers the run metadata and every symbol's detections file using only
+        stat calls, so callers can validate cached results without reading them.
+
+        Args:
+            run_id: Detection run ID
+
+        Returns:
+            Tag that changes whenever any of the run's files is rewritten, or
+            None if the run is not found
+        """
+        run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
+        try:
+            parts = [
+                self._stat_version(os.stat(os.path.join(run_dir, "run_metadata.json")))
+            ]
+            with os.scandir(run_dir) as entries:
+                symbol_dirs = sorted(
+                    entry.name for entry in entries if entry.name.startswith("symbol_")
+                )
+        except FileNotFoundError:
+            return None
+
+        for name in symbol_dirs:
+            try:
+                st = os.stat(os.path.join(run_dir, name, "detections.json"))
+            except FileNotFoundError:
+                continue
+            parts.append(self._stat_version(st))
+        # One tag per file would grow with the symbol count; digest them
+        return hashlib.blake2b(
+            ".".join(parts).encode("ascii"), digest_size=12
+        ).hexdigest()
+
     def delete_detection_run(self, run_id: str) -> bool:
         """
         Delete a detection run and all its data.
@@ -354,7 +516,20 @@ class DetectionStorage:
             with lock:
                 self._atomic_write_json(self.runs_index_file, index_data)
 
-        print(f"🗑️ Deleted detection run {run_id}")
+        # Drop the latest-run pointer (and its backup, which readers would
+        # otherwise fall back to) if it named this run; readers then use the
+        # runs index
+        lock = self._get_path_lock(self.latest_run_file)
+        with lock:
+            try:
+                if self._safe_load_json(self.latest_run_file)["runId"] == run_id:
+                    for path in (self.latest_run_file, self.latest_run_file + ".bak"):
+                        if os.path.exists(path):
+                            os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        log.info("Deleted detection run %s", run_id)
         return True
 
     def _save_run_metadata(self, run_id: str, metadata: Dict[str, Any]):
@@ -486,72 +661,43 @@ class DetectionStorage:
         with lock:
             self._atomic_write_json(metadata_file, run_metadata)
 
-    def _find_symbol_for_detection(
-        self, run_id: str, detection_id: str
-    ) -> Optional[str]:
-        """Find which symbol a detection belongs to"""
-        run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
-
-        for item in os.listdir(run_dir):
-            if item.startswith("symbol_"):
-                symbol_id = item.replace("symbol_", "")
-                symbol_file = os.path.join(run_dir, item, "detections.json")
-                if os.path.exists(symbol_file):
-                    lock = self._get_path_lock(symbol_file)
-                    with lock:
-                        symbol_data = self._safe_load_json(symbol_file)
-
-                    # Search through all pages for this detection ID
-                    for page_detections in symbol_data["detectionsByPage"].values():
-                        for detection in page_detections:
-                            if detection["detectionId"] == detection_id:
-                                return symbol_id
-
-        return None
-
-    def _apply_symbol_detection_updates(
-        self, run_id: str, symbol_id: str, updates: List[Dict[str, Any]]
-    ):
-        """Apply updates to a symbol's detection file"""
-        run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
-        symbol_file = os.path.join(run_dir, f"symbol_{symbol_id}", "detections.json")
-
-        lock = self._get_path_lock(symbol_file)
-        with lock:
-            symbol_data = self._safe_load_json(symbol_file)
-
-        # Apply each update
-        for update in updates:
-            detection_id = update["detectionId"]
-            action = update["action"]
-
-            # Find and update the detection
-            for page_detections in symbol_data["detectionsByPage"].values():
-                for detection in page_detections:
-                    if detection["detectionId"] == detection_id:
-                        if action == "accept":
-                            detection["status"] = "accepted"
-                        elif action == "reject":
-                            detection["status"] = "rejected"
-                        elif action == "pending":
-                            detection["status"] = "pending"
-                        elif action == "modify":
-                            detection["status"] = "modified"
-                            if "newCoords" in update:
-                                detection["pdfCoords"] = update["newCoords"]
-
-                        detection["reviewedAt"] = datetime.now(timezone.utc).isoformat()
-                        detection["reviewedBy"] = update.get("reviewedBy", "unknown")
-                        break
-
-        # Recalculate symbol summary
-        symbol_data["summary"] = self._recalculate_symbol_summary(
-            symbol_data["detectionsByPage"]
-        )
+    @staticmethod
+    def _apply_detection_updates(
+        symbol_data: Dict[str, Any],
+        pending_updates: Dict[str, List[Dict[str, Any]]],
+        reviewed_at: str,
+    ) -> bool:
+        """
+        Apply the pending updates that target detections in one symbol's data.
 
-        # Save updated symbol data
-        with lock:
-            self._atomic_write_json(symbol_file, symbol_data)
+        Applied updates are removed from pending_updates. Returns True if any
+        detection was changed.
+        """
+        changed = False
+        for page_detections in symbol_data["detectionsByPage"].values():
+            for detection in page_detections:
+                updates = pending_updates.pop(detection["detectionId"], None)
+                if not updates:
+                    continue
+
+                for update in updates:
+                    action = update["action"]
+                    if action == "accept":
+                        detection["status"] = "accepted"
+                    elif action == "reject":
+                        detection["status"] = "rejected"
+                    elif action == "pending":
+                        detection["status"] = "pending"
+                    elif action == "modify":
+                        detection["status"] = "modified"
+                        if "newCoords" in update:
+                            detection["pdfCoords"] = update["newCoords"]
+
+                    detection["reviewedAt"] = reviewed_at
+                    detection["reviewedBy"] = update.get("reviewedBy", "unknown")
+                changed = True
+
+        return changed
 
     def _recalculate_symbol_summary(
         self, detections_by_page: Dict[str, List[Dict]]
@@ -590,17 +736,9 @@ class DetectionStorage:
     def _recalculate_run_summary(self, run_id: str):
         """Recalculate run summary statistics after status updates"""
         run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
-        metadata_file = os.path.join(run_dir, "run_metadata.json")
-
-        lock = self._get_path_lock(metadata_file)
-        with lock:
-            run_metadata = self._safe_load_json(metadata_file)
 
         # Reload all symbol data and recalculate
-        total_accepted = 0
-        total_rejected = 0
-        total_pending = 0
-        total_modified = 0
+        review_totals = dict.fromkeys(_REVIEW_COUNT_KEYS, 0)
 
         for item in os.listdir(run_dir):
             if item.startswith("symbol_"):
@@ -611,23 +749,31 @@ class DetectionStorage:
                         symbol_data = self._safe_load_json(symbol_file)
 
                     summary = symbol_data["summary"]
-                    total_accepted += summary.get("acceptedCount", 0)
-                    total_rejected += summary.get("rejectedCount", 0)
-                    total_pending += summary.get("pendingCount", 0)
-                    total_modified += summary.get("modifiedCount", 0)
+                    for key in _REVIEW_COUNT_KEYS:
+                        review_totals[key] += summary.get(key, 0)
 
-        # Update run summary
-        run_metadata["summary"].update(
-            {
-                "acceptedDetections": total_accepted,
-                "rejectedDetections": total_rejected,
-                "pendingDetections": total_pending,
-                "modifiedDetections": total_modified,
-            }
-        )
+        self._save_review_totals(run_id, review_totals)
 
-        # Save updated run metadata
+    def _save_review_totals(self, run_id: str, review_totals: Dict[str, int]):
+        """Write summed per-symbol review counts into the run summary and index"""
+        run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
+        metadata_file = os.path.join(run_dir, "run_metadata.json")
+
+        lock = self._get_path_lock(metadata_file)
         with lock:
+            run_metadata = self._safe_load_json(metadata_file)
+
+            # Update run summary
+            run_metadata["summary"].update(
+                {
+                    "acceptedDetections": review_totals["acceptedCount"],
+                    "rejectedDetections": review_totals["rejectedCount"],
+                    "pendingDetections": review_totals["pendingCount"],
+                    "modifiedDetections": review_totals["modifiedCount"],
+                }
+            )
+
+            # Save updated run metadata
             self._atomic_write_json(metadata_file, run_metadata)
 
         # Update runs index
@@ -648,7 +794,7 @@ class DetectionStorage:
         metadata_file = os.path.join(run_dir, "run_metadata.json")
 
         if not os.path.exists(metadata_file):
-            print(f"❌ Run metadata not found for run {run_id}")
+            log.error("Run metadata not found for run %s", run_id)
             return
 
         lock = self._get_path_lock(metadata_file)
@@ -679,7 +825,7 @@ class DetectionStorage:
         # Update runs index
         self._update_runs_index(run_id, run_metadata)
 
-        print(f"✅ Detection run {run_id} marked as {status}")
+        log.info("Detection run %s marked as %s", run_id, status)
 
     def load_detection_by_id(
         self, run_id: str, detection_id: str
@@ -773,6 +919,97 @@ class DetectionStorage:
         # Recalculate run summary
         self._recalculate_run_summary(run_id)
 
+    def load_detections_by_ids(
+        self, run_id: str, detection_ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Load several detections in a single pass over a run's symbol files.
+
+        Args:
+            run_id: Detection run ID
+            detection_ids: Detection IDs to look up
+
+        Returns:
+            Mapping of detection ID to detection data for the IDs that were found
+        """
+        run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
+        if not os.path.exists(run_dir):
+            return {}
+
+        wanted = set(detection_ids)
+        found = {}
+        for item in os.listdir(run_dir):
+            if not wanted:
+                break
+            if item.startswith("symbol_"):
+                symbol_file = os.path.join(run_dir, item, "detections.json")
+                if os.path.exists(symbol_file):
+                    lock = self._get_path_lock(symbol_file)
+                    with lock:
+                        symbol_data = self._safe_load_json(symbol_file)
+
+                    for page_detections in symbol_data["detectionsByPage"].values():
+                        for detection in page_detections:
+                            if detection["detectionId"] in wanted:
+                                found[detection["detectionId"]] = detection
+                                wanted.discard(detection["detectionId"])
+
+        return found
+
+    def update_detection_coordinates_bulk(
+        self, run_id: str, coordinate_updates: Dict[str, Dict[str, Any]]
+    ) -> List[str]:
+        """
+        Update coordinates for many detections, rewriting each symbol file once.
+
+        Args:
+            run_id: Detection run ID
+            coordinate_updates: Mapping of detection ID to a dict with
+                "pdfCoords" and "imageCoords" (already serialized)
+
+        Returns:
+            IDs of the detections that were updated
+        """
+        run_dir = os.path.join(self.detections_dir, f"run_{run_id}")
+        if not os.path.exists(run_dir):
+            raise ValueError(f"Detection run {run_id} not found")
+
+        modified_at = datetime.now(timezone.utc).isoformat()
+        remaining = set(coordinate_updates)
+        updated = []
+
+        for item in os.listdir(run_dir):
+            if not remaining:
+                break
+            if item.startswith("symbol_"):
+                symbol_file = os.path.join(run_dir, item, "detections.json")
+                if os.path.exists(symbol_file):
+                    lock = self._get_path_lock(symbol_file)
+                    with lock:
+                        symbol_data = self._safe_load_json(symbol_file)
+
+                        file_changed = False
+                        for page_detections in symbol_data["detectionsByPage"].values():
+                            for detection in page_detections:
+                                detection_id = detection["detectionId"]
+                                if detection_id in remaining:
+                                    coords = coordinate_updates[detection_id]
+                                    detection["pdfCoords"] = coords["pdfCoords"]
+                                    detection["imageCoords"] = coords["imageCoords"]
+                                    detection["isUserModified"] = True
+                                    detection["modifiedAt"] = modified_at
+                                    remaining.discard(detection_id)
+                                    updated.append(detection_id)
+                                    file_changed = True
+
+                        if file_changed:
+                            self._atomic_write_json(symbol_file, symbol_data)
+
+        if updated:
+            self._recalculate_run_summary(run_id)
+
+        return updated
+
     def add_user_detection(
         self,
         run_id: str,
@@ -780,6 +1017,7 @@ class DetectionStorage:
         pdf_coords: "PDFCoordinates",
         image_coords: "ImageCoordinates",
         page_number: int,
+        detection_id: Optional[str] = None,
     ) -> str:
         """
         Add a new user-created detection.
@@ -790,6 +1028,7 @@ class DetectionStorage:
             pdf_coords: PDF coordinates of the detection
             image_coords: Image coordinates of the detection
             page_number: Page number where detection was added
+            detection_id: ID to store the detection under (generated if omitted)
 
         Returns:
             New detection ID
@@ -807,7 +1046,8 @@ class DetectionStorage:
             symbol_data = self._safe_load_json(symbol_file)
 
         # Generate new detection ID
-        detection_id = f"user_{uuid.uuid4()}"
+        if detection_id is None:
+            detection_id = f"user_{uuid.uuid4()}"
 
         # Create new detection object
         new_detection = {
@@ -5,6 +5,10 @@ This module calculates the actual dimensions of symbol templates by analyzing
 the non-white pixels (contours) in symbol images at 300 DPI.
 """
 
+import logging
+import os
+from functools import lru_cache
+
 import numpy as np
 import cv2
 import fitz  # PyMuPDF
@@ -12,6 +16,17 @@ from PIL import Image
 from typing import Tuple, Optional, Dict
 from .coordinate_mapping import PDFCoordinates
 
+log = logging.getLogger(__name__)
+
+
+def _no_template() -> Dict[str, any]:
+    """Template info for a symbol without a tight template."""
+    return {
+        "template_dimensions": {"width_pixels_300dpi": 0, "height_pixels_300dpi": 0},
+        "crop_offset": {"left": 0, "top": 0},
+        "success": False,
+    }
+
 
 class SymbolDimensionCalculator:
     """
@@ -62,9 +77,72 @@ class SymbolDimensionCalculator:
             return self._analyze_contours(img_data)
 
         except Exception as e:
-            print(f"Error calculating dimensions from PDF: {e}")
+            log.warning("Error calculating dimensions from PDF: %s", e)
             return {"height_pixels_300dpi": 0, "width_pixels_300dpi": 0}
 
+    def render_region(
+        self, pdf_document: fitz.Document, page_number: int, pdf_coords: PDFCoordinates
+    ) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """
+        Render a PDF region once at 300 DPI so that several symbols inside it
+        can be measured with calculate_dimensions_from_pixmap.
+
+        Args:
+            pdf_document: The PDF document object
+            page_number: Page number (1-indexed)
+            pdf_coords: PDF coordinates of the region (e.g. a legend)
+
+        Returns:
+            (image array, pixel origin of the array at 300 DPI), or None for
+            rotated pages, whose renders are not aligned with PDF coordinates
+        """
+        page = pdf_document[page_number - 1]
+        if page.rotation:
+            return None
+
+        region_rect = fitz.Rect(
+            pdf_coords.left,
+            pdf_coords.top,
+            pdf_coords.left + pdf_coords.width,
+            pdf_coords.top + pdf_coords.height,
+        )
+        region_pix = page.get_pixmap(clip=region_rect, dpi=self.STANDARD_DPI)
+        img_data = np.frombuffer(region_pix.samples, dtype=np.uint8).reshape(
+            region_pix.h, region_pix.w, region_pix.n
+        )
+        return img_data, (region_pix.x, region_pix.y)
+
+    def calculate_dimensions_from_pixmap(
+        self,
+        pixmap_arr: np.ndarray,
+        pixmap_origin: Tuple[int, int],
+        pdf_coords: PDFCoordinates,
+    ) -> Dict[str, int]:
+        """
+        Calculate symbol dimensions from a region rendered by render_region.
+
+        Args:
+            pixmap_arr: Image array returned by render_region
+            pixmap_origin: Pixel origin returned by render_region
+            pdf_coords: PDF coordinates of the symbol
+
+        Returns:
+            Dict with height_pixels_300dpi and width_pixels_300dpi
+        """
+        scale = self.STANDARD_DPI / 72.0
+        origin_x, origin_y = pixmap_origin
+
+        # Same pixel rounding as rendering the symbol rect on its own
+        x0 = max(0, int(np.floor(pdf_coords.left * scale)) - origin_x)
+        y0 = max(0, int(np.floor(pdf_coords.top * scale)) - origin_y)
+        x1 = int(np.ceil((pdf_coords.left + pdf_coords.width) * scale)) - origin_x
+        y1 = int(np.ceil((pdf_coords.top + pdf_coords.height) * scale)) - origin_y
+
+        symbol_data = pixmap_arr[y0:y1, x0:x1]
+        if symbol_data.size == 0:
+            return {"height_pixels_300dpi": 0, "width_pixels_300dpi": 0}
+        return self._analyze_contours(np.ascontiguousarray(symbol_data))
+
     def calculate_dimensions_from_image(self, image: Image.Image) -> Dict[str, int]:
         """
         Calculate symbol dimensions from a PIL Image by analyzing contours.
@@ -86,7 +164,7 @@ class SymbolDimensionCalculator:
             return self._analyze_contours(img_array)
 
         except Exception as e:
-            print(f"Error calculating dimensions from image: {e}")
+            log.warning("Error calculating dimensions from image: %s", e)
             return {"height_pixels_300dpi": 0, "width_pixels_300dpi": 0}
 
     def _analyze_contours(self, img_data: np.ndarray) -> Dict[str, int]:
@@ -122,7 +200,7 @@ class SymbolDimensionCalculator:
                 return {"height_pixels_300dpi": 0, "width_pixels_300dpi": 0}
 
         except Exception as e:
-            print(f"Error analyzing contours: {e}")
+            log.warning("Error analyzing contours: %s", e)
             return {"height_pixels_300dpi": 0, "width_pixels_300dpi": 0}
     
     def generate_tight_template(self, image_path: str, output_path: str) -> Dict[str, any]:
@@ -140,14 +218,45 @@ class SymbolDimensionCalculator:
                 - success: boolean indicating if generation was successful
         """
         try:
-            print(f"🔍 Generating tight template from: {image_path}")
-            
             # Load the original image
             image = Image.open(image_path)
-            img_array = np.array(image)
+            template_info, cropped_image = self.tight_template(np.array(image))
+            
+            if cropped_image is None:
+                log.debug("No contours found in %s", image_path)
+                return template_info
+            
+            # Save the tight template
+            cropped_pil = Image.fromarray(cropped_image)
+            cropped_pil.save(output_path)
+            
+            log.debug(
+                "Tight template saved: %s (%s, offset %s)",
+                output_path,
+                template_info["template_dimensions"],
+                template_info["crop_offset"],
+            )
             
+            return template_info
+            
+        except Exception as e:
+            log.warning("Error generating tight template from %s: %s", image_path, e)
+            return _no_template()
+
+    def tight_template(self, img_array: np.ndarray) -> Tuple[Dict[str, any], Optional[np.ndarray]]:
+        """
+        Crop a symbol image array to its non-white content, without touching disk.
+        
+        Args:
+            img_array: Symbol image array (as decoded from the symbol clipping)
+            
+        Returns:
+            (template info as returned by generate_tight_template, cropped
+            array or None if no contours were found)
+        """
+        try:
             # Handle alpha channel
-            if img_array.shape[2] == 4:
+            if img_array.ndim == 3 and img_array.shape[2] == 4:
                 img_array = img_array[:, :, :3]
             
             # Convert to grayscale for contour detection
@@ -162,19 +271,12 @@ class SymbolDimensionCalculator:
             )
             
             if not contours:
-                print(f"❌ No contours found in {image_path}")
-                return {
-                    "template_dimensions": {"width_pixels_300dpi": 0, "height_pixels_300dpi": 0},
-                    "crop_offset": {"left": 0, "top": 0},
-                    "success": False
-                }
+                return _no_template(), None
             
             # Get combined bounding box of all contours
             all_points = np.concatenate([cnt for cnt in contours])
             x, y, w, h = cv2.boundingRect(all_points)
             
-            print(f"📐 Detected symbol bounds: ({x}, {y}) {w}x{h} pixels")
-            
             # Add small padding (2-3 pixels) to ensure complete symbol capture
             padding = 2
             x = max(0, x - padding)
@@ -188,27 +290,19 @@ class SymbolDimensionCalculator:
             else:
                 cropped_image = img_array[y:y+h, x:x+w]
             
-            # Save the tight template
-            cropped_pil = Image.fromarray(cropped_image)
-            cropped_pil.save(output_path)
-            
-            print(f"✅ Tight template saved: {output_path}")
-            print(f"📏 Template dimensions: {w}x{h} pixels")
-            print(f"📍 Crop offset: ({x}, {y}) from original")
-            
             return {
                 "template_dimensions": {"width_pixels_300dpi": int(w), "height_pixels_300dpi": int(h)},
                 "crop_offset": {"left": int(x), "top": int(y)},
                 "success": True
-            }
-            
+            }, cropped_image
+
         except Exception as e:
-            print(f"❌ Error generating tight template: {e}")
-            return {
-                "template_dimensions": {"width_pixels_300dpi": 0, "height_pixels_300dpi": 0},
-                "crop_offset": {"left": 0, "top": 0},
-                "success": False
-            }
+            log.warning("Error generating tight template: %s", e)
+            return _no_template(), None
+
+
+# The calculator holds no state, so one instance serves every caller
+_default_calculator = SymbolDimensionCalculator()
 
 
 def calculate_symbol_dimensions_from_pdf(
@@ -225,8 +319,7 @@ def calculate_symbol_dimensions_from_pdf(
     Returns:
         Dict with height_pixels_300dpi and width_pixels_300dpi
     """
-    calculator = SymbolDimensionCalculator()
-    return calculator.calculate_dimensions_from_pdf(
+    return _default_calculator.calculate_dimensions_from_pdf(
         pdf_document, page_number, pdf_coords
     )
 
@@ -241,5 +334,38 @@ def calculate_symbol_dimensions_from_image(image: Image.Image) -> Dict[str, int]
     Returns:
         Dict with height_pixels_300dpi and width_pixels_300dpi
     """
-    calculator = SymbolDimensionCalculator()
-    return calculator.calculate_dimensions_from_image(image)
+    return _default_calculator.calculate_dimensions_from_image(image)
+
+
+# --- Process pool entry points ---
+# PyMuPDF holds the GIL while rendering and a document must not be used from
+# several threads, so PDF renders for symbol measurement run in worker
+# processes. Boxes are passed as plain (left, top, width, height) tuples and
+# each worker keeps its recently used documents open.
+
+
+@lru_cache(maxsize=4)
+def _open_pdf(pdf_path: str, mtime_ns: int) -> fitz.Document:
+    return fitz.open(pdf_path)
+
+
+def _worker_pdf(pdf_path: str) -> fitz.Document:
+    return _open_pdf(pdf_path, os.stat(pdf_path).st_mtime_ns)
+
+
+def render_pdf_region(
+    pdf_path: str, page_number: int, pdf_box: Tuple[float, float, float, float]
+) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+    """SymbolDimensionCalculator.render_region for a PDF file path."""
+    return _default_calculator.render_region(
+        _worker_pdf(pdf_path), page_number, PDFCoordinates(*pdf_box)
+    )
+
+
+def calculate_dimensions_from_pdf_file(
+    pdf_path: str, page_number: int, pdf_box: Tuple[float, float, float, float]
+) -> Dict[str, int]:
+    """SymbolDimensionCalculator.calculate_dimensions_from_pdf for a PDF file path."""
+    return _default_calculator.calculate_dimensions_from_pdf(
+        _worker_pdf(pdf_path), page_number, PDFCoordinates(*pdf_box)
+    )
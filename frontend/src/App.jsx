@@ -70,7 +70,8 @@ function App() {
                     setDocInfo({
                         docId: PRELOAD_DOC_ID,
                         totalPages: totalPages,
-                        pageMetadata: pages
+                        pageMetadata: pages,
+                        pageImageExtension: meta.pageImageExtension
                     });
 
                     // Mark all pixmaps as ready so canvases load immediately
@@ -106,13 +107,13 @@ function App() {
     ];
 
     // Pixmap availability checking
-    const checkPixmapAvailability = async (docId, totalPages) => {
+    const checkPixmapAvailability = async (docId, totalPages, imageExtension) => {
         console.log(`🔍 Starting pixmap availability check for document ${docId} with ${totalPages} pages...`);
         setProcessingStatus(`🖼️ Processing ${totalPages} page${totalPages > 1 ? 's' : ''}...`);
         
         for (let pageNum = 1; pageNum <= totalPages; pageNum++) {
             setPixmapStatus(prev => ({ ...prev, [pageNum]: 'loading' }));
-            checkPagePixmap(docId, pageNum);
+            checkPagePixmap(docId, pageNum, imageExtension);
         }
         
         // Set up periodic checking for pages that aren't ready yet
@@ -121,7 +122,7 @@ function App() {
             Object.entries(pixmapStatus).forEach(([pageNum, status]) => {
                 if (status === 'loading' || status === 'error') {
                     console.log(`Rechecking page ${pageNum} (status: ${status})`);
-                    checkPagePixmap(docId, parseInt(pageNum));
+                    checkPagePixmap(docId, parseInt(pageNum), imageExtension);
                 }
             });
         }, 5000);
@@ -202,10 +203,12 @@ function App() {
         }
     };
 
-    const checkPagePixmap = async (docId, pageNum) => {
+    // Legacy page images are .webp or .png (older documents); the upload
+    // response and page_metadata.json say which
+    const checkPagePixmap = async (docId, pageNum, imageExtension = '.png') => {
         try {
             // Check the legacy format first (created by app.py upload endpoint)
-            const legacyImageUrl = `/data/processed/${docId}/page_${pageNum}.png`;
+            const legacyImageUrl = `/data/processed/${docId}/page_${pageNum}${imageExtension}`;
             console.log(`Checking pixmap for page ${pageNum}: ${legacyImageUrl}`);
             const legacyResponse = await fetch(legacyImageUrl, { method: 'HEAD' });
             
@@ -343,7 +346,7 @@ function App() {
             await loadExistingData(response.data.docId);
             
             // Start checking for pixmaps
-            await checkPixmapAvailability(response.data.docId, response.data.totalPages);
+            await checkPixmapAvailability(response.data.docId, response.data.totalPages, response.data.pageImageExtension);
 
         } catch (err) {
             const errorMessage = err.response?.data?.error || err.message || 'An unknown error occurred during upload.';
@@ -456,7 +459,7 @@ function App() {
             return <TabComponent 
                 {...commonProps} 
                 pixmapStatus={pixmapStatus}
-                onPixmapCheck={(pageNum) => checkPagePixmap(docInfo.docId, pageNum)}
+                onPixmapCheck={(pageNum) => checkPagePixmap(docInfo.docId, pageNum, docInfo.pageImageExtension)}
             />;
         }
 
@@ -49,7 +49,7 @@ const DefineKeyAreasTab = ({
                 const canvas = fabricCanvases[pageNumber];
                 if (!canvas.backgroundImage) {
                     console.log(`Loading background for page ${pageNumber} (pixmap now ready)`);
-                    const legacyImageUrl = `/data/processed/${docInfo.docId}/page_${pageNumber}.png`;
+                    const legacyImageUrl = `/data/processed/${docInfo.docId}/page_${pageNumber}${docInfo.pageImageExtension || '.png'}`;
                     fabric.Image.fromURL(legacyImageUrl, (img) => {
                         if (!canvas || canvas._disposed) return;
 
@@ -232,7 +232,7 @@ const DefineKeyAreasTab = ({
         }
 
         // Load background image - try legacy format first, then high-res pixmap
-        const legacyImageUrl = `/data/processed/${docInfo.docId}/page_${pageNumber}.png`;
+        const legacyImageUrl = `/data/processed/${docInfo.docId}/page_${pageNumber}${docInfo.pageImageExtension || '.png'}`;
 
         fabric.Image.fromURL(legacyImageUrl, (img) => {
             if (!canvas || canvas._disposed) return;
@@ -131,8 +131,10 @@ const PDFToHTMLTab = ({ docInfo }) => {
 
     const loadPageHtml = async (pageNumber) => {
         try {
-            const response = await axios.get(`/api/get_page_html/${docInfo.docId}/${pageNumber}`);
-            const htmlContent = response.data.htmlContent;
+            const response = await axios.get(`/api/get_page_html/${docInfo.docId}/${pageNumber}`, {
+                responseType: 'text'
+            });
+            const htmlContent = response.data;
             
             setProcessedPages(prev => ({
                 ...prev,
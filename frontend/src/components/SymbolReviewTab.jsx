@@ -168,6 +168,9 @@ const SymbolReviewTab = ({
                 pdfCoords: newPdfCoords
             });
 
+            // Writes are applied in the background; wait for them before reloading
+            await axios.post('/api/detection_flush', { docId: docInfo.docId });
+
             // Refresh detection results
             loadDetectionResults(detectionResults.runId);
         } catch (err) {
@@ -228,6 +231,9 @@ const SymbolReviewTab = ({
             
             console.log('✅ Add detection response:', response.data);
 
+            // Writes are applied in the background; wait for them before reloading
+            await axios.post('/api/detection_flush', { docId: docInfo.docId });
+
             // Refresh detection results
             loadDetectionResults(detectionResults.runId);
         } catch (err) {
@@ -252,6 +258,9 @@ const SymbolReviewTab = ({
                 });
             }
 
+            // Writes are applied in the background; wait for them before reloading
+            await axios.post('/api/detection_flush', { docId: docInfo.docId });
+
             // Refresh detection results and force a render tick
             await loadDetectionResults(detectionResults.runId);
             // Nudge downstream canvas to clear selection and re-render
@@ -38,7 +38,7 @@ else
     
     # Start backend in background
     echo "🐍 Starting Flask backend..."
-    python app.py &
+    python server.py &
     BACKEND_PID=$!
     sleep 3
 fi
@@ -94,7 +94,7 @@ cleanup() {
         kill $FRONTEND_PID 2>/dev/null
     fi
     # Kill any remaining processes on the ports
-    pkill -f "python app.py" 2>/dev/null
+    pkill -f "python server.py" 2>/dev/null
     pkill -f "vite" 2>/dev/null
     echo "✅ Demo stopped"
     exit 0